@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+    Measure WITHSCORES response conversion and ZADD encoding per member for
+    100k members: (member, float) pairs of Client versus NumPy arrays of
+    ArrayClient.
+
+    Network is not involved: response is fed to the client directly, in
+    chunks of the size client reads from the socket, and commands are only
+    encoded.
+"""
+import timeit
+
+import numpy
+
+from toredis.arrays import ArrayClient
+from toredis.client import Client, READ_CHUNK_SIZE
+from toredis.commands import RESPONSE_CALLBACKS
+
+
+def encode_reply(items):
+    return b''.join(
+        [('*%d\r\n' % len(items)).encode()] +
+        [('$%d\r\n' % len(item)).encode() + item + b'\r\n' for item in items]
+    )
+
+
+def run_response(client_class, number):
+    if client_class is Client:
+        client = Client(use_stack_context=False,
+                        response_callbacks=RESPONSE_CALLBACKS)
+    else:
+        client = client_class(use_stack_context=False)
+    client._reset()
+
+    items = []
+    for i in range(number):
+        items.append(('member%d' % i).encode())
+        items.append(repr(i * 0.1).encode())
+    data = encode_reply(items)
+    chunks = [data[i:i + READ_CHUNK_SIZE]
+              for i in range(0, len(data), READ_CHUNK_SIZE)]
+
+    args = ['ZRANGE', 'key', 0, -1, 'WITHSCORES']
+    transform = client._get_response_callback(args)
+
+    def callback(result):
+        transform(result)
+
+    def bench():
+        # Register callback the way send_message does
+        client.callbacks.append((callback, None))
+        for chunk in chunks:
+            client._on_read(chunk)
+
+    return bench
+
+
+def run_zadd(use_arrays, number):
+    client = ArrayClient(use_stack_context=False)
+    members = ['member%d' % i for i in range(number)]
+    scores = numpy.arange(number) * 0.1
+
+    if use_arrays:
+        def bench():
+            client.zadd_array('key', members, scores)
+    else:
+        mapping = dict(zip(members, scores.tolist()))
+
+        def bench():
+            client.zadd('key', mapping)
+
+    # Commands are encoded, but not written
+    client.send_message = lambda args, callback=None: \
+        client._encoder.encode(args)
+    return bench
+
+
+def main(repeat=10, number=100000):
+    for name, client_class in (('pairs', Client), ('arrays', ArrayClient)):
+        bench = run_response(client_class, number)
+        best = min(timeit.repeat(bench, number=1, repeat=repeat))
+        print('WITHSCORES to %-6s %6.3f us per member' % (
+            name, best / number * 1e6))
+
+    for name, use_arrays in (('dict', False), ('arrays', True)):
+        bench = run_zadd(use_arrays, number)
+        best = min(timeit.repeat(bench, number=1, repeat=repeat))
+        print('ZADD from %-10s %6.3f us per member' % (
+            name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+    Measure cost of getting decoded MGET reply of 10k items: decoded by the
+    reader with client `encoding` versus decoded by the caller afterwards.
+
+    Network is not involved: reply is fed to the client directly, in chunks
+    of the size client reads from the socket.
+"""
+import timeit
+
+from toredis.client import Client, READ_CHUNK_SIZE
+
+
+def encode_reply(items):
+    return b''.join(
+        [('*%d\r\n' % len(items)).encode()] +
+        [('$%d\r\n' % len(item)).encode() + item + b'\r\n' for item in items]
+    )
+
+
+def run(encoding, number):
+    client = Client(use_stack_context=False, encoding=encoding)
+    client._reset()
+
+    data = encode_reply([(u'value%d \xe4' % i).encode('utf-8')
+                         for i in range(number)])
+    chunks = [data[i:i + READ_CHUNK_SIZE]
+              for i in range(0, len(data), READ_CHUNK_SIZE)]
+
+    if encoding is None:
+        def callback(result):
+            result = [item.decode('utf-8') for item in result]
+            assert len(result) == number
+    else:
+        def callback(result):
+            assert len(result) == number
+
+    def bench():
+        # Register callback the way send_message does
+        client.callbacks.append((callback, None))
+        for chunk in chunks:
+            client._on_read(chunk)
+
+    return bench
+
+
+def main(repeat=50, number=10000):
+    for name, encoding in (('caller', None), ('reader', 'utf-8')):
+        bench = run(encoding, number)
+        best = min(timeit.repeat(bench, number=1, repeat=repeat))
+        print('decoded by %-6s %6.3f us per item' % (
+            name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
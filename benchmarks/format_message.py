@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+    Compare redis protocol encoder against the original list based
+    implementation of Client.format_message
+"""
+import timeit
+
+from toredis.protocol import Encoder
+from toredis._compat import string_types, text_type
+
+
+def format_message(args):
+    l = "*%d" % len(args)
+    lines = [l.encode('utf-8')]
+    for arg in args:
+        if not isinstance(arg, string_types):
+            arg = str(arg)
+        if isinstance(arg, text_type):
+            arg = arg.encode('utf-8')
+        l = "$%d" % len(arg)
+        lines.append(l.encode('utf-8'))
+        lines.append(arg)
+    lines.append(b"")
+    return b"\r\n".join(lines)
+
+
+COMMANDS = {
+    'get': ['GET', 'user:1000:profile'],
+    'set': ['SET', 'user:1000:profile', 'x' * 100],
+    'hmset': ['HMSET', 'user:1000'] + ['field%d' % i for i in range(20)],
+    'set-64k': ['SET', 'blob', 'x' * 65536],
+}
+
+
+def main(number=100000):
+    encoder = Encoder()
+
+    def fast(args):
+        encoder.pack(args)
+        return encoder.get_chunks()
+
+    for name, args in sorted(COMMANDS.items()):
+        assert b''.join(fast(args)) == format_message(args)
+
+        old = min(timeit.repeat(lambda: format_message(args),
+                                number=number, repeat=3))
+        new = min(timeit.repeat(lambda: fast(args),
+                                number=number, repeat=3))
+        print('%-8s format_message: %6.3f us  Encoder: %6.3f us  (x%.2f)' % (
+            name, old / number * 1e6, new / number * 1e6, old / new
+        ))
+
+    pipeline = [COMMANDS['get']] * 1000
+    old = min(timeit.repeat(
+        lambda: b''.join([format_message(args) for args in pipeline]),
+        number=100, repeat=3
+    ))
+
+    def fast_pipeline():
+        encoder.pack_pipeline(pipeline)
+        return encoder.get_chunks()
+
+    new = min(timeit.repeat(fast_pipeline, number=100, repeat=3))
+    print('%-8s format_message: %6.3f ms  Encoder: %6.3f ms  (x%.2f)' % (
+        'pipe1k', old * 10, new * 10, old / new
+    ))
+
+
+if __name__ == '__main__':
+    main()
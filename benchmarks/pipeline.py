@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+    Measure pipeline response handling per reply for pipelines of 1k and
+    10k commands.
+
+    Network is not involved: responses are fed to the client directly, in
+    chunks of the size client reads from the socket.
+"""
+import timeit
+
+from toredis.client import Client, READ_CHUNK_SIZE
+
+
+REPLIES = {
+    'status': b'+OK\r\n',
+    'integer': b':0\r\n',
+    'bulk': b'$32\r\n' + b'x' * 32 + b'\r\n',
+}
+
+
+def run(reply, number):
+    client = Client(use_stack_context=False)
+    client._reset()
+
+    data = reply * number
+    chunks = [data[i:i + READ_CHUNK_SIZE]
+              for i in range(0, len(data), READ_CHUNK_SIZE)]
+
+    def callback(result):
+        assert len(result) == number
+
+    def bench():
+        # Register pipeline callback the way send_messages does
+        client.callbacks.append((callback, (number, [])))
+        for chunk in chunks:
+            client._on_read(chunk)
+
+    return bench
+
+
+def main(repeat=50):
+    for number in (1000, 10000):
+        for name, reply in sorted(REPLIES.items()):
+            bench = run(reply, number)
+            best = min(timeit.repeat(bench, number=1, repeat=repeat))
+            print('%5d commands, %-7s replies %6.3f us per reply' % (
+                number, name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+    Measure pub/sub dispatch overhead per message with per-message and
+    batched delivery.
+
+    Network is not involved: messages are fed to the client directly, in
+    chunks of the given size.
+"""
+import timeit
+
+from toredis.client import Client
+
+
+CHANNELS = [('channel%d' % i).encode() for i in range(10)]
+
+
+def encode_message(channel, data):
+    return b''.join([
+        b'*3\r\n$7\r\nmessage\r\n',
+        ('$%d\r\n' % len(channel)).encode(), channel, b'\r\n',
+        ('$%d\r\n' % len(data)).encode(), data, b'\r\n',
+    ])
+
+
+def run(batch, number, chunk_size):
+    client = Client(use_stack_context=False)
+    client._reset()
+
+    pubsub = client.pubsub(batch=batch)
+    client._sub_callback = pubsub._callback
+
+    def handler(channel, message):
+        pass
+
+    for channel in CHANNELS:
+        pubsub.channels[channel] = handler
+
+    messages = [encode_message(CHANNELS[i % len(CHANNELS)], b'x' * 32)
+                for i in range(number)]
+    chunks = [b''.join(messages[i:i + chunk_size])
+              for i in range(0, number, chunk_size)]
+
+    def bench():
+        for chunk in chunks:
+            client._on_read(chunk)
+
+    return bench
+
+
+def main(number=100000, repeat=5):
+    for chunk_size in (1, 10, 100):
+        for name, batch in (('per message', False), ('batched', True)):
+            bench = run(batch, number, chunk_size)
+            best = min(timeit.repeat(bench, number=1, repeat=repeat))
+            print('%3d messages per read, %-11s %6.3f us per message' % (
+                chunk_size, name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+    Measure client overhead per command (encoding, callback registration
+    and response dispatch) with and without stack_context wrapping.
+
+    Network is not involved: commands are written to a dummy stream and
+    responses are fed to the client directly.
+"""
+import timeit
+
+from toredis.client import Client
+from toredis._compat import stack_context_wrap
+
+
+class NullStream(object):
+    def write(self, data):
+        pass
+
+    def closed(self):
+        return False
+
+
+def make_client(use_stack_context):
+    client = Client(use_stack_context=use_stack_context)
+    client._reset()
+    client._stream = NullStream()
+    return client
+
+
+def run(client, number):
+    def callback(result):
+        pass
+
+    responses = b'+OK\r\n' * number
+
+    def bench():
+        for i in range(number):
+            client.get('foo', callback)
+        client._on_read(responses)
+
+    return bench
+
+
+def main(number=10000, repeat=5):
+    for name, use_stack_context in (('stack_context', True),
+                                    ('no stack_context', False)):
+        if use_stack_context and stack_context_wrap is None:
+            print('%-17s not available in this Tornado version' % name)
+            continue
+
+        bench = run(make_client(use_stack_context), number)
+        best = min(timeit.repeat(bench, number=1, repeat=repeat))
+        print('%-17s %6.3f us per command' % (name, best / number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
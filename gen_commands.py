@@ -178,9 +178,9 @@ def parse_arguments(command, arguments):
 
     args.append('callback=None')
     if len(code) > 1:
-        code.append('self.send_message({args}, callback)')
+        code.append('return self.send_message({args}, callback)')
     else:
-        code = ['self.send_message([%s], callback)' % parse_command(command)]
+        code = ['return self.send_message([%s], callback)' % parse_command(command)]
 
     if 'args' in args or any(arg.startswith('args=') for arg in args):
         code = [line.format(args='message_args') for line in code]
@@ -236,6 +236,132 @@ def get_command_code(func_name, cmd, params):
     return lines
 
 
+def get_key_position(command, params):
+    """
+        Index of the first key in command arguments. Returns None if
+        command has no keys or key position depends on optional arguments.
+    """
+    pos = len(command.split(' '))
+    for arg in params.get('arguments', []):
+        arg_type = arg.get('type')
+        if isinstance(arg_type, list):
+            arg_type = arg_type[0]
+
+        if arg_type == 'key' and 'command' not in arg:
+            return pos
+
+        if (arg.get('optional') or arg.get('multiple') or
+                arg.get('variadic') or 'command' in arg):
+            return None
+
+        pos += 1
+
+    return None
+
+
+def get_key_positions_source(name):
+    positions = {}
+    for cmd, params in sorted(get_commands().items()):
+        pos = get_key_position(cmd, params)
+        if pos is not None:
+            positions[cmd.split(' ')[0]] = pos
+
+    lines = ['# Index of the first key in command arguments, by command name',
+             '%s = {' % name]
+    for cmd, pos in sorted(positions.items()):
+        lines.append("    '%s': %d," % (cmd, pos))
+    lines.append('}')
+    return '\n'.join(lines) + '\n' * 3
+
+
+def get_readonly_commands_source(name):
+    commands = set()
+    for cmd, params in get_commands().items():
+        if params.get('readonly'):
+            commands.add(cmd.split(' ')[0])
+
+    lines = ['# Commands which do not modify data and can be sent to replicas',
+             '%s = frozenset([' % name]
+    for cmd in sorted(commands):
+        lines.append("    '%s'," % cmd)
+    lines.append('])')
+    return '\n'.join(lines) + '\n' * 3
+
+
+# Response callbacks by command name: builtins or toredis.responses functions
+RESPONSE_CALLBACKS = {
+    'EXISTS': 'bool',
+    'EXPIRE': 'bool',
+    'EXPIREAT': 'bool',
+    'HEXISTS': 'bool',
+    'HGETALL': 'pairs_to_dict',
+    'HINCRBYFLOAT': 'float',
+    'HSETNX': 'bool',
+    'INCRBYFLOAT': 'float',
+    'INFO': 'parse_info',
+    'MOVE': 'bool',
+    'MSETNX': 'bool',
+    'PERSIST': 'bool',
+    'PEXPIRE': 'bool',
+    'PEXPIREAT': 'bool',
+    'RENAMENX': 'bool',
+    'SETNX': 'bool',
+    'SISMEMBER': 'bool',
+    'SMOVE': 'bool',
+    'ZINCRBY': 'float',
+    'ZSCORE': 'float',
+}
+
+# Functions of toredis.responses used by the callbacks
+RESPONSE_FUNCTIONS = ['pairs_to_dict', 'pairs_with_scores', 'parse_info']
+
+
+def get_option_position(command, params, option):
+    """
+        Index of optional flag argument in command arguments. Returns None if
+        command has no such flag or its position depends on other optional
+        arguments.
+    """
+    pos = len(command.split(' '))
+    for arg in params.get('arguments', []):
+        if arg.get('enum') == [option] and arg.get('optional'):
+            return pos
+
+        if (arg.get('optional') or arg.get('multiple') or
+                arg.get('variadic') or 'command' in arg or
+                isinstance(arg['name'], list)):
+            return None
+
+        pos += 1
+
+    return None
+
+
+def get_response_callbacks_source(name, options_name):
+    callbacks = dict(RESPONSE_CALLBACKS)
+    options = {}
+    for cmd, params in sorted(get_commands().items()):
+        pos = get_option_position(cmd, params, 'WITHSCORES')
+        if pos is not None:
+            callbacks[cmd] = 'pairs_with_scores'
+            options[cmd] = (pos, 'WITHSCORES')
+
+    lines = ['# Callbacks which convert responses, by command name',
+             '%s = {' % name]
+    for cmd, callback in sorted(callbacks.items()):
+        lines.append("    '%s': %s," % (cmd, callback))
+    lines.append('}')
+    lines.append('')
+    lines.append('# Callbacks of these commands are applied only if command '
+                 'is sent with the')
+    lines.append('# flag: (index of the flag in command arguments, flag)')
+    lines.append('%s = {' % options_name)
+    for cmd, (pos, option) in sorted(options.items()):
+        lines.append("    '%s': (%d, '%s')," % (cmd, pos, option))
+    lines.append('}')
+    return '\n'.join(lines) + '\n' * 3
+
+
 def get_class_source(class_name):
     lines = ['class %s(object):' % class_name, '']
     for cmd, params in sorted(get_commands().items()):
@@ -246,8 +372,10 @@ def get_class_source(class_name):
 
 
 def get_imports():
-    imports = 'from toredis._compat import string_types'
-    return imports + '\n' * 3
+    imports = ['from toredis._compat import string_types',
+               'from toredis.responses import %s' %
+               ', '.join(RESPONSE_FUNCTIONS)]
+    return '\n'.join(imports) + '\n' * 3
 
 
 def compile_commands():
@@ -265,5 +393,9 @@ def compile_commands():
 if __name__ == "__main__":
     with open(os.path.join(os.path.dirname(__file__), 'toredis/commands.py'), 'w') as f:
         f.write(get_imports())
+        f.write(get_key_positions_source('KEY_POSITIONS'))
+        f.write(get_readonly_commands_source('READONLY_COMMANDS'))
+        f.write(get_response_callbacks_source('RESPONSE_CALLBACKS',
+                                              'RESPONSE_OPTIONS'))
         f.write(get_class_source('RedisCommandsMixin'))
         print('Generated commands.py')
@@ -31,4 +31,5 @@ setup(
     packages=['toredis'],
     test_suite='tests.all_tests',
     install_requires=['tornado', 'hiredis'],
+    extras_require={'numpy': ['numpy']},
 )
@@ -3,11 +3,42 @@ import unittest
 from tests.test_client import TestClient
 from tests.test_handler import TestRedis
 from tests.test_pipeline import TestPipeline
+from tests.test_pool import TestConnectionPool
+from tests.test_protocol import TestEncoder
+from tests.test_cluster import TestClusterClient
+from tests.test_sharding import (TestHashRing, TestShardedClient,
+                                 TestShardedPubSub)
+from tests.test_sentinel import TestSentinel
+from tests.test_replication import TestReplicatedClient
+from tests.test_reconnect import TestReconnectingClient
+from tests.test_pubsub import TestPubSub
+from tests.test_scan import TestScanIterator
+from tests.test_bulk import TestBulkLoader
+from tests.test_caching import TestCachingClient
+from tests.test_resp3 import TestResp3
+from tests.test_decoding import TestDecoding
+from tests.test_responses import TestResponses
+from tests.test_arrays import TestArrayClient
 
 TEST_MODULES = [
     "test_client",
     "test_handler",
     "test_pipeline",
+    "test_pool",
+    "test_protocol",
+    "test_cluster",
+    "test_sharding",
+    "test_sentinel",
+    "test_replication",
+    "test_reconnect",
+    "test_pubsub",
+    "test_scan",
+    "test_bulk",
+    "test_caching",
+    "test_resp3",
+    "test_decoding",
+    "test_responses",
+    "test_arrays",
 ]
 
 def all_tests():
@@ -15,4 +46,21 @@ def all_tests():
     suite.addTest(unittest.makeSuite(TestClient))
     suite.addTest(unittest.makeSuite(TestRedis))
     suite.addTest(unittest.makeSuite(TestPipeline))
+    suite.addTest(unittest.makeSuite(TestConnectionPool))
+    suite.addTest(unittest.makeSuite(TestEncoder))
+    suite.addTest(unittest.makeSuite(TestClusterClient))
+    suite.addTest(unittest.makeSuite(TestHashRing))
+    suite.addTest(unittest.makeSuite(TestShardedClient))
+    suite.addTest(unittest.makeSuite(TestShardedPubSub))
+    suite.addTest(unittest.makeSuite(TestSentinel))
+    suite.addTest(unittest.makeSuite(TestReplicatedClient))
+    suite.addTest(unittest.makeSuite(TestReconnectingClient))
+    suite.addTest(unittest.makeSuite(TestPubSub))
+    suite.addTest(unittest.makeSuite(TestScanIterator))
+    suite.addTest(unittest.makeSuite(TestBulkLoader))
+    suite.addTest(unittest.makeSuite(TestCachingClient))
+    suite.addTest(unittest.makeSuite(TestResp3))
+    suite.addTest(unittest.makeSuite(TestDecoding))
+    suite.addTest(unittest.makeSuite(TestResponses))
+    suite.addTest(unittest.makeSuite(TestArrayClient))
     return suite
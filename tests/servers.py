@@ -0,0 +1,352 @@
+"""
+    Minimal redis stand-in servers for tests.
+
+    Servers run in the current process and support a handful of key
+    commands. Cluster stand-in also supports CLUSTER SLOTS, MOVED and ASK
+    redirections, tracking stand-in sends CLIENT TRACKING invalidation
+    messages.
+"""
+import hiredis
+
+from tornado import gen
+from tornado.iostream import StreamClosedError
+from tornado.tcpserver import TCPServer
+from tornado.netutil import bind_sockets
+from tornado.testing import bind_unused_port
+
+from toredis.cluster import key_slot, SLOT_COUNT
+
+
+class Status(bytes):
+    pass
+
+
+class Error(bytes):
+    pass
+
+
+def encode_reply(value):
+    if isinstance(value, Status):
+        return b'+' + value + b'\r\n'
+    if isinstance(value, Error):
+        return b'-' + value + b'\r\n'
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, int):
+        return (':%d\r\n' % value).encode()
+    if isinstance(value, list):
+        return (('*%d\r\n' % len(value)).encode() +
+                b''.join(encode_reply(v) for v in value))
+    return ('$%d\r\n' % len(value)).encode() + value + b'\r\n'
+
+
+def execute_command(data, command):
+    name = command[0].upper()
+
+    if name == b'PING':
+        return Status(b'PONG')
+    if name == b'SELECT':
+        return Status(b'OK')
+    if name == b'GET':
+        return data.get(command[1])
+    if name == b'SET':
+        data[command[1]] = command[2]
+        return Status(b'OK')
+    if name == b'MGET':
+        return [data.get(key) for key in command[1:]]
+    if name == b'MSET':
+        for i in range(1, len(command), 2):
+            data[command[i]] = command[i + 1]
+        return Status(b'OK')
+    if name == b'INCR':
+        data[command[1]] = str(int(data.get(command[1], 0)) + 1).encode()
+        return int(data[command[1]])
+    if name == b'DEL':
+        return len([key for key in command[1:]
+                    if data.pop(key, None) is not None])
+    if name == b'HSET':
+        data.setdefault(command[1], {})[command[2]] = command[3]
+        return 1
+    if name == b'HGET':
+        return data.get(command[1], {}).get(command[2])
+    if name == b'HGETALL':
+        return [item for field, value in data.get(command[1], {}).items()
+                for item in (field, value)]
+
+    return Error(b'ERR unknown command')
+
+
+class StandInNode(TCPServer):
+    def __init__(self, cluster, port=None):
+        super(StandInNode, self).__init__()
+
+        self.cluster = cluster
+        self.data = {}
+        self.commands = []
+        self.streams = set()
+        self.connections = 0
+
+        # Commands received while on hold are not executed nor answered
+        self.hold = False
+
+        if port is None:
+            sock, self.port = bind_unused_port()
+        else:
+            sock, self.port = bind_sockets(port, '127.0.0.1')[0], port
+        self.add_socket(sock)
+
+    @property
+    def address(self):
+        return ('127.0.0.1', self.port)
+
+    @gen.coroutine
+    def handle_stream(self, stream, address):
+        reader = hiredis.Reader()
+        state = {'asking': False, 'stream': stream}
+
+        self.streams.add(stream)
+        self.connections += 1
+        while True:
+            try:
+                data = yield stream.read_bytes(65536, partial=True)
+            except StreamClosedError:
+                self.streams.discard(stream)
+                return
+
+            reader.feed(data)
+
+            replies = []
+            command = reader.gets()
+            while command is not False:
+                self.commands.append(command)
+                if not self.hold:
+                    replies.append(encode_reply(
+                        self.cluster.execute(self, command, state)
+                    ))
+                command = reader.gets()
+
+            if stream.closed():
+                return
+            if replies:
+                stream.write(b''.join(replies))
+
+    def disconnect(self):
+        for stream in list(self.streams):
+            stream.close()
+
+
+class StandInServer(object):
+    """
+        Standalone redis server stand-in
+    """
+    def __init__(self):
+        self.node = StandInNode(self)
+
+    @property
+    def address(self):
+        return self.node.address
+
+    @property
+    def data(self):
+        return self.node.data
+
+    def stop(self):
+        self.node.stop()
+
+    def start(self):
+        # Start listening on the same port again, keeping the data
+        node = StandInNode(self, self.node.port)
+        node.data = self.node.data
+        self.node = node
+
+    def disconnect(self):
+        self.node.disconnect()
+
+    def execute(self, node, command, state):
+        return execute_command(node.data, command)
+
+
+class StandInTrackingServer(StandInServer):
+    """
+        Standalone redis server stand-in supporting CLIENT TRACKING with
+        invalidation messages sent to the redirect connection
+    """
+    def __init__(self):
+        super(StandInTrackingServer, self).__init__()
+
+        self.next_id = 0
+        # Streams subscribed to invalidation messages, by client id
+        self.subscribers = {}
+        # Redirect client ids to notify, by key
+        self.tracked = {}
+
+    def invalidate(self, key):
+        message = encode_reply([b'message', b'__redis__:invalidate', [key]])
+        for client_id in self.tracked.pop(key, ()):
+            stream = self.subscribers.get(client_id)
+            if stream is not None and not stream.closed():
+                stream.write(message)
+
+    def execute(self, node, command, state):
+        if 'id' not in state:
+            self.next_id += 1
+            state['id'] = self.next_id
+
+        name = command[0].upper()
+        if name == b'CLIENT':
+            if command[1].upper() == b'ID':
+                return state['id']
+            # CLIENT TRACKING ON REDIRECT <id>
+            state['redirect'] = int(command[4])
+            return Status(b'OK')
+        if name == b'SUBSCRIBE':
+            self.subscribers[state['id']] = state['stream']
+            return [b'subscribe', command[1], 1]
+
+        if name in (b'SET', b'HSET'):
+            self.invalidate(command[1])
+        elif name == b'DEL':
+            for key in command[1:]:
+                self.invalidate(key)
+        elif 'redirect' in state and name in (b'GET', b'HGET', b'HGETALL'):
+            self.tracked.setdefault(command[1], set()).add(state['redirect'])
+
+        return execute_command(node.data, command)
+
+
+class StandInSentinel(object):
+    """
+        Sentinel stand-in monitoring one master
+    """
+    def __init__(self, service_name, master, replicas=()):
+        self.node = StandInNode(self)
+
+        self.service_name = service_name.encode()
+        self.master = master
+        self.replicas = list(replicas)
+
+        self.subscribers = []
+
+    @property
+    def address(self):
+        return self.node.address
+
+    def stop(self):
+        self.node.stop()
+
+    def switch_master(self, master):
+        old_master = self.master
+        self.master = master
+
+        message = encode_reply([
+            b'message', b'+switch-master',
+            ('%s 127.0.0.1 %d 127.0.0.1 %d' % (
+                self.service_name.decode(), old_master.address[1],
+                master.address[1]
+            )).encode()
+        ])
+        for stream in self.subscribers:
+            if not stream.closed():
+                stream.write(message)
+
+    def execute(self, node, command, state):
+        name = command[0].upper()
+
+        if name == b'SUBSCRIBE':
+            self.subscribers.append(state['stream'])
+            return [b'subscribe', command[1], 1]
+
+        if name != b'SENTINEL':
+            return Error(b'ERR unknown command')
+
+        if command[2] != self.service_name:
+            return None
+
+        subcommand = command[1].lower()
+        if subcommand == b'get-master-addr-by-name':
+            return [b'127.0.0.1', str(self.master.address[1]).encode()]
+        if subcommand == b'slaves':
+            return [[b'ip', b'127.0.0.1',
+                     b'port', str(replica.address[1]).encode(),
+                     b'flags', b'slave']
+                    for replica in self.replicas]
+
+        return Error(b'ERR unknown subcommand')
+
+
+class StandInCluster(object):
+    """
+        Cluster of stand-in nodes. Slots are split evenly between nodes.
+    """
+    def __init__(self, num_nodes=3):
+        self.nodes = [StandInNode(self) for _ in range(num_nodes)]
+
+        self.slots = []
+        for slot in range(SLOT_COUNT):
+            self.slots.append(self.nodes[slot * num_nodes // SLOT_COUNT])
+
+        # slot -> node the slot is migrating to
+        self.migrating = {}
+
+    @property
+    def startup_nodes(self):
+        return [node.address for node in self.nodes]
+
+    def stop(self):
+        for node in self.nodes:
+            node.stop()
+
+    def node_for_key(self, key):
+        return self.slots[key_slot(key)]
+
+    def move_slot(self, slot, node):
+        """
+            Move slot with all its keys to another node
+        """
+        old_node = self.slots[slot]
+        for key in list(old_node.data):
+            if key_slot(key) == slot:
+                node.data[key] = old_node.data.pop(key)
+        self.slots[slot] = node
+
+    def execute(self, node, command, state):
+        name = command[0].upper()
+
+        if name == b'CLUSTER' and command[1].upper() == b'SLOTS':
+            return self._cluster_slots()
+        if name == b'ASKING':
+            state['asking'] = True
+            return Status(b'OK')
+        if name == b'PING':
+            return Status(b'PONG')
+
+        asking = state['asking']
+        state['asking'] = False
+
+        keys = command[1:2] if name != b'MGET' else command[1:]
+        slots = set(key_slot(key) for key in keys)
+        if len(slots) > 1:
+            return Error(b"CROSSSLOT Keys in request don't hash to the same slot")
+
+        slot = slots.pop()
+        owner = self.slots[slot]
+        target = self.migrating.get(slot)
+
+        if owner is node:
+            if target is not None and any(k not in node.data for k in keys):
+                return Error(('ASK %d 127.0.0.1:%d' % (slot, target.port)).encode())
+        elif not (asking and target is node):
+            return Error(('MOVED %d 127.0.0.1:%d' % (slot, owner.port)).encode())
+
+        return execute_command(node.data, command)
+
+    def _cluster_slots(self):
+        result = []
+        start = 0
+        for slot in range(1, SLOT_COUNT + 1):
+            if slot == SLOT_COUNT or self.slots[slot] is not self.slots[start]:
+                node = self.slots[start]
+                result.append([start, slot - 1,
+                               [b'127.0.0.1', node.port, b'id']])
+                start = slot
+        return result
@@ -0,0 +1,84 @@
+import unittest
+
+from tornado.testing import AsyncTestCase
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+else:
+    from toredis.arrays import ArrayClient, encode_values, to_score_arrays
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestArrayClient(AsyncTestCase):
+
+    def setUp(self):
+        super(TestArrayClient, self).setUp()
+        self.client = ArrayClient(io_loop=self.io_loop)
+        self.client.connect(callback=self.stop)
+        self.wait()
+
+        self.client.delete('arrays:list')
+        self.client.delete('arrays:zset', callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        self.client.close()
+        super(TestArrayClient, self).tearDown()
+
+    def test_rpush(self):
+        self.client.rpush_array('arrays:list', numpy.array([1.5, -2, 1e-07]))
+        self.client.rpush_array('arrays:list', numpy.arange(3))
+        self.client.lrange('arrays:list', 0, -1, callback=self.stop)
+
+        result = self.wait()
+        self.assertEqual(result.dtype, numpy.float64)
+        self.assertEqual(result.tolist(), [1.5, -2, 1e-07, 0, 1, 2])
+
+    def test_zadd(self):
+        members = [b'a', b'b\x00', b'c']
+        scores = numpy.array([0.1, float('inf'), -3])
+        self.client.zadd_array('arrays:zset', members, scores,
+                               callback=self.stop)
+        self.assertEqual(self.wait(), 3)
+
+        self.client.zrange('arrays:zset', 0, -1, withscores=True,
+                           callback=self.stop)
+        members, scores = self.wait()
+        self.assertEqual(members.tolist(), [b'c', b'a', b'b\x00'])
+        self.assertEqual(scores.dtype, numpy.float64)
+        self.assertEqual(scores.tolist(), [-3, 0.1, float('inf')])
+
+        # Members are returned as they are without WITHSCORES
+        self.client.zrange('arrays:zset', 0, 0, callback=self.stop)
+        self.assertEqual(self.wait(), [b'c'])
+
+        self.assertRaises(ValueError, self.client.zadd_array, 'arrays:zset',
+                          [b'a'], [1, 2])
+        self.assertRaises(ValueError, self.client.zadd_array, 'arrays:zset',
+                          [b'a', b'b'], [1, float('nan')])
+
+    def test_not_numeric(self):
+        self.client.rpush('arrays:list', 'foo')
+        self.client.lrange('arrays:list', 0, -1, callback=self.stop)
+        self.assertIsInstance(self.wait(), ValueError)
+
+        self.client.mget(['arrays:missing'], callback=self.stop)
+        self.assertTrue(numpy.isnan(self.wait()[0]))
+
+    def test_helpers(self):
+        self.assertEqual(encode_values(numpy.array([1, 2])), [b'1', b'2'])
+        self.assertEqual(encode_values(['a', 'b']), ['a', 'b'])
+        self.assertEqual(encode_values((b'a\x00', 1)), [b'a\x00', 1])
+        for values in (numpy.array([True]), numpy.array([b'a']),
+                       numpy.array([1j])):
+            self.assertRaises(ValueError, encode_values, values)
+
+        members, scores = to_score_arrays([[b'a', 1.5]])
+        self.assertEqual(members.tolist(), [b'a'])
+        self.assertEqual(scores.tolist(), [1.5])
+
+        members, scores = to_score_arrays([])
+        self.assertEqual(len(members), 0)
+        self.assertEqual(len(scores), 0)
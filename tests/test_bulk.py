@@ -0,0 +1,112 @@
+from tornado.testing import AsyncTestCase
+
+from toredis.client import Client
+
+from tests.servers import StandInServer
+
+
+class TestBulkLoader(AsyncTestCase):
+
+    def setUp(self):
+        super(TestBulkLoader, self).setUp()
+        self.server = StandInServer()
+
+        self.client = Client(io_loop=self.io_loop)
+        self.client.connect(*self.server.address, callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        if self.client.is_connected():
+            self.client.close()
+        self.server.stop()
+        super(TestBulkLoader, self).tearDown()
+
+    def wait_for(self, condition):
+        def check():
+            if condition():
+                self.stop()
+            else:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, check)
+
+        check()
+        self.wait()
+
+    def test_load(self):
+        commands = (['SET', 'key%d' % i, i] for i in range(10000))
+        self.client.bulk_load(commands, chunk_size=300, window=4,
+                              callback=self.stop)
+        result = self.wait()
+
+        self.assertEqual(result.sent, 10000)
+        self.assertEqual(result.succeeded, 10000)
+        self.assertEqual(result.failed, 0)
+        self.assertEqual(len(self.server.data), 10000)
+        self.assertEqual(self.server.data[b'key9999'], b'9999')
+
+    def test_errors(self):
+        def commands():
+            for i in range(100):
+                if i % 10 == 5:
+                    yield ['UNKNOWN', i]
+                else:
+                    yield ['SET', 'key%d' % i, i]
+
+        self.client.bulk_load(commands(), chunk_size=30, callback=self.stop)
+        result = self.wait()
+
+        self.assertEqual(result.succeeded, 90)
+        self.assertEqual(result.failed, 10)
+        self.assertEqual([index for index, _ in result.errors],
+                         list(range(5, 100, 10)))
+        self.assertTrue(all(isinstance(error, Exception)
+                            for _, error in result.errors))
+
+    def test_window(self):
+        results = []
+        self.server.node.hold = True
+        commands = (['SET', 'key%d' % i, i] for i in range(1000))
+        self.client.bulk_load(commands, chunk_size=10, window=3,
+                              callback=results.append)
+
+        # Only commands of the first chunks are sent
+        self.wait_for(lambda: len(self.server.node.commands) == 30)
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05, self.stop)
+        self.wait()
+        self.assertEqual(len(self.server.node.commands), 30)
+
+        # Connection loss stops the load
+        self.server.disconnect()
+        self.wait_for(lambda: results)
+        self.assertEqual(results[0].sent, 30)
+        self.assertEqual(results[0].lost, 30)
+        self.assertEqual(results[0].succeeded, 0)
+
+    def test_generator_error(self):
+        def commands():
+            yield ['SET', 'foo', 'bar']
+            raise RuntimeError('Failed')
+
+        self.client.bulk_load(commands(), chunk_size=1, callback=self.stop)
+        result = self.wait()
+
+        self.assertEqual(result.succeeded, 1)
+        self.assertIsInstance(result.exception, RuntimeError)
+
+    def test_encoding_error(self):
+        def commands():
+            for i in range(25):
+                yield ['SET', 'key%d' % i, i if i != 15 else u'\ud800']
+
+        self.client.bulk_load(commands(), chunk_size=10, callback=self.stop)
+        result = self.wait()
+
+        # Chunk with the bad command is not sent at all
+        self.assertIsInstance(result.exception, UnicodeEncodeError)
+        self.assertEqual(result.sent, 10)
+        self.assertEqual(result.succeeded, 10)
+        self.assertEqual(result.rejected, 10)
+        self.assertNotIn(b'key10', self.server.data)
+
+        # Client is still usable after the failed load
+        self.client.get('key9', callback=self.stop)
+        self.assertEqual(self.wait(), b'9')
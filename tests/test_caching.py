@@ -0,0 +1,139 @@
+from tornado.testing import AsyncTestCase
+
+from toredis.caching import CachingClient
+from toredis.client import Client
+
+from tests.servers import StandInServer, StandInTrackingServer
+
+
+class TestCachingClient(AsyncTestCase):
+
+    def setUp(self):
+        super(TestCachingClient, self).setUp()
+        self.server = StandInTrackingServer()
+        self.server.data[b'foo'] = b'bar'
+        self.server.data[b'hash'] = {b'field': b'value'}
+
+        self.client = CachingClient(io_loop=self.io_loop, max_entries=3)
+        self.client.connect(*self.server.address, callback=self.stop)
+        self.wait()
+
+        self.writer = Client(io_loop=self.io_loop)
+        self.writer.connect(*self.server.address)
+
+    def tearDown(self):
+        if self.client.is_connected():
+            self.client.close()
+        self.writer.close()
+        self.server.stop()
+        super(TestCachingClient, self).tearDown()
+
+    def wait_for(self, condition):
+        def check():
+            if condition():
+                self.stop()
+            else:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, check)
+
+        check()
+        self.wait()
+
+    def get(self, key):
+        self.client.get(key, callback=self.stop)
+        return self.wait()
+
+    def test_cache(self):
+        self.assertTrue(self.client.is_caching())
+
+        self.assertEqual(self.get('foo'), b'bar')
+        self.assertEqual(self.get('foo'), b'bar')
+        self.client.hget('hash', 'field', callback=self.stop)
+        self.assertEqual(self.wait(), b'value')
+        self.client.hget('hash', 'field', callback=self.stop)
+        self.assertEqual(self.wait(), b'value')
+
+        self.assertEqual(self.client.hits, 2)
+        self.assertEqual(self.client.misses, 2)
+        self.assertEqual(len([c for c in self.server.node.commands
+                              if c[0] in (b'GET', b'HGET')]), 2)
+
+    def test_invalidation(self):
+        self.assertEqual(self.get('foo'), b'bar')
+
+        self.writer.set('foo', 'baz')
+        self.wait_for(lambda: self.client.cache_size() == 0)
+
+        self.assertEqual(self.get('foo'), b'baz')
+        self.assertEqual(self.client.misses, 2)
+
+    def test_invalidation_int_key(self):
+        self.server.data[b'42'] = b'old'
+        self.assertEqual(self.get(42), b'old')
+
+        # Key is invalidated by its name as sent to redis
+        self.writer.set('42', 'new')
+        self.wait_for(lambda: self.client.cache_size() == 0)
+        self.assertEqual(self.get(42), b'new')
+
+    def test_lru(self):
+        for key in ('a', 'b', 'c'):
+            self.server.data[key.encode()] = key.encode()
+            self.get(key)
+
+        # Touch 'a', so 'b' is evicted first
+        self.get('a')
+        self.server.data[b'd'] = b'd'
+        self.get('d')
+
+        self.assertEqual(self.client.cache_size(), 3)
+        self.assertEqual(self.client.evictions, 1)
+        self.assertNotIn(('GET', 'b'), self.client._cache)
+        self.assertIn(('GET', 'a'), self.client._cache)
+
+    def test_same_command_in_flight(self):
+        for key in ('a', 'b'):
+            self.server.data[key.encode()] = key.encode()
+            self.get(key)
+
+        # Responses of both commands are stored under the same entry
+        results = []
+        self.client.get('foo', callback=results.append)
+        self.client.get('foo', callback=results.append)
+        self.wait_for(lambda: len(results) == 2)
+
+        self.assertEqual(results, [b'bar', b'bar'])
+        self.assertEqual(self.client.cache_size(), 3)
+        self.assertEqual(self.client.evictions, 0)
+
+    def test_max_entries(self):
+        self.assertRaises(ValueError, CachingClient, max_entries=0)
+
+    def test_invalidated_in_flight(self):
+        self.server.node.hold = True
+        self.client.get('foo', callback=self.stop)
+        self.wait_for(lambda: self.server.node.commands[-1][0] == b'GET')
+
+        # Invalidation received while response is in flight
+        self.client._invalidate([b'foo'])
+        self.client._on_read(b'$3\r\nbar\r\n')
+        self.assertEqual(self.wait(), b'bar')
+        self.assertEqual(self.client.cache_size(), 0)
+
+    def test_invalidation_connection_lost(self):
+        self.get('foo')
+        self.client._invalidation_client._stream.close()
+        self.wait_for(lambda: not self.client.is_caching())
+
+        self.assertEqual(self.client.cache_size(), 0)
+        self.assertEqual(self.get('foo'), b'bar')
+        self.assertEqual(self.client.cache_size(), 0)
+
+    def test_tracking_not_supported(self):
+        server = StandInServer()
+        client = CachingClient(io_loop=self.io_loop)
+        client.connect(*server.address, callback=self.stop)
+        self.wait()
+
+        self.assertFalse(client.is_caching())
+        client.close()
+        server.stop()
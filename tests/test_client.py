@@ -1,6 +1,6 @@
-from tornado.testing import AsyncTestCase
+from tornado.testing import AsyncTestCase, gen_test
 import time
-from toredis.client import Client
+from toredis.client import BackpressureError, Client, CommandTimeoutError
 from tornado import gen
 
 class TestClient(AsyncTestCase):
@@ -130,3 +130,177 @@ class TestClient(AsyncTestCase):
         client.close()
         with self.assertRaises(IOError):
             client._stream.read_bytes(1024, lambda x: x)
+
+    def test_coalesce_writes(self):
+        client = Client(io_loop=self.io_loop, coalesce_writes=True)
+        client.connect(callback=self.stop)
+        self.wait()
+
+        result = []
+
+        def callback(response):
+            result.append(response)
+            self.stop()
+
+        for i in range(50):
+            client.set('foo%d' % i, i)
+        for i in range(50):
+            client.get('foo%d' % i, callback=callback)
+
+        # Nothing is written until next IOLoop iteration
+        self.assertTrue(client._encoder.pending_size() > 0)
+
+        self.wait(lambda: len(result) == 50)
+        self.assertEqual(result, [str(i).encode() for i in range(50)])
+        self.assertEqual(client._encoder.pending_size(), 0)
+
+    def test_coalesce_threshold(self):
+        client = Client(io_loop=self.io_loop, coalesce_writes=True,
+                        coalesce_threshold=100)
+        client.connect(callback=self.stop)
+        self.wait()
+
+        client.set('foo', 'x' * 50)
+        self.assertTrue(client._encoder.pending_size() > 0)
+        client.set('foo', 'x' * 50)
+        self.assertEqual(client._encoder.pending_size(), 0)
+
+        client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'x' * 50)
+
+    @gen_test
+    def test_future(self):
+        client = Client(io_loop=self.io_loop)
+        client.connect()
+
+        result = yield client.set('foo', 'bar')
+        self.assertEqual(result, b'OK')
+
+        result = yield client.get('foo')
+        self.assertEqual(result, b'bar')
+
+    @gen_test
+    def test_future_pipeline(self):
+        client = Client(io_loop=self.io_loop)
+        client.connect()
+
+        pipeline = client.pipeline()
+        pipeline.set('foo', 'bar')
+        pipeline.get('foo')
+        result = yield pipeline.send()
+        self.assertEqual(result, [b'OK', b'bar'])
+
+    @gen_test
+    def test_future_disconnect(self):
+        client = Client(io_loop=self.io_loop)
+        client.connect()
+
+        future = client.blpop('empty_list', 0)
+        client._stream.close()
+        result = yield future
+        self.assertIsNone(result)
+
+    def test_command_timeout(self):
+        client = Client(io_loop=self.io_loop, command_timeout=0.1)
+        client.connect()
+
+        results = []
+        client.blpop('empty_list', 0, callback=results.append)
+        client.with_timeout(10).get('foo', callback=results.append)
+
+        client.ping(callback=self.stop)
+        self.assertIsInstance(self.wait(), CommandTimeoutError)
+
+        # Responses can not be matched anymore, so connection is closed and
+        # commands which did not time out are completed once it is
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05, self.stop)
+        self.wait()
+        self.assertIsInstance(results[0], CommandTimeoutError)
+        self.assertIsNone(results[1])
+        self.assertFalse(client.is_connected())
+
+    def test_with_timeout(self):
+        client = Client(io_loop=self.io_loop)
+        client.connect()
+
+        client.with_timeout(0.05).ping(callback=self.stop)
+        self.assertEqual(self.wait(), b'PONG')
+
+        # Completed command does not time out
+        self.io_loop.add_timeout(self.io_loop.time() + 0.1, self.stop)
+        self.wait()
+        self.assertTrue(client.is_connected())
+
+        pipeline = client.with_timeout(0.1).pipeline()
+        pipeline.ping()
+        pipeline.blpop('empty_list', 0)
+        pipeline.send(callback=self.stop)
+        self.assertIsInstance(self.wait(), CommandTimeoutError)
+
+    def test_max_pending(self):
+        client = Client(io_loop=self.io_loop, max_pending=2)
+        client.connect()
+
+        client.get('foo')
+        client.get('foo')
+        self.assertFalse(client.has_capacity())
+        with self.assertRaises(BackpressureError):
+            client.get('foo')
+
+        client.wait_for_capacity(callback=self.stop)
+        self.assertTrue(self.wait())
+        self.assertTrue(client.has_capacity())
+
+    def test_max_buffer_size(self):
+        client = Client(io_loop=self.io_loop, max_buffer_size=10)
+        client.connect()
+
+        # Commands are buffered until connection is established
+        client.set('foo', 'x' * 50)
+        with self.assertRaises(BackpressureError):
+            client.set('foo', 'x' * 50)
+
+        client.wait_for_capacity(callback=self.stop)
+        self.assertTrue(self.wait())
+
+        client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'x' * 50)
+
+    def test_wait_for_capacity_disconnect(self):
+        client = Client(io_loop=self.io_loop, max_pending=1)
+        client.connect()
+
+        client.blpop('empty_list', 0)
+        client.wait_for_capacity(callback=self.stop)
+        client._stream.close()
+        self.assertIsNone(self.wait())
+
+    def test_pipeline_replies(self):
+        client = Client(io_loop=self.io_loop)
+        client._reset()
+
+        results = []
+        client.callbacks.append((results.append, (4, [])))
+        client.callbacks.append((results.append, None))
+
+        # Replies of one pipeline split between reads, integer zero
+        # replies do not stop reading
+        client._on_read(b':0\r\n:0\r\n$3\r\nfo')
+        self.assertEqual(results, [])
+        client._on_read(b'o\r\n:0\r\n+OK\r\n')
+        self.assertEqual(results, [[0, 0, b'foo', 0], b'OK'])
+
+    def test_failed_pipeline_dropped(self):
+        client = Client(io_loop=self.io_loop)
+        client.connect(callback=self.stop)
+        self.wait()
+
+        client.set('foo', 'bar')
+        with self.assertRaises(UnicodeEncodeError):
+            client.send_messages([['SET', 'foo', 'baz'],
+                                  ['SET', 'foo', u'\ud800']])
+
+        # Commands of the failed pipeline are not sent
+        client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'bar')
+        client.close()
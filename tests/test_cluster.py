@@ -0,0 +1,146 @@
+from tornado.testing import AsyncTestCase, gen_test
+
+from toredis.cluster import ClusterClient, key_slot
+
+from tests.servers import StandInCluster
+
+
+class TestClusterClient(AsyncTestCase):
+
+    def setUp(self):
+        super(TestClusterClient, self).setUp()
+        self.cluster = StandInCluster()
+        self.client = ClusterClient(self.cluster.startup_nodes,
+                                    io_loop=self.io_loop)
+
+    def tearDown(self):
+        self.client.close()
+        self.cluster.stop()
+        super(TestClusterClient, self).tearDown()
+
+    def test_key_slot(self):
+        self.assertEqual(key_slot('123456789'), 0x31c3)
+        self.assertEqual(key_slot(b'foo'), 12182)
+        self.assertEqual(key_slot('{user1000}.following'),
+                         key_slot('{user1000}.followers'))
+        self.assertEqual(key_slot('foo{}{bar}'), 8363)
+
+    def test_connect(self):
+        self.client.connect(callback=self.stop)
+        self.wait()
+        self.assertTrue(self.client.is_ready())
+
+    @gen_test
+    def test_routing(self):
+        for i in range(20):
+            result = yield self.client.set('key%d' % i, 'value%d' % i)
+            self.assertEqual(result, b'OK')
+
+        for i in range(20):
+            node = self.cluster.node_for_key('key%d' % i)
+            self.assertEqual(node.data[b'key%d' % i], b'value%d' % i)
+
+            result = yield self.client.get('key%d' % i)
+            self.assertEqual(result, b'value%d' % i)
+
+        # Keys were spread across all nodes
+        for node in self.cluster.nodes:
+            self.assertTrue(node.data)
+
+    @gen_test
+    def test_hash_tags(self):
+        yield self.client.set('{user}.a', '1')
+        yield self.client.set('{user}.b', '2')
+        result = yield self.client.mget(['{user}.a', '{user}.b'])
+        self.assertEqual(result, [b'1', b'2'])
+
+    @gen_test
+    def test_moved(self):
+        yield self.client.set('foo', 'bar')
+
+        slot = key_slot('foo')
+        old_node = self.cluster.slots[slot]
+        new_node = [n for n in self.cluster.nodes if n is not old_node][0]
+        self.cluster.move_slot(slot, new_node)
+
+        result = yield self.client.get('foo')
+        self.assertEqual(result, b'bar')
+        self.assertEqual(self.client.get_node_address(['GET', 'foo']),
+                         new_node.address)
+
+    @gen_test
+    def test_ask(self):
+        yield self.client.set('foo', 'bar')
+
+        slot = key_slot('foo')
+        old_node = self.cluster.slots[slot]
+        new_node = [n for n in self.cluster.nodes if n is not old_node][0]
+        self.cluster.migrating[slot] = new_node
+        new_node.data[b'foo'] = old_node.data.pop(b'foo')
+
+        result = yield self.client.get('foo')
+        self.assertEqual(result, b'bar')
+        self.assertEqual(new_node.commands[-2:], [[b'ASKING'], [b'GET', b'foo']])
+
+        # Slot map is not changed by ASK redirection
+        self.assertEqual(self.client.get_node_address(['GET', 'foo']),
+                         old_node.address)
+
+    @gen_test
+    def test_keyless_command(self):
+        result = yield self.client.ping()
+        self.assertEqual(result, b'PONG')
+
+    def test_unsupported_command(self):
+        with self.assertRaises(ValueError):
+            self.client.subscribe('foo')
+
+    @gen_test
+    def test_pipeline(self):
+        pipeline = self.client.pipeline()
+        for i in range(20):
+            pipeline.set('key%d' % i, 'value%d' % i)
+        for i in range(20):
+            pipeline.get('key%d' % i)
+        result = yield pipeline.send()
+
+        self.assertEqual(
+            result, [b'OK'] * 20 + [b'value%d' % i for i in range(20)]
+        )
+
+        # Every node executed commands for its own keys only
+        for node in self.cluster.nodes:
+            commands = [c for c in node.commands if c[0] != b'CLUSTER']
+            self.assertTrue(node.data)
+            self.assertEqual(len(commands), 2 * len(node.data))
+
+    def test_pipeline_node_lost(self):
+        self.client.connect(callback=self.stop)
+        self.wait()
+
+        node = self.cluster.nodes[0]
+        node.hold = True
+
+        pipeline = self.client.pipeline()
+        for i in range(20):
+            pipeline.set('key%d' % i, 'value%d' % i)
+        pipeline.send(callback=self.stop)
+
+        # Other nodes respond, then connection to the held node is lost
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05, node.disconnect)
+        self.assertIsNone(self.wait())
+
+    @gen_test
+    def test_pipeline_moved(self):
+        yield self.client.set('foo', 'bar')
+
+        slot = key_slot('foo')
+        old_node = self.cluster.slots[slot]
+        new_node = [n for n in self.cluster.nodes if n is not old_node][0]
+        self.cluster.move_slot(slot, new_node)
+
+        pipeline = self.client.pipeline()
+        pipeline.get('foo')
+        pipeline.incr('counter')
+        result = yield pipeline.send()
+        self.assertEqual(result, [b'bar', 1])
@@ -0,0 +1,162 @@
+from tornado.testing import AsyncTestCase
+
+from toredis.caching import CachingClient
+from toredis.client import Client
+
+from tests.test_resp3 import NullStream, encode_push
+
+
+class TestDecoding(AsyncTestCase):
+
+    def make_client(self, **kwargs):
+        # Responses are fed to the client directly
+        client = Client(io_loop=self.io_loop, encoding='utf-8', **kwargs)
+        client._reset()
+        client._stream = NullStream()
+        return client
+
+    def test_decode(self):
+        client = Client(io_loop=self.io_loop, encoding='utf-8')
+        client.connect(callback=self.stop)
+        self.wait()
+
+        client.set('decoding:foo', u'b\xe4r')
+        client.set('decoding:bin', b'\xff\xfe')
+        client.get('decoding:foo', callback=self.stop)
+        self.assertEqual(self.wait(), u'b\xe4r')
+
+        client.mget(['decoding:foo', 'decoding:foo'], callback=self.stop)
+        self.assertEqual(self.wait(), [u'b\xe4r', u'b\xe4r'])
+
+        client.with_bytes().get('decoding:bin', callback=self.stop)
+        self.assertEqual(self.wait(), b'\xff\xfe')
+
+        client.get('decoding:foo', callback=self.stop)
+        self.assertEqual(self.wait(), u'b\xe4r')
+        client.close()
+
+    def test_with_bytes(self):
+        client = self.make_client()
+
+        results = []
+        client.get('a', callback=results.append)
+        client.with_bytes().get('b', callback=results.append)
+        pipeline = client.with_bytes().pipeline()
+        pipeline.get('c')
+        pipeline.get('d')
+        pipeline.send(callback=results.append)
+        client.get('e', callback=results.append)
+
+        client._on_read(b'$1\r\na\r\n$1\r\nb\r\n$1\r\nc\r\n')
+        client._on_read(b'$1\r\nd\r\n$1\r\ne\r\n')
+
+        self.assertEqual(results, ['a', b'b', [b'c', b'd'], 'e'])
+
+    def test_decode_error(self):
+        client = self.make_client()
+
+        results = []
+        client.get('a', callback=results.append)
+        pipeline = client.pipeline()
+        pipeline.get('b')
+        pipeline.get('c')
+        pipeline.send(callback=results.append)
+        client.get('d', callback=results.append)
+
+        client._on_read(b'$1\r\n\xff\r\n$1\r\nb\r\n$1\r\n\xff\r\n$1\r\nd\r\n')
+
+        # Replies which can not be decoded do not break following ones
+        self.assertIsInstance(results[0], UnicodeDecodeError)
+        self.assertEqual(results[1][0], 'b')
+        self.assertIsInstance(results[1][1], UnicodeDecodeError)
+        self.assertEqual(results[2], 'd')
+
+    def test_errors(self):
+        client = self.make_client(encoding_errors='replace')
+
+        client.get('a', callback=self.stop)
+        client._on_read(b'$2\r\n\xffa\r\n')
+        self.assertEqual(self.wait(), u'\ufffda')
+
+    def test_pubsub(self):
+        client = self.make_client()
+
+        messages = []
+        client.subscribe('foo', messages.append)
+        client._on_read(b'*3\r\n$9\r\nsubscribe\r\n$3\r\nfoo\r\n:1\r\n'
+                        b'*3\r\n$7\r\nmessage\r\n$3\r\nfoo\r\n$1\r\n\xff\r\n')
+
+        # Pub/sub messages are not decoded
+        self.assertEqual(messages[1], [b'message', b'foo', b'\xff'])
+
+        client.unsubscribe('foo')
+        client._on_read(b'*3\r\n$11\r\nunsubscribe\r\n$3\r\nfoo\r\n:0\r\n')
+        self.assertFalse(client.is_subscribed())
+
+        client.get('foo', callback=self.stop)
+        client._on_read(b'$3\r\nbar\r\n')
+        self.assertEqual(self.wait(), 'bar')
+
+    def test_resp3_pubsub(self):
+        client = self.make_client(protocol=3,
+                                  encoding_errors='surrogateescape')
+        client._resp3 = True
+
+        messages = []
+        pubsub = client.pubsub()
+        pubsub.subscribe('foo', lambda channel, data:
+                         messages.append((channel, data)))
+        future = client.unsubscribe('foo')
+
+        client._on_read(encode_push(b'subscribe', b'foo', 1) +
+                        encode_push(b'message', b'foo', b'bar') +
+                        encode_push(b'unsubscribe', b'foo', 0))
+
+        # Channel names are kept as bytes, data is decoded
+        self.assertEqual(messages, [(b'foo', 'bar')])
+        self.assertEqual(future.result(), ['unsubscribe', 'foo', 0])
+        self.assertFalse(client.is_subscribed())
+
+    def test_resp3_strict(self):
+        # Push messages are not replies, so their decoding errors can not
+        # be passed to commands
+        self.assertRaises(ValueError, Client, protocol=3, encoding='utf-8')
+
+    def test_resp3_binary_push(self):
+        client = self.make_client(protocol=3,
+                                  encoding_errors='surrogateescape')
+        client._resp3 = True
+
+        messages = []
+        results = []
+        pubsub = client.pubsub()
+        pubsub.subscribe(b'\xffch', lambda channel, data:
+                         messages.append((channel, data)))
+        client.get('a', callback=results.append)
+        client.get('b', callback=results.append)
+
+        client._on_read(encode_push(b'subscribe', b'\xffch', 1) +
+                        b'$1\r\na\r\n' +
+                        encode_push(b'message', b'\xffch', b'\xff') +
+                        b'$1\r\nb\r\n')
+
+        # Binary channel names are restored, commands get their own replies
+        self.assertEqual(messages, [(b'\xffch', u'\udcff')])
+        self.assertEqual(results, ['a', 'b'])
+
+    def test_resp3_binary_invalidation(self):
+        client = CachingClient(io_loop=self.io_loop, protocol=3,
+                               encoding='utf-8',
+                               encoding_errors='surrogateescape')
+        client._reset()
+        client._resp3 = True
+        client._tracking = True
+        client._stream = NullStream()
+
+        client.get(b'\xff', callback=self.stop)
+        client._on_read(b'$3\r\nbar\r\n')
+        self.assertEqual(self.wait(), 'bar')
+        self.assertEqual(client.cache_size(), 1)
+
+        client._on_read(b'>2\r\n$10\r\ninvalidate\r\n*1\r\n$1\r\n\xff\r\n')
+        self.assertEqual(client.cache_size(), 0)
@@ -0,0 +1,104 @@
+from tornado.testing import AsyncTestCase, gen_test
+
+from toredis.client import CommandTimeoutError
+from toredis.pool import ConnectionPool
+
+
+class TestConnectionPool(AsyncTestCase):
+
+    def setUp(self):
+        super(TestConnectionPool, self).setUp()
+        self.pool = ConnectionPool(max_connections=2, io_loop=self.io_loop)
+
+    def tearDown(self):
+        self.pool.close()
+        super(TestConnectionPool, self).tearDown()
+
+    def test_send_command(self):
+        self.pool.set('foo', 'bar', callback=self.stop)
+        self.assertEqual(self.wait(), b'OK')
+
+        self.pool.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'bar')
+
+        # Connection was reused
+        self.assertEqual(self.pool.size(), 1)
+        self.assertEqual(self.pool.idle_size(), 1)
+
+    def test_max_connections(self):
+        result = []
+
+        def callback(response):
+            result.append(response)
+            self.stop()
+
+        for i in range(10):
+            self.pool.ping(callback=callback)
+
+        self.assertEqual(self.pool.size(), 2)
+
+        self.wait(lambda: len(result) == 10)
+        self.assertEqual(result, [b'PONG'] * 10)
+        self.assertEqual(self.pool.idle_size(), 2)
+
+    def test_acquire_release(self):
+        clients = []
+
+        def acquired(client):
+            clients.append(client)
+            client.set('foo', 'bar')
+            client.get('foo', callback=self.stop)
+
+        self.pool.acquire(acquired)
+        self.assertEqual(self.wait(), b'bar')
+
+        # Released automatically once idle
+        self.assertEqual(self.pool.idle_size(), 1)
+
+        self.pool.acquire(clients.append)
+        self.assertIs(clients[0], clients[1])
+
+    @gen_test
+    def test_future(self):
+        result = yield self.pool.set('foo', 'bar')
+        self.assertEqual(result, b'OK')
+
+        result = yield self.pool.get('foo')
+        self.assertEqual(result, b'bar')
+
+    def test_pipeline(self):
+        pipeline = self.pool.pipeline()
+        pipeline.set('foo', 'bar')
+        pipeline.get('foo')
+        pipeline.send(callback=self.stop)
+        self.assertEqual(self.wait(), [b'OK', b'bar'])
+
+    def test_idle_reaping(self):
+        self.pool.idle_timeout = 0.1
+
+        self.pool.ping(callback=self.stop)
+        self.wait()
+        self.assertEqual(self.pool.size(), 1)
+
+        self.io_loop.add_timeout(self.io_loop.time() + 0.3, self.stop)
+        self.wait()
+        self.assertEqual(self.pool.size(), 0)
+
+    def test_connection_failure(self):
+        pool = ConnectionPool(port=1, io_loop=self.io_loop)
+        pool.get('foo', callback=self.stop)
+        self.assertIsNone(self.wait())
+        self.assertEqual(pool.size(), 0)
+
+    def test_command_timeout(self):
+        pool = ConnectionPool(command_timeout=0.1, io_loop=self.io_loop)
+
+        pool.blpop('empty_list', 0, callback=self.stop)
+        self.assertIsInstance(self.wait(), CommandTimeoutError)
+
+        # Timed out connection is replaced
+        pool.ping(callback=self.stop)
+        self.assertEqual(self.wait(), b'PONG')
+        self.assertEqual(pool.size(), 1)
+
+        pool.close()
@@ -0,0 +1,94 @@
+from unittest import TestCase
+
+from toredis.protocol import Encoder, COPY_THRESHOLD
+
+
+class TestEncoder(TestCase):
+
+    def setUp(self):
+        self.encoder = Encoder()
+
+    def test_encode(self):
+        self.assertEqual(
+            self.encoder.encode(['SET', 'foo', b'bar', 10, 1.5]),
+            b'*5\r\n$3\r\nSET\r\n$3\r\nfoo\r\n$3\r\nbar\r\n'
+            b'$2\r\n10\r\n$3\r\n1.5\r\n'
+        )
+
+    def test_encode_text(self):
+        self.assertEqual(
+            self.encoder.encode([u'SET', u'ключ']),
+            b'*2\r\n$3\r\nSET\r\n$8\r\n'
+            b'\xd0\xba\xd0\xbb\xd1\x8e\xd1\x87\r\n'
+        )
+
+    def test_encode_buffers(self):
+        self.assertEqual(
+            self.encoder.encode(['SET', bytearray(b'foo'), memoryview(b'bar')]),
+            b'*3\r\n$3\r\nSET\r\n$3\r\nfoo\r\n$3\r\nbar\r\n'
+        )
+
+    def test_encode_strided_buffer(self):
+        self.assertEqual(
+            self.encoder.encode(['SET', 'foo', memoryview(b'b-a-r')[::2]]),
+            b'*3\r\n$3\r\nSET\r\n$3\r\nfoo\r\n$3\r\nbar\r\n'
+        )
+
+        # Big non-contiguous views are copied as well
+        value = memoryview(b'x-' * (COPY_THRESHOLD + 1))[::2]
+        self.encoder.pack(['SET', 'foo', value])
+        chunks = self.encoder.get_chunks()
+        self.assertEqual(chunks[1], b'x' * (COPY_THRESHOLD + 1))
+        self.assertIsInstance(chunks[1], bytes)
+
+    def test_long_header(self):
+        value = b'x' * 2000
+        self.assertEqual(
+            self.encoder.encode(['GET', value]),
+            b'*2\r\n$3\r\nGET\r\n$2000\r\n' + value + b'\r\n'
+        )
+
+    def test_big_argument_not_copied(self):
+        value = b'x' * (COPY_THRESHOLD + 1)
+        self.encoder.pack(['SET', 'foo', value])
+        self.encoder.pack(['GET', 'foo'])
+        chunks = self.encoder.get_chunks()
+
+        self.assertEqual(len(chunks), 3)
+        self.assertIs(chunks[1], value)
+        self.assertEqual(
+            b''.join(chunks),
+            b'*3\r\n$3\r\nSET\r\n$3\r\nfoo\r\n$%d\r\n' % len(value) +
+            value + b'\r\n*2\r\n$3\r\nGET\r\n$3\r\nfoo\r\n'
+        )
+
+    def test_pipeline(self):
+        self.encoder.pack_pipeline([['GET', 'foo'], ['GET', 'bar']])
+        self.assertEqual(
+            self.encoder.get_chunks(),
+            [b'*2\r\n$3\r\nGET\r\n$3\r\nfoo\r\n*2\r\n$3\r\nGET\r\n$3\r\nbar\r\n']
+        )
+        self.assertEqual(self.encoder.get_chunks(), [])
+
+    def test_failed_command_dropped(self):
+        self.encoder.pack(['GET', 'foo'])
+        with self.assertRaises(UnicodeEncodeError):
+            self.encoder.pack(['SET', b'x' * (COPY_THRESHOLD + 1), u'\udc80'])
+
+        self.assertEqual(
+            self.encoder.get_chunks(),
+            [b'*2\r\n$3\r\nGET\r\n$3\r\nfoo\r\n']
+        )
+
+    def test_failed_pipeline_dropped(self):
+        self.encoder.pack(['GET', 'foo'])
+        with self.assertRaises(UnicodeEncodeError):
+            self.encoder.pack_pipeline([
+                ['SET', 'foo', b'x' * (COPY_THRESHOLD + 1)],
+                ['SET', 'bar', u'\ud800'],
+            ])
+
+        self.assertEqual(
+            self.encoder.get_chunks(),
+            [b'*2\r\n$3\r\nGET\r\n$3\r\nfoo\r\n']
+        )
@@ -0,0 +1,236 @@
+from tornado.testing import AsyncTestCase
+
+from toredis.client import Client
+
+from tests.test_resp3 import NullStream
+
+
+class TestPubSub(AsyncTestCase):
+
+    def setUp(self):
+        super(TestPubSub, self).setUp()
+        self.client = Client(io_loop=self.io_loop)
+        self.client.connect()
+        self.pubsub = self.client.pubsub()
+
+        self.publisher = Client(io_loop=self.io_loop)
+        self.publisher.connect()
+
+        self.messages = []
+
+    def tearDown(self):
+        if self.client.is_connected():
+            self.client.close()
+        self.publisher.close()
+        super(TestPubSub, self).tearDown()
+
+    def wait_for(self, condition):
+        def check():
+            if condition():
+                self.stop()
+            else:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, check)
+
+        check()
+        self.wait()
+
+    def handler(self, name):
+        def handle(channel, message):
+            self.messages.append((name, channel, message))
+            self.stop()
+        return handle
+
+    def sync(self):
+        # Subscriptions are processed in order, so once message to the last
+        # subscribed channel is received, all of them are active
+        self.pubsub.subscribe('sync', lambda channel, message: self.stop())
+
+        def on_publish(count):
+            if not count:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, send)
+
+        def send():
+            self.publisher.publish('sync', '', callback=on_publish)
+
+        send()
+        self.wait()
+        self.pubsub.unsubscribe('sync')
+
+    def test_subscribe(self):
+        self.pubsub.subscribe('foo', self.handler('foo'))
+        self.pubsub.subscribe('bar', self.handler('bar'))
+        self.sync()
+
+        self.publisher.publish('foo', 'message1')
+        self.wait()
+        self.publisher.publish('bar', 'message2')
+        self.wait()
+
+        self.assertEqual(self.messages, [('foo', b'foo', b'message1'),
+                                         ('bar', b'bar', b'message2')])
+
+    def test_psubscribe(self):
+        self.pubsub.psubscribe('news.*', self.handler('news'))
+        self.pubsub.subscribe('news.tech', self.handler('tech'))
+        self.sync()
+
+        self.publisher.publish('news.tech', 'message')
+        self.wait()
+        if len(self.messages) < 2:
+            self.wait()
+
+        self.assertEqual(sorted(self.messages),
+                         [('news', b'news.tech', b'message'),
+                          ('tech', b'news.tech', b'message')])
+
+    def test_unsubscribe(self):
+        self.pubsub.subscribe('foo', self.handler('foo'))
+        self.pubsub.subscribe('bar', self.handler('bar'))
+        self.pubsub.unsubscribe('foo')
+        self.sync()
+
+        self.publisher.publish('foo', 'message1')
+        self.publisher.publish('bar', 'message2')
+        self.wait()
+
+        self.assertEqual(self.messages, [('bar', b'bar', b'message2')])
+        self.assertEqual(list(self.pubsub.channels), [b'bar'])
+
+    def test_replace_handler(self):
+        self.pubsub.subscribe('foo', self.handler('first'))
+        self.pubsub.subscribe('foo', self.handler('second'))
+        self.sync()
+
+        self.publisher.publish('foo', 'message')
+        self.wait()
+
+        self.assertEqual(self.messages, [('second', b'foo', b'message')])
+
+    def test_disconnect(self):
+        self.pubsub.disconnect_callback = self.stop
+        self.pubsub.subscribe('foo', self.handler('foo'))
+
+        self.client._stream.close()
+        self.wait()
+
+    def test_batch(self):
+        pubsub = self.client.pubsub(batch=True)
+
+        batches = []
+
+        def handler(channel, messages):
+            batches.append((channel, messages))
+            if sum(len(m) for _, m in batches) == 20:
+                self.stop()
+
+        pubsub.subscribe('foo', handler)
+        pubsub.psubscribe('b*', handler)
+        pubsub.subscribe('sync', lambda channel, messages: self.stop())
+
+        def on_publish(count):
+            if not count:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, send)
+
+        def send():
+            self.publisher.publish('sync', '', callback=on_publish)
+
+        send()
+        self.wait()
+
+        pipeline = self.publisher.pipeline()
+        for i in range(10):
+            pipeline.publish('foo', 'foo%d' % i)
+            pipeline.publish('bar', 'bar%d' % i)
+        pipeline.send()
+        self.wait()
+
+        for channel in (b'foo', b'bar'):
+            messages = [m for c, batch in batches if c == channel for m in batch]
+            self.assertEqual(
+                messages,
+                [channel + str(i).encode() for i in range(10)]
+            )
+
+        # Messages parsed from one read are grouped by channel
+        del batches[:]
+        self.client._on_read(
+            b'*3\r\n$7\r\nmessage\r\n$3\r\nfoo\r\n$1\r\na\r\n'
+            b'*4\r\n$8\r\npmessage\r\n$2\r\nb*\r\n$3\r\nbar\r\n$1\r\nb\r\n'
+            b'*3\r\n$7\r\nmessage\r\n$3\r\nfoo\r\n$1\r\nc\r\n'
+        )
+        self.assertEqual(sorted(batches), [(b'bar', [b'b']),
+                                           (b'foo', [b'a', b'c'])])
+
+    def test_normal_mode(self):
+        self.pubsub.subscribe('foo', self.handler('foo'))
+        self.pubsub.psubscribe('b*', self.handler('bar'))
+        self.pubsub.unsubscribe('foo')
+        self.assertRaises(ValueError, self.client.get, 'foo')
+
+        # Client returns to normal mode after last unsubscribe
+        self.pubsub.punsubscribe('b*')
+        self.wait_for(lambda: self.client._sub_callback is None)
+
+        self.client.set('foo', 'bar')
+        self.client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'bar')
+
+        # And can subscribe again
+        self.pubsub.subscribe('foo', self.handler('foo'))
+        self.sync()
+        self.publisher.publish('foo', 'message')
+        self.wait()
+        self.assertEqual(self.messages, [('foo', b'foo', b'message')])
+
+    def test_resubscribe_before_confirmation(self):
+        replies = []
+        self.client.subscribe(['foo'], replies.append)
+        self.wait_for(lambda: replies)
+
+        # SUBSCRIBE is sent before UNSUBSCRIBE reports no subscriptions
+        self.client.unsubscribe(['foo'])
+        self.client.subscribe(['bar'], replies.append)
+        self.wait_for(lambda: len(replies) == 3)
+
+        self.assertEqual(replies[1:], [[b'unsubscribe', b'foo', 0],
+                                   [b'subscribe', b'bar', 1]])
+        self.assertIsNotNone(self.client._sub_callback)
+
+    def test_unsubscribe_future(self):
+        self.client.subscribe(['foo'], lambda message: None)
+        future = self.client.unsubscribe()
+        self.io_loop.add_future(future, self.stop)
+        self.assertEqual(self.wait().result(), [b'unsubscribe', b'foo', 0])
+
+    def test_batch_capacity(self):
+        # Replies are fed to the client directly
+        client = Client(io_loop=self.io_loop)
+        client._reset()
+        client._stream = NullStream()
+
+        batches = []
+        client.set_sub_batch()
+        client.subscribe('foo', batches.append)
+
+        # Capacity waiters are checked after batch reads too
+        results = []
+        client._capacity_waiters.append(results.append)
+        client._on_read(b'*3\r\n$9\r\nsubscribe\r\n$3\r\nfoo\r\n:1\r\n'
+                        b'*3\r\n$7\r\nmessage\r\n$3\r\nfoo\r\n$1\r\na\r\n')
+
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 2)
+        self.assertEqual(results, [True])
+
+    def test_batch_normal_mode(self):
+        pubsub = self.client.pubsub(batch=True)
+        pubsub.subscribe('foo', lambda channel, messages: None)
+        pubsub.unsubscribe('foo')
+        self.wait_for(lambda: self.client._sub_callback is None)
+        self.assertFalse(self.client._sub_batch)
+
+        self.client.ping(callback=self.stop)
+        self.assertEqual(self.wait(), b'PONG')
+
+        pubsub.subscribe('foo', lambda channel, messages: None)
+        self.assertTrue(self.client._sub_batch)
@@ -0,0 +1,209 @@
+from tornado.testing import AsyncTestCase
+
+from toredis.client import CommandTimeoutError
+from toredis.reconnect import IDEMPOTENT_COMMANDS, ReconnectingClient
+
+from tests.servers import StandInServer
+
+
+class TestReconnectingClient(AsyncTestCase):
+
+    def setUp(self):
+        super(TestReconnectingClient, self).setUp()
+        self.server = StandInServer()
+        self.server.data[b'foo'] = b'bar'
+
+        self.client = ReconnectingClient(io_loop=self.io_loop,
+                                         reconnect_delay=0.01)
+        self.client.connect(*self.server.address, callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        super(TestReconnectingClient, self).tearDown()
+
+    def wait_for(self, condition):
+        def check():
+            if condition():
+                self.stop()
+            else:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, check)
+
+        check()
+        self.wait()
+
+    def reconnected(self):
+        return self.server.node.connections == 2 and self.client.is_ready()
+
+    def test_reconnect(self):
+        self.server.disconnect()
+        self.wait_for(self.reconnected)
+
+        self.client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'bar')
+
+    def test_offline_queue(self):
+        self.server.stop()
+        self.server.disconnect()
+        self.wait_for(lambda: not self.client.is_ready())
+
+        self.client.set('foo', 'baz')
+        self.client.get('foo', callback=self.stop)
+
+        # Server is down, client keeps retrying
+        self.io_loop.add_timeout(self.io_loop.time() + 0.1, self.stop)
+        self.wait()
+        self.assertFalse(self.client.is_ready())
+        self.assertTrue(self.client._attempts > 1)
+
+        self.server.start()
+        self.assertEqual(self.wait(), b'baz')
+
+    def test_offline_queue_limits(self):
+        self.client.max_queue_size = 2
+        self.client.max_queue_bytes = 20
+
+        self.server.stop()
+        self.server.disconnect()
+        self.wait_for(lambda: not self.client.is_ready())
+
+        results = []
+        self.client.get('foo', callback=results.append)
+        self.client.set('foo', 'x' * 20, callback=results.append)
+        self.client.get('foo', callback=results.append)
+        self.client.get('foo', callback=results.append)
+
+        # Dropped commands are completed right away
+        self.assertEqual(results, [None, None])
+
+        self.server.start()
+        self.wait_for(lambda: len(results) == 4)
+        self.assertEqual(results, [None, None, b'bar', b'bar'])
+
+    def test_queue_bytes(self):
+        self.client.max_queue_bytes = 20
+
+        self.server.stop()
+        self.server.disconnect()
+        self.wait_for(lambda: not self.client.is_ready())
+
+        # Size of encoded text is counted, not its length
+        self.client.set('foo', u'\xe4' * 8, callback=self.stop)
+        self.assertIsNone(self.wait())
+        self.assertEqual(self.client._command_size(['SET', 'k', 10]), 6)
+        self.assertEqual(
+            self.client._command_size([['GET', u'\xe4'], ['GET', b'\xe4']]),
+            9
+        )
+
+    def test_in_flight_replay(self):
+        results = []
+        self.server.node.hold = True
+        self.client.get('foo', callback=results.append)
+        self.client.incr('counter', callback=results.append)
+        self.client.get('foo', callback=results.append)
+        self.wait_for(lambda: len(self.server.node.commands) == 3)
+
+        self.server.node.hold = False
+        self.server.disconnect()
+
+        # INCR might have been executed, so it is not sent again
+        self.wait_for(lambda: len(results) == 3)
+        self.assertEqual(results, [None, b'bar', b'bar'])
+        self.assertNotIn(b'counter', self.server.data)
+
+    def test_in_flight_out_of_order(self):
+        results = []
+        self.server.node.hold = True
+        self.client.get('foo', callback=results.append)
+        self.client.incr('counter', callback=results.append)
+        self.wait_for(lambda: len(self.server.node.commands) == 2)
+
+        # Command completed out of order is the one forgotten
+        callback, _ = self.client.callbacks.pop()
+        callback(1)
+        self.assertEqual([args for _, args, _ in
+                          self.client._in_flight.values()],
+                         [['GET', 'foo']])
+
+        self.server.node.hold = False
+        self.server.disconnect()
+        self.wait_for(lambda: len(results) == 2)
+        self.assertEqual(results, [1, b'bar'])
+
+    def test_timeout_replay(self):
+        results = []
+        self.server.node.hold = True
+        self.client.get('foo', callback=results.append)
+        self.client.with_timeout(0.05).get('foo', callback=results.append)
+        self.wait_for(lambda: len(self.server.node.commands) == 2)
+        self.server.node.hold = False
+
+        # Timeout closes the connection, command without timeout is sent
+        # again once client reconnects
+        self.wait_for(lambda: len(results) == 2)
+        self.assertIsInstance(results[0], CommandTimeoutError)
+        self.assertEqual(results[1], b'bar')
+
+    def test_write_replay(self):
+        results = []
+        self.server.node.hold = True
+        self.client.set('foo', 'baz', callback=results.append)
+        self.wait_for(lambda: len(self.server.node.commands) == 1)
+
+        self.server.node.hold = False
+        self.server.disconnect()
+
+        # Writes are not sent again by default
+        self.wait_for(lambda: results)
+        self.assertEqual(results, [None])
+        self.assertEqual(self.server.data[b'foo'], b'bar')
+
+        # Unless they are added to replayed commands
+        self.client.replay_commands = IDEMPOTENT_COMMANDS | set(['SET'])
+        self.wait_for(self.reconnected)
+        self.server.node.hold = True
+        self.client.set('foo', 'baz', callback=results.append)
+        self.wait_for(lambda: len(self.server.node.commands) == 2)
+
+        self.server.node.hold = False
+        self.server.disconnect()
+        self.wait_for(lambda: len(results) == 2)
+        self.assertEqual(results[1], b'OK')
+        self.assertEqual(self.server.data[b'foo'], b'baz')
+
+    def test_session_restored(self):
+        self.client.select(1, callback=self.stop)
+        self.wait()
+
+        del self.server.node.commands[:]
+        self.server.disconnect()
+        self.wait_for(self.reconnected)
+
+        self.client.ping(callback=self.stop)
+        self.wait()
+        self.assertEqual(self.server.node.commands[0], [b'SELECT', b'1'])
+
+    def test_reconnect_delay(self):
+        client = ReconnectingClient(io_loop=self.io_loop, reconnect_delay=1,
+                                    max_reconnect_delay=5)
+
+        for attempts, delay in [(0, 1), (1, 2), (2, 4), (3, 5), (100, 5)]:
+            client._attempts = attempts
+            for _ in range(10):
+                self.assertTrue(
+                    delay / 2.0 <= client._get_reconnect_delay() <= delay
+                )
+
+    def test_close(self):
+        self.client.close()
+        self.wait_for(lambda: not self.client.is_ready())
+
+        # Client stays disconnected and commands are not queued
+        self.client.get('foo', callback=self.stop)
+        self.assertIsNone(self.wait())
+
+        self.io_loop.add_timeout(self.io_loop.time() + 0.1, self.stop)
+        self.wait()
+        self.assertFalse(self.client.is_connected())
@@ -0,0 +1,105 @@
+from tornado.testing import AsyncTestCase, gen_test
+
+from toredis.commands import READONLY_COMMANDS
+from toredis.replication import ReplicatedClient
+
+from tests.servers import StandInServer
+
+
+class TestReplicatedClient(AsyncTestCase):
+
+    def setUp(self):
+        super(TestReplicatedClient, self).setUp()
+        self.master = StandInServer()
+        self.replicas = [StandInServer() for _ in range(2)]
+
+        self.master.data[b'foo'] = b'master'
+        for i, replica in enumerate(self.replicas):
+            replica.data[b'foo'] = b'replica%d' % i
+
+        self.client = ReplicatedClient(
+            self.master.address, [r.address for r in self.replicas],
+            io_loop=self.io_loop
+        )
+        self.client.connect(callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        self.client.close()
+        self.master.stop()
+        for replica in self.replicas:
+            replica.stop()
+        super(TestReplicatedClient, self).tearDown()
+
+    def test_readonly_commands(self):
+        self.assertIn('GET', READONLY_COMMANDS)
+        self.assertIn('ZRANGE', READONLY_COMMANDS)
+        self.assertNotIn('SET', READONLY_COMMANDS)
+        self.assertNotIn('SORT', READONLY_COMMANDS)
+
+    @gen_test
+    def test_round_robin(self):
+        results = []
+        for _ in range(4):
+            result = yield self.client.get('foo')
+            results.append(result)
+
+        self.assertEqual(results, [b'replica0', b'replica1'] * 2)
+
+    @gen_test
+    def test_least_outstanding(self):
+        self.client.selection = 'least_outstanding'
+
+        futures = [self.client.get('foo') for _ in range(4)]
+        self.assertEqual(
+            [len(client.callbacks) for client in self.client.replicas],
+            [2, 2]
+        )
+
+        results = []
+        for future in futures:
+            result = yield future
+            results.append(result)
+        self.assertEqual(sorted(results), [b'replica0', b'replica0',
+                                           b'replica1', b'replica1'])
+
+    @gen_test
+    def test_writes(self):
+        result = yield self.client.set('bar', 'baz')
+        self.assertEqual(result, b'OK')
+
+        self.assertEqual(self.master.data[b'bar'], b'baz')
+        for replica in self.replicas:
+            self.assertNotIn(b'bar', replica.data)
+
+    @gen_test
+    def test_pipeline(self):
+        pipeline = self.client.pipeline()
+        pipeline.get('foo')
+        pipeline.mget(['foo'])
+        result = yield pipeline.send()
+        self.assertEqual(result, [b'replica0', [b'replica0']])
+
+        pipeline = self.client.pipeline()
+        pipeline.set('bar', 'baz')
+        pipeline.get('foo')
+        result = yield pipeline.send()
+        self.assertEqual(result, [b'OK', b'master'])
+
+    @gen_test
+    def test_replicas_down(self):
+        self.client.replicas[0].close()
+        for _ in range(2):
+            result = yield self.client.get('foo')
+            self.assertEqual(result, b'replica1')
+
+        self.client.replicas[1].close()
+        result = yield self.client.get('foo')
+        self.assertEqual(result, b'master')
+
+    def test_unsupported_commands(self):
+        with self.assertRaises(ValueError):
+            self.client.multi()
+
+        with self.assertRaises(ValueError):
+            ReplicatedClient(self.master.address, [], selection='random')
@@ -0,0 +1,178 @@
+from functools import partial
+
+from tornado.testing import AsyncTestCase
+
+from toredis.caching import CachingClient
+from toredis.client import Client
+
+from tests.servers import StandInServer
+
+
+class NullStream(object):
+    def write(self, data):
+        pass
+
+    def closed(self):
+        return False
+
+
+INVALIDATE_PUSH = b'>2\r\n$10\r\ninvalidate\r\n*1\r\n$3\r\nfoo\r\n'
+
+
+def encode_push(*items):
+    return (('>%d\r\n' % len(items)).encode() +
+            b''.join(b':%d\r\n' % item if isinstance(item, int) else
+                     b'$%d\r\n%s\r\n' % (len(item), item)
+                     for item in items))
+
+
+class TestResp3(AsyncTestCase):
+
+    def make_client(self, client_class=Client):
+        # Client with RESP3 negotiated, responses are fed directly
+        client = client_class(io_loop=self.io_loop, protocol=3)
+        client._reset()
+        client._resp3 = True
+        client._stream = NullStream()
+        return client
+
+    def test_hello(self):
+        client = Client(io_loop=self.io_loop, protocol=3)
+        client.connect(callback=self.stop)
+        self.wait()
+        self.assertTrue(client._resp3)
+
+        client.delete('resp3:hash')
+        client.hmset('resp3:hash', {'a': 1, 'b': 2})
+        client.hgetall('resp3:hash', callback=self.stop)
+
+        # Maps are decoded as dicts
+        self.assertEqual(self.wait(), {b'a': b'1', b'b': b'2'})
+        client.close()
+
+    def test_fallback(self):
+        server = StandInServer()
+        client = Client(io_loop=self.io_loop, protocol=3)
+        client.connect(*server.address, callback=self.stop)
+        self.wait()
+        self.assertFalse(client._resp3)
+
+        client.ping(callback=self.stop)
+        self.assertEqual(self.wait(), b'PONG')
+        client.close()
+        server.stop()
+
+    def test_push_routing(self):
+        client = self.make_client()
+
+        pushes = []
+        client.on_push = pushes.append
+
+        results = []
+        client.get('foo', callback=results.append)
+        client.get('bar', callback=results.append)
+        pipeline = client.pipeline()
+        pipeline.get('foo')
+        pipeline.get('bar')
+        pipeline.send(callback=results.append)
+
+        # Push messages before, between and inside responses
+        client._on_read(INVALIDATE_PUSH + b'$1\r\na\r\n' + INVALIDATE_PUSH +
+                        b'$1\r\nb\r\n$1\r\nc\r\n' + INVALIDATE_PUSH +
+                        b'$1\r\nd\r\n')
+
+        self.assertEqual(results, [b'a', b'b', [b'c', b'd']])
+        self.assertEqual(pushes, [[b'invalidate', [b'foo']]] * 3)
+
+    def test_pubsub(self):
+        client = self.make_client()
+
+        messages = []
+        results = []
+        future = client.subscribe(['foo', 'bar'], messages.append)
+
+        # Normal commands can be sent while subscribed
+        client.get('foo', callback=results.append)
+        self.assertTrue(client.is_subscribed())
+
+        client._on_read(encode_push(b'subscribe', b'foo', 1) +
+                        encode_push(b'subscribe', b'bar', 2) +
+                        b'$3\r\nbaz\r\n' +
+                        encode_push(b'message', b'foo', b'hello'))
+
+        self.assertEqual(future.result(), [b'subscribe', b'foo', 1])
+        self.assertEqual(results, [b'baz'])
+        self.assertEqual(messages, [[b'subscribe', b'foo', 1],
+                                    [b'subscribe', b'bar', 2],
+                                    [b'message', b'foo', b'hello']])
+
+        # Client is not subscribed after the last channel is unsubscribed
+        future = client.unsubscribe()
+        client._on_read(encode_push(b'unsubscribe', b'foo', 1) +
+                        encode_push(b'unsubscribe', b'bar', 0))
+        self.assertEqual(future.result(), [b'unsubscribe', b'foo', 1])
+        self.assertFalse(client.is_subscribed())
+
+    def test_subscribe_before_hello(self):
+        client = Client(io_loop=self.io_loop, protocol=3)
+        client._reset()
+        client._stream = NullStream()
+
+        # Connection right after connect, HELLO reply was not received yet
+        connected = []
+        Client.send_message(client, ['HELLO', 3],
+                            partial(client._on_hello,
+                                    lambda: connected.append(True)))
+        client._hello_pending = True
+
+        messages = []
+        future = client.subscribe('foo', messages.append)
+        self.assertFalse(client.is_subscribed())
+
+        client._on_read(b'%1\r\n$6\r\nserver\r\n$5\r\nredis\r\n' +
+                        encode_push(b'subscribe', b'foo', 1) +
+                        encode_push(b'message', b'foo', b'hello'))
+
+        # Subscription is sent once RESP3 is negotiated
+        self.assertEqual(connected, [True])
+        self.assertTrue(client._resp3)
+        self.assertEqual(future.result(), [b'subscribe', b'foo', 1])
+        self.assertEqual(messages, [[b'subscribe', b'foo', 1],
+                                    [b'message', b'foo', b'hello']])
+
+        # Pending pub/sub commands are completed if connection is lost
+        client._reset()
+        Client.send_message(client, ['HELLO', 3],
+                            partial(client._on_hello, None))
+        client._hello_pending = True
+        future = client.unsubscribe('foo')
+        client._on_close()
+        self.assertIsNone(future.result())
+
+    def test_pubsub_batch(self):
+        client = self.make_client()
+
+        batches = []
+        pubsub = client.pubsub(batch=True)
+        pubsub.subscribe('foo', lambda channel, messages:
+                         batches.append((channel, messages)))
+
+        client.get('foo')
+        client._on_read(encode_push(b'subscribe', b'foo', 1) +
+                        encode_push(b'message', b'foo', b'a') +
+                        b'$1\r\nx\r\n' +
+                        encode_push(b'message', b'foo', b'b'))
+
+        self.assertEqual(batches, [(b'foo', [b'a', b'b'])])
+
+    def test_caching_invalidation(self):
+        client = self.make_client(CachingClient)
+        client._tracking = True
+
+        client.get('foo', callback=self.stop)
+        client._on_read(b'$3\r\nbar\r\n')
+        self.assertEqual(self.wait(), b'bar')
+        self.assertEqual(client.cache_size(), 1)
+
+        client._on_read(INVALIDATE_PUSH)
+        self.assertEqual(client.cache_size(), 0)
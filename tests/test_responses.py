@@ -0,0 +1,95 @@
+from tornado.testing import AsyncTestCase
+
+from toredis.client import Client
+from toredis.commands import RESPONSE_CALLBACKS
+from toredis.responses import pairs_to_dict, pairs_with_scores, parse_info
+
+
+INFO = (b'# Server\r\nredis_version:7.2.4\r\nprocess_id:42\r\n\r\n'
+        b'# Memory\r\nmem_fragmentation_ratio:1.5\r\n\r\n'
+        b'# Keyspace\r\ndb0:keys=2,expires=0,avg_ttl=0\r\n')
+
+
+class TestResponses(AsyncTestCase):
+
+    def setUp(self):
+        super(TestResponses, self).setUp()
+        self.client = Client(io_loop=self.io_loop,
+                             response_callbacks=RESPONSE_CALLBACKS)
+        self.client.connect(callback=self.stop)
+        self.wait()
+
+        self.client.delete('responses:hash')
+        self.client.delete('responses:zset')
+        self.client.delete('responses:set')
+        self.client.hmset('responses:hash', {'a': 1, 'b': 2})
+        self.client.zadd('responses:zset', {'x': 1.5, 'y': 2})
+        self.client.sadd('responses:set', 'a', callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        self.client.close()
+        super(TestResponses, self).tearDown()
+
+    def test_callbacks(self):
+        self.client.hgetall('responses:hash', callback=self.stop)
+        self.assertEqual(self.wait(), {b'a': b'1', b'b': b'2'})
+
+        self.client.zrange('responses:zset', 0, -1, withscores=True,
+                           callback=self.stop)
+        self.assertEqual(self.wait(), [(b'x', 1.5), (b'y', 2.0)])
+
+        # Response is converted only with WITHSCORES
+        self.client.zrange('responses:zset', 0, -1, callback=self.stop)
+        self.assertEqual(self.wait(), [b'x', b'y'])
+
+        self.client.exists('responses:hash', callback=self.stop)
+        self.assertIs(self.wait(), True)
+
+        self.client.sismember('responses:set', 'a', callback=self.stop)
+        self.assertIs(self.wait(), True)
+
+        self.client.zscore('responses:zset', 'missing', callback=self.stop)
+        self.assertIsNone(self.wait())
+
+    def test_pipeline(self):
+        pipeline = self.client.pipeline()
+        pipeline.hgetall('responses:hash')
+        pipeline.get('responses:missing')
+        pipeline.zrevrange('responses:zset', 0, 0, withscores=True)
+        pipeline.exists('responses:missing')
+        pipeline.send(callback=self.stop)
+
+        self.assertEqual(self.wait(), [{b'a': b'1', b'b': b'2'}, None,
+                                       [(b'y', 2.0)], False])
+
+    def test_disabled(self):
+        # Responses are not converted by default
+        client = Client(io_loop=self.io_loop)
+        client.connect(callback=self.stop)
+        self.wait()
+
+        client.hgetall('responses:hash', callback=self.stop)
+        self.assertEqual(sorted(self.wait()), [b'1', b'2', b'a', b'b'])
+
+        client.exists('responses:hash', callback=self.stop)
+        self.assertEqual(self.wait(), 1)
+        client.close()
+
+    def test_pairs(self):
+        self.assertEqual(pairs_to_dict([]), {})
+        self.assertEqual(pairs_to_dict({'a': '1'}), {'a': '1'})
+        self.assertEqual(pairs_with_scores([b'a', b'1', b'b', b'-inf']),
+                         [(b'a', 1.0), (b'b', float('-inf'))])
+
+        # RESP3 pairs
+        self.assertEqual(pairs_with_scores([[b'a', 1.0]]), [(b'a', 1.0)])
+
+    def test_parse_info(self):
+        info = parse_info(INFO)
+        self.assertEqual(info['redis_version'], '7.2.4')
+        self.assertEqual(info['process_id'], 42)
+        self.assertEqual(info['mem_fragmentation_ratio'], 1.5)
+        self.assertEqual(info['db0'], {'keys': 2, 'expires': 0,
+                                       'avg_ttl': 0})
+        self.assertEqual(parse_info(INFO.decode()), info)
@@ -0,0 +1,143 @@
+from tornado.concurrent import Future
+from tornado.testing import AsyncTestCase, gen_test
+
+from toredis.client import Client
+
+from tests.servers import StandInServer
+
+
+class TestScanIterator(AsyncTestCase):
+
+    def setUp(self):
+        super(TestScanIterator, self).setUp()
+        self.client = Client(io_loop=self.io_loop)
+        self.client.connect()
+
+        self.keys = set(('scan:%d' % i).encode() for i in range(100))
+        pipeline = self.client.pipeline()
+        for key in self.keys:
+            pipeline.set(key, 'value')
+        pipeline.sadd('scan:set', list(range(50)))
+        pipeline.hmset('scan:hash', dict(('field%d' % i, i)
+                                         for i in range(50)))
+        pipeline.zadd('scan:zset', dict(('member%d' % i, i)
+                                        for i in range(50)))
+        pipeline.send(callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        pipeline = self.client.pipeline()
+        pipeline.delete(list(self.keys) + ['scan:set', 'scan:hash',
+                                           'scan:zset'])
+        pipeline.send(callback=self.stop)
+        self.wait()
+        self.client.close()
+        super(TestScanIterator, self).tearDown()
+
+    def collect(self, iterator):
+        pages = []
+
+        def on_page(page):
+            if page:
+                pages.append(page)
+                iterator.next_page(on_page)
+            else:
+                self.stop(page)
+
+        iterator.next_page(on_page)
+        self.assertEqual(self.wait(), [])
+        self.assertTrue(iterator.done)
+        return pages
+
+    def test_scan(self):
+        pages = self.collect(self.client.scan_iter(match='scan:[0-9]*',
+                                                   count=10))
+        self.assertTrue(len(pages) > 1)
+        self.assertEqual(set(key for page in pages for key in page),
+                         self.keys)
+
+    def test_prefetch(self):
+        iterator = self.client.scan_iter(match='scan:[0-9]*', count=10,
+                                         prefetch=True)
+        iterator.next_page(self.stop)
+        first = self.wait()
+
+        # Next page is requested before the caller asks for it
+        self.assertTrue(iterator._fetching or iterator._pages or
+                        iterator.done)
+
+        pages = self.collect(iterator)
+        self.assertEqual(set(key for page in [first] + pages
+                             for key in page),
+                         self.keys)
+
+    def test_collections(self):
+        pages = self.collect(self.client.sscan_iter('scan:set', count=10))
+        self.assertEqual(set(int(m) for page in pages for m in page),
+                         set(range(50)))
+
+        pages = self.collect(self.client.hscan_iter('scan:hash', count=10))
+        items = [item for page in pages for item in page]
+        self.assertEqual(dict(zip(items[::2], items[1::2])),
+                         dict((('field%d' % i).encode(), str(i).encode())
+                              for i in range(50)))
+
+        pages = self.collect(self.client.zscan_iter('scan:zset',
+                                                    match='member1*'))
+        items = [item for page in pages for item in page]
+        self.assertEqual(sorted(items[::2]),
+                         sorted(('member1%s' % i).encode()
+                                for i in [''] + list(range(10))))
+
+    def test_connection_lost(self):
+        client = Client(io_loop=self.io_loop)
+        client.connect(callback=self.stop)
+        self.wait()
+
+        iterator = client.scan_iter(count=10)
+        iterator.next_page(self.stop)
+        client._stream.close()
+        self.assertIsNone(self.wait())
+        self.assertTrue(iterator.done)
+
+    @gen_test
+    async def test_async_for(self):
+        pages = []
+        async for page in self.client.scan_iter(match='scan:[0-9]*',
+                                                count=10):
+            pages.append(page)
+
+        self.assertTrue(len(pages) > 1)
+        self.assertEqual(set(key for page in pages for key in page),
+                         self.keys)
+
+    @gen_test
+    async def test_async_for_connection_lost(self):
+        server = StandInServer()
+        server.node.hold = True
+
+        client = Client(io_loop=self.io_loop)
+        connected = Future()
+        client.connect(*server.address,
+                       callback=lambda: connected.set_result(True))
+        await connected
+
+        # Connection is lost while the page is fetched
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05,
+                                 server.disconnect)
+        pages = []
+        with self.assertRaises(IOError) as cm:
+            async for page in client.scan_iter(count=10):
+                pages.append(page)
+
+        self.assertEqual(str(cm.exception), 'Connection lost')
+        self.assertEqual(pages, [])
+        server.stop()
+
+    def test_next_page_future(self):
+        iterator = self.client.sscan_iter('scan:set')
+        future = iterator.next_page()
+        self.assertRaises(ValueError, iterator.next_page)
+
+        self.io_loop.add_future(future, self.stop)
+        self.assertTrue(self.wait().result())
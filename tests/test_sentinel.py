@@ -0,0 +1,103 @@
+from tornado.testing import AsyncTestCase, bind_unused_port, gen_test
+
+from toredis.sentinel import Sentinel
+
+from tests.servers import StandInSentinel, StandInServer
+
+
+class TestSentinel(AsyncTestCase):
+
+    def setUp(self):
+        super(TestSentinel, self).setUp()
+        self.master = StandInServer()
+        self.replica = StandInServer()
+        self.stand_in = StandInSentinel('mymaster', self.master,
+                                        [self.replica])
+
+        # First sentinel is not running
+        sock, port = bind_unused_port()
+        sock.close()
+
+        self.sentinel = Sentinel([('127.0.0.1', port), self.stand_in.address],
+                                 io_loop=self.io_loop)
+
+    def tearDown(self):
+        self.sentinel.close()
+        self.stand_in.stop()
+        self.master.stop()
+        self.replica.stop()
+        super(TestSentinel, self).tearDown()
+
+    def wait_for(self, condition):
+        def check():
+            if condition():
+                self.stop()
+            else:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, check)
+
+        check()
+        self.wait()
+
+    def test_discover_master(self):
+        self.sentinel.discover_master('mymaster', self.stop)
+        self.assertEqual(self.wait(), self.master.address)
+
+        # Responding sentinel is asked first from now on
+        self.assertEqual(self.sentinel.sentinels[0], self.stand_in.address)
+
+    def test_discover_unknown_master(self):
+        self.sentinel.discover_master('unknown', self.stop)
+        self.assertIsNone(self.wait())
+
+    def test_discover_replicas(self):
+        self.sentinel.discover_replicas('mymaster', self.stop)
+        self.assertEqual(self.wait(), [self.replica.address])
+
+    @gen_test
+    def test_master_client(self):
+        client = self.sentinel.master_for('mymaster')
+
+        # Commands are queued until client is connected
+        future = client.set('foo', 'bar')
+        client.connect()
+
+        result = yield future
+        self.assertEqual(result, b'OK')
+        self.assertEqual(self.master.data, {b'foo': b'bar'})
+
+        client.close()
+
+    def test_failover(self):
+        client = self.sentinel.master_for('mymaster')
+        client.connect(callback=self.stop)
+        self.wait()
+
+        # Subscription moves to the next sentinel after the first one fails
+        self.wait_for(lambda: self.stand_in.subscribers)
+
+        self.replica.data[b'foo'] = b'replica'
+        self.stand_in.switch_master(self.replica)
+
+        self.wait_for(lambda: client.address == self.replica.address and
+                      client.is_ready())
+
+        client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'replica')
+
+        client.close()
+
+    def test_failover_queue(self):
+        client = self.sentinel.master_for('mymaster')
+        client.connect(callback=self.stop)
+        self.wait()
+
+        self.replica.data[b'foo'] = b'replica'
+        self.stand_in.master = self.replica
+        client.failover()
+
+        # Sent to the new master once it is connected
+        client.get('foo', callback=self.stop)
+        self.assertEqual(self.wait(), b'replica')
+        self.assertEqual(client.address, self.replica.address)
+
+        client.close()
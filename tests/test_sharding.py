@@ -0,0 +1,252 @@
+from tornado.testing import AsyncTestCase, gen_test
+
+from toredis.client import Client
+from toredis.sharding import HashRing, ShardedClient, ShardedPubSub
+
+from tests.servers import StandInServer
+
+
+class TestHashRing(AsyncTestCase):
+
+    def publish_until_received(self, channel, message):
+        expected = (channel.encode(), message.encode())
+
+        def send():
+            if expected not in self.messages:
+                self.publisher.publish(channel, message)
+                self.io_loop.add_timeout(self.io_loop.time() + 0.05, send)
+
+        send()
+        self.wait(lambda: expected in self.messages)
+
+    def test_distribution(self):
+        nodes = ['node%d' % i for i in range(4)]
+        ring = HashRing(nodes)
+
+        counts = dict((node, 0) for node in nodes)
+        for i in range(10000):
+            counts[ring.get_node('key%d' % i)] += 1
+
+        for count in counts.values():
+            self.assertTrue(1500 < count < 3500, counts)
+
+    def test_node_added(self):
+        ring = HashRing(['node0', 'node1', 'node2'])
+        new_ring = HashRing(['node0', 'node1', 'node2', 'node3'])
+
+        moved = 0
+        for i in range(10000):
+            node = new_ring.get_node('key%d' % i)
+            if node != ring.get_node('key%d' % i):
+                self.assertEqual(node, 'node3')
+                moved += 1
+
+        self.assertTrue(1500 < moved < 3500, moved)
+
+    def test_hash_tags(self):
+        ring = HashRing(['node%d' % i for i in range(10)])
+        nodes = set(ring.get_node('{user1000}.%d' % i) for i in range(100))
+        self.assertEqual(len(nodes), 1)
+
+        ring = HashRing(['node%d' % i for i in range(10)], hash_tags=False)
+        nodes = set(ring.get_node('{user1000}.%d' % i) for i in range(100))
+        self.assertTrue(len(nodes) > 1)
+
+
+class TestShardedClient(AsyncTestCase):
+
+    def setUp(self):
+        super(TestShardedClient, self).setUp()
+        self.servers = [StandInServer() for _ in range(3)]
+        self.client = ShardedClient([s.address for s in self.servers],
+                                    io_loop=self.io_loop)
+        self.client.connect(callback=self.stop)
+        self.wait()
+
+    def tearDown(self):
+        self.client.close()
+        for server in self.servers:
+            server.stop()
+        super(TestShardedClient, self).tearDown()
+
+    def get_server(self, key):
+        client = self.client.get_client(key)
+        for server in self.servers:
+            if server.address[1] == client._stream.socket.getpeername()[1]:
+                return server
+
+    @gen_test
+    def test_routing(self):
+        for i in range(20):
+            result = yield self.client.set('key%d' % i, 'value%d' % i)
+            self.assertEqual(result, b'OK')
+
+        for i in range(20):
+            server = self.get_server('key%d' % i)
+            self.assertEqual(server.data[b'key%d' % i], b'value%d' % i)
+
+            result = yield self.client.get('key%d' % i)
+            self.assertEqual(result, b'value%d' % i)
+
+        for server in self.servers:
+            self.assertTrue(server.data)
+
+    @gen_test
+    def test_split_commands(self):
+        keys = ['key%d' % i for i in range(20)]
+
+        result = yield self.client.mset(
+            dict(('key%d' % i, 'value%d' % i) for i in range(20))
+        )
+        self.assertEqual(result, b'OK')
+
+        result = yield self.client.mget(keys + ['missing'])
+        self.assertEqual(result, [b'value%d' % i for i in range(20)] + [None])
+
+        result = yield self.client.delete(keys[:10] + ['missing'])
+        self.assertEqual(result, 10)
+
+        result = yield self.client.mget(keys)
+        self.assertEqual(result,
+                         [None] * 10 + [b'value%d' % i for i in range(10, 20)])
+
+    @gen_test
+    def test_pipeline(self):
+        pipeline = self.client.pipeline()
+        for i in range(20):
+            pipeline.set('key%d' % i, 'value%d' % i)
+        pipeline.mget(['key%d' % i for i in range(20)])
+        pipeline.incr('counter')
+        result = yield pipeline.send()
+
+        self.assertEqual(
+            result,
+            [b'OK'] * 20 + [[b'value%d' % i for i in range(20)], 1]
+        )
+
+    def test_keyless_command(self):
+        with self.assertRaises(ValueError):
+            self.client.ping()
+
+    def test_split_without_keys(self):
+        self.assertRaises(ValueError, self.client.mget, [])
+        self.assertRaises(ValueError, self.client.delete, [])
+
+    def test_pipeline_server_lost(self):
+        server = self.servers[0]
+        server.node.hold = True
+
+        pipeline = self.client.pipeline()
+        for i in range(20):
+            pipeline.set('key%d' % i, 'value%d' % i)
+        pipeline.mget(['key%d' % i for i in range(20)])
+        pipeline.send(callback=self.stop)
+
+        # Other servers respond, then connection to the held one is lost
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05,
+                                 server.disconnect)
+        self.assertIsNone(self.wait())
+
+    def test_pipeline_split_server_lost(self):
+        server = self.servers[0]
+        server.node.hold = True
+
+        pipeline = self.client.pipeline()
+        pipeline.mget(['key%d' % i for i in range(20)])
+        pipeline.send(callback=self.stop)
+
+        self.io_loop.add_timeout(self.io_loop.time() + 0.05,
+                                 server.disconnect)
+        self.assertIsNone(self.wait())
+
+
+class TestShardedPubSub(AsyncTestCase):
+
+    def setUp(self):
+        super(TestShardedPubSub, self).setUp()
+        self.pubsub = ShardedPubSub(num_connections=4, io_loop=self.io_loop,
+                                    reconnect_delay=0.01)
+        self.pubsub.connect(callback=self.stop)
+        self.wait()
+
+        self.publisher = Client(io_loop=self.io_loop)
+        self.publisher.connect()
+
+        self.messages = []
+
+    def tearDown(self):
+        self.pubsub.close()
+        self.publisher.close()
+        super(TestShardedPubSub, self).tearDown()
+
+    def handler(self, channel, message):
+        self.messages.append((channel, message))
+        self.stop()
+
+    def publish(self, channel, message):
+        # Subscription might not be processed yet, publish until received
+        def on_publish(count):
+            if not count:
+                self.io_loop.add_timeout(self.io_loop.time() + 0.01, send)
+
+        def send():
+            self.publisher.publish(channel, message, callback=on_publish)
+
+        send()
+        self.wait()
+
+    def publish_until_received(self, channel, message):
+        expected = (channel.encode(), message.encode())
+
+        def send():
+            if expected not in self.messages:
+                self.publisher.publish(channel, message)
+                self.io_loop.add_timeout(self.io_loop.time() + 0.05, send)
+
+        send()
+        self.wait(lambda: expected in self.messages)
+
+    def test_distribution(self):
+        for i in range(40):
+            self.pubsub.subscribe('channel%d' % i, self.handler)
+
+        for i, shard in enumerate(self.pubsub.shards):
+            self.assertTrue(shard.channels)
+            for channel in shard.channels:
+                self.assertIs(self.pubsub.get_shard(channel), shard)
+
+    def test_messages(self):
+        for i in range(10):
+            self.pubsub.subscribe('channel%d' % i, self.handler)
+        self.pubsub.psubscribe('news.*', self.handler)
+
+        for i in range(10):
+            self.publish('channel%d' % i, 'message%d' % i)
+        self.publish('news.tech', 'news')
+
+        self.assertEqual(
+            self.messages,
+            [(b'channel%d' % i, b'message%d' % i) for i in range(10)] +
+            [(b'news.tech', b'news')]
+        )
+
+    def test_resubscribe(self):
+        self.pubsub.subscribe('foo', self.handler)
+        self.publish('foo', 'message1')
+
+        index = self.pubsub.shards.index(self.pubsub.get_shard('foo'))
+        client = self.pubsub.clients[index]
+        client._stream.close()
+
+        # Subscriptions added while disconnected are restored as well
+        self.pubsub.subscribe('bar', self.handler)
+
+        # Server might not notice lost connection right away, so messages
+        # are published until received
+        self.publish_until_received('foo', 'message2')
+        self.publish_until_received('bar', 'message3')
+
+        self.assertIsNot(self.pubsub.clients[index], client)
+        self.assertEqual(sorted(set(self.messages)), [(b'bar', b'message3'),
+                                                      (b'foo', b'message1'),
+                                                      (b'foo', b'message2')])
@@ -1,2 +1,13 @@
-from toredis.client import Client
+from toredis.client import BackpressureError, Client, CommandTimeoutError
+from toredis.bulk import BulkLoader, BulkLoadResult
+from toredis.commands import RESPONSE_CALLBACKS
 from toredis.pipeline import Pipeline
+from toredis.pubsub import PubSub
+from toredis.scan import ScanIterator
+from toredis.pool import ConnectionPool
+from toredis.reconnect import ReconnectingClient
+from toredis.caching import CachingClient
+from toredis.cluster import ClusterClient
+from toredis.sharding import ShardedClient, ShardedPubSub
+from toredis.sentinel import Sentinel, SentinelClient
+from toredis.replication import ReplicatedClient
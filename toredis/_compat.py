@@ -6,7 +6,31 @@ if not PY2:
     text_type = str
     string_types = (str,)
     integer_types = (int, )
+    izip = zip
+    imap = map
 else:
+    from itertools import izip, imap
+
     text_type = unicode
     string_types = (str, unicode)
     integer_types = (int, long)
+
+
+def write_buffer_size(stream):
+    """
+        Number of bytes waiting to be written to the socket
+    """
+    size = getattr(stream, '_write_buffer_size', None)
+    if size is not None:
+        # Tornado 4
+        return size
+
+    buffer = stream._write_buffer
+    return len(buffer) if buffer is not None else 0
+
+
+try:
+    from tornado.stack_context import wrap as stack_context_wrap
+except ImportError:
+    # stack_context was removed in Tornado 6
+    stack_context_wrap = None
@@ -0,0 +1,168 @@
+import numpy
+
+from toredis.client import Client
+from toredis.commands import RESPONSE_CALLBACKS
+
+
+# Commands which responses are converted to numeric arrays
+ARRAY_COMMANDS = frozenset([
+    'HMGET',
+    'HVALS',
+    'LRANGE',
+    'MGET',
+])
+
+# Commands which responses are converted to (members, scores) arrays when
+# sent with WITHSCORES
+SCORES_COMMANDS = frozenset([
+    'ZRANGE',
+    'ZRANGEBYSCORE',
+    'ZREVRANGE',
+    'ZREVRANGEBYSCORE',
+])
+
+
+def to_array(response, dtype=numpy.float64):
+    """
+        Array of numbers from list of numeric strings. Missing values, like
+        in MGET response, are converted to NaN.
+    """
+    return numpy.array(response, dtype=dtype)
+
+
+def to_score_arrays(response):
+    """
+        Tuple of members array and float64 scores array from WITHSCORES
+        response. Members are kept as bytes or text, in object array.
+    """
+    if response and type(response[0]) is list:
+        # RESP3 returns [member, score] pairs
+        members, scores = zip(*response)
+        return (numpy.array(members, dtype=object),
+                numpy.array(scores, dtype=numpy.float64))
+
+    return (numpy.array(response[0::2], dtype=object),
+            numpy.array(response[1::2], dtype=numpy.float64))
+
+
+def encode_values(values):
+    """
+        List of command arguments from array of values. Integer and float
+        arrays are formatted in one pass, arrays of other types raise
+        `ValueError`. Values which are not arrays are passed as they are.
+    """
+    if not isinstance(values, numpy.ndarray):
+        # Converting strings to fixed-width array would drop trailing null
+        # bytes, so only arrays are formatted
+        return list(values)
+
+    kind = values.dtype.kind
+    if kind == 'f':
+        # Shortest representation which parses to the same float. repr is
+        # faster than NumPy formatting, and is applied without Python loop.
+        return ' '.join(map(repr, values.tolist())).encode('ascii').split()
+    if kind in 'iu':
+        return values.astype(numpy.bytes_).tolist()
+    raise ValueError('Arrays of %s are not supported, pass a list instead' %
+                     values.dtype)
+
+
+def get_array_callbacks(dtype=numpy.float64, commands=ARRAY_COMMANDS):
+    """
+        Response callbacks which return NumPy arrays for numeric responses,
+        on top of `RESPONSE_CALLBACKS`
+
+        :param dtype:
+            Type of numeric arrays
+        :param commands:
+            Commands which responses are converted to numeric arrays
+    """
+    callbacks = dict(RESPONSE_CALLBACKS)
+    if dtype is numpy.float64:
+        array_callback = to_array
+    else:
+        def array_callback(response):
+            return to_array(response, dtype)
+
+    for cmd in commands:
+        callbacks[cmd] = array_callback
+    for cmd in SCORES_COMMANDS:
+        callbacks[cmd] = to_score_arrays
+    return callbacks
+
+
+class ArrayClient(Client):
+    """
+        Client which returns NumPy arrays for numeric data.
+
+        Responses of `ARRAY_COMMANDS`, like LRANGE and MGET, are returned
+        as float64 arrays. Responses of ZRANGE and similar commands sent
+        with `withscores=True` are returned as (members, scores) tuple of
+        arrays. Responses which can not be converted complete the command
+        with `ValueError`, so keep non-numeric data for other clients.
+
+        NumPy is not required by the rest of toredis, import this module
+        only if it is installed.
+    """
+    def __init__(self, dtype=numpy.float64, array_commands=ARRAY_COMMANDS,
+                 **kwargs):
+        """
+            Constructor
+
+            :param dtype:
+                Type of numeric arrays
+            :param array_commands:
+                Commands which responses are converted to numeric arrays
+            :param kwargs:
+                Additional Client arguments
+        """
+        kwargs.setdefault('response_callbacks',
+                          get_array_callbacks(dtype, array_commands))
+        super(ArrayClient, self).__init__(**kwargs)
+
+    # Commands
+    def zadd_array(self, key, members, scores, callback=None):
+        """
+            Add members with scores to sorted set, scores are formatted
+            as one array
+
+            :param key:
+                Sorted set key
+            :param members:
+                Array or list of members
+            :param scores:
+                Array or list of scores, same length as members. NaN
+                scores raise `ValueError`.
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        scores = numpy.asarray(scores, dtype=numpy.float64)
+        if numpy.isnan(scores).any():
+            raise ValueError('NaN is not a valid score')
+
+        scores = encode_values(scores)
+        members = encode_values(members)
+        if len(scores) != len(members):
+            raise ValueError('Number of scores and members differs')
+
+        args = [None] * (2 + 2 * len(scores))
+        args[0] = 'ZADD'
+        args[1] = key
+        args[2::2] = scores
+        args[3::2] = members
+        return self.send_message(args, callback)
+
+    def rpush_array(self, key, values, callback=None):
+        """
+            Append values to the list, numbers are formatted as one array
+
+            :param key:
+                List key
+            :param values:
+                Array or list of values
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        args = ['RPUSH', key]
+        args.extend(encode_values(values))
+        return self.send_message(args, callback)
@@ -0,0 +1,181 @@
+import logging
+
+from functools import partial
+from itertools import islice
+
+from tornado.concurrent import Future
+
+
+logger = logging.getLogger(__name__)
+
+
+class BulkLoadResult(object):
+    """
+        Outcome of the bulk load
+    """
+    def __init__(self):
+        # Number of commands sent
+        self.sent = 0
+        # Number of commands which succeeded
+        self.succeeded = 0
+        # Number of commands which returned an error
+        self.failed = 0
+        # Number of commands without response because connection was lost
+        # or response timed out
+        self.lost = 0
+        # Number of commands of the chunk which could not be encoded, none
+        # of them were sent
+        self.rejected = 0
+        # First errors, as (command number, error) tuples
+        self.errors = []
+        # Exception which stopped the load: raised by the command generator,
+        # while encoding the command or while sending it
+        self.exception = None
+
+    def __repr__(self):
+        return ('<BulkLoadResult sent=%d succeeded=%d failed=%d lost=%d '
+                'rejected=%d>' % (self.sent, self.succeeded, self.failed,
+                                  self.lost, self.rejected))
+
+
+class BulkLoader(object):
+    """
+        Sends large number of commands produced by an iterable.
+
+        Commands are taken from the iterable in chunks, each chunk is sent
+        as one pipeline. Only `window` chunks are waiting for responses at
+        any time, so memory use does not depend on the number of commands.
+        Responses are not kept, only counted.
+
+        Loading stops once connection is lost. Commands which did not
+        receive responses are counted as lost.
+    """
+    def __init__(self, client, commands, chunk_size=1000, window=8,
+                 max_errors=100):
+        """
+            Constructor
+
+            :param client:
+                Client instance
+            :param commands:
+                Iterable of command arguments, for example generator of
+                `['SET', key, value]` lists
+            :param chunk_size:
+                Number of commands sent at once
+            :param window:
+                Maximum number of chunks waiting for responses
+            :param max_errors:
+                Maximum number of errors kept in the result
+        """
+        self._client = client
+        self._commands = iter(commands)
+
+        self.chunk_size = chunk_size
+        self.window = window
+        self.max_errors = max_errors
+
+        self.result = BulkLoadResult()
+
+        self._callback = None
+        self._pending = 0
+        self._stopped = False
+        self._waiting_capacity = False
+
+    def run(self, callback=None):
+        """
+            Start loading
+
+            :param callback:
+                Callback, receives `BulkLoadResult` once all commands are
+                sent and their responses are received. If not provided,
+                Future is returned instead.
+        """
+        if self._callback is not None:
+            raise ValueError('Bulk load is already running')
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = future.set_result
+
+        self._callback = callback
+        self._fill()
+        return future
+
+    # Helpers
+    def _fill(self):
+        client = self._client
+        result = self.result
+
+        while not self._stopped and self._pending < self.window:
+            if not client.has_capacity():
+                if not self._waiting_capacity:
+                    self._waiting_capacity = True
+                    client.wait_for_capacity(self._on_capacity)
+                return
+
+            try:
+                chunk = list(islice(self._commands, self.chunk_size))
+            except Exception as ex:
+                logger.exception('Bulk load failed')
+                result.exception = ex
+                self._stopped = True
+                break
+
+            if not chunk:
+                self._stopped = True
+                break
+
+            try:
+                # Whole chunk is encoded before its callback is registered,
+                # so nothing is sent if any of the commands is rejected
+                client.send_messages(
+                    chunk, partial(self._on_reply, result.sent, len(chunk))
+                )
+            except Exception as ex:
+                logger.exception('Bulk load failed')
+                result.exception = ex
+                result.rejected += len(chunk)
+                self._stopped = True
+                break
+
+            result.sent += len(chunk)
+            self._pending += 1
+
+        if self._stopped and not self._pending:
+            self._finish()
+
+    def _finish(self):
+        callback = self._callback
+        if callback is not None:
+            self._callback = None
+            callback(self.result)
+
+    # Event handlers
+    def _on_capacity(self, result):
+        self._waiting_capacity = False
+        if result is None:
+            # Connection was lost, pending chunks are completed by client
+            self._stopped = True
+        self._fill()
+
+    def _on_reply(self, offset, size, replies):
+        self._pending -= 1
+        result = self.result
+
+        if replies is None or isinstance(replies, Exception):
+            # Connection was lost or responses timed out
+            result.lost += size
+            self._stopped = True
+        else:
+            failed = 0
+            for index, reply in enumerate(replies):
+                if isinstance(reply, Exception):
+                    failed += 1
+                    if len(result.errors) < self.max_errors:
+                        result.errors.append((offset + index, reply))
+
+            result.failed += failed
+            result.succeeded += size - failed
+
+        self._fill()
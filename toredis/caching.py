@@ -0,0 +1,329 @@
+import logging
+
+from collections import OrderedDict
+from functools import partial
+
+from tornado.concurrent import Future
+
+from toredis.client import Client
+from toredis.protocol import encode_arg
+from toredis.pubsub import encode_name
+
+
+logger = logging.getLogger(__name__)
+
+# Commands which responses are cached. All of them read one key, passed as
+# the first argument.
+CACHEABLE_COMMANDS = frozenset([
+    'GET',
+    'HGET',
+    'HGETALL',
+    'HMGET',
+    'LRANGE',
+    'SMEMBERS',
+    'ZRANGE',
+])
+
+# Channel used by redis to deliver invalidation messages to the redirect
+# connection
+INVALIDATE_CHANNEL = '__redis__:invalidate'
+
+
+class CachingClient(Client):
+    """
+        Client which keeps responses to read commands in local cache.
+
+        Cache is kept consistent with server-assisted client side caching:
+        redis tracks keys read by the client (`CLIENT TRACKING`) and sends
+        invalidation messages once they are modified. With RESP3
+        (`protocol=3`) messages are received as push messages over the same
+        connection, otherwise by a separate subscribed connection, which is
+        opened on connect.
+
+        There is a short window in which stale value can be returned: when
+        key is modified by other client after the response was sent, but
+        invalidation message was not received yet.
+
+        Cached commands complete right away, callbacks are called before
+        the command method returns. Cached responses are shared, so they
+        should not be modified.
+    """
+    def __init__(self, max_entries=10000,
+                 cacheable_commands=CACHEABLE_COMMANDS, **kwargs):
+        """
+            Constructor
+
+            :param max_entries:
+                Maximum number of cached responses, at least 1. Least
+                recently used responses are evicted first.
+            :param cacheable_commands:
+                Set of commands which responses are cached
+            :param kwargs:
+                Additional Client arguments
+        """
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+
+        super(CachingClient, self).__init__(**kwargs)
+
+        self.max_entries = max_entries
+        self.cacheable_commands = cacheable_commands
+
+        # Number of responses returned from the cache and sent to redis
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Cached responses by command arguments, in least recently used
+        # order, and command arguments cached for every key
+        self._cache = OrderedDict()
+        self._keys = {}
+
+        # Incremented on every invalidation. Responses are not cached if
+        # any key was invalidated while they were in flight.
+        self._epoch = 0
+
+        self._tracking = False
+        self._invalidation_client = None
+        self._client_id = None
+        self._connect_callback = None
+
+    def connect(self, host='localhost', port=6379, callback=None):
+        """
+            Connect to redis server and enable key tracking
+
+            :param host:
+                Host to connect to
+            :param port:
+                Port
+            :param callback:
+                Optional callback to be triggered once caching is enabled
+        """
+        super(CachingClient, self).connect(
+            host, port, callback=partial(self._on_connect, host, port,
+                                         callback)
+        )
+
+    def close(self):
+        """
+            Close redis connection and the invalidation connection
+        """
+        self._close_invalidation_client()
+        super(CachingClient, self).close()
+
+    # State
+    def is_caching(self):
+        """
+            Check if key tracking is enabled and responses are cached
+        """
+        return self._tracking
+
+    def cache_size(self):
+        """
+            Number of cached responses
+        """
+        return len(self._cache)
+
+    def clear_cache(self):
+        """
+            Drop all cached responses
+        """
+        self._cache.clear()
+        self._keys.clear()
+        self._epoch += 1
+
+    # Commands
+    def send_message(self, args, callback=None, timeout=None, decode=True):
+        # Only decoded responses are cached
+        if (not self._tracking or args[0] not in self.cacheable_commands or
+                (not decode and self.encoding is not None)):
+            return super(CachingClient, self).send_message(args, callback,
+                                                           timeout, decode)
+
+        cache_key = tuple(args)
+        cache = self._cache
+        if cache_key in cache:
+            self.hits += 1
+
+            # Move to the end of LRU order
+            result = cache.pop(cache_key)
+            cache[cache_key] = result
+
+            if callback is None:
+                future = Future()
+                future.set_result(result)
+                return future
+
+            callback(result)
+            return None
+
+        self.misses += 1
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = future.set_result
+
+        super(CachingClient, self).send_message(
+            args, partial(self._on_reply, cache_key, self._epoch, callback),
+            timeout
+        )
+        return future
+
+    # Helpers
+    def _key_name(self, name):
+        # Key name as sent to Redis, to match invalidation messages
+        encoder = self._encoder
+        return encode_arg(name, encoder.encoding, encoder.errors)
+
+    def _store(self, cache_key, result):
+        cache = self._cache
+        if cache_key in cache:
+            # Same command was sent again before the first response came,
+            # replace the response without evicting anything
+            del cache[cache_key]
+            cache[cache_key] = result
+            return
+
+        if len(cache) >= self.max_entries:
+            evicted, _ = cache.popitem(last=False)
+            self._forget(evicted)
+            self.evictions += 1
+
+        cache[cache_key] = result
+
+        key = self._key_name(cache_key[1])
+        entries = self._keys.get(key)
+        if entries is None:
+            self._keys[key] = set([cache_key])
+        else:
+            entries.add(cache_key)
+
+    def _forget(self, cache_key):
+        key = self._key_name(cache_key[1])
+        entries = self._keys.get(key)
+        if entries is not None:
+            entries.discard(cache_key)
+            if not entries:
+                del self._keys[key]
+
+    def _invalidate(self, keys):
+        if keys is None:
+            # Redis flushed the database or lost the redirect connection
+            self.clear_cache()
+            return
+
+        self._epoch += 1
+        cache = self._cache
+        for key in keys:
+            for cache_key in self._keys.pop(key, ()):
+                cache.pop(cache_key, None)
+
+    def _disable(self):
+        self._tracking = False
+        self.clear_cache()
+
+    def _close_invalidation_client(self):
+        client = self._invalidation_client
+        self._invalidation_client = None
+        if client is not None and client.is_connected():
+            client.close()
+
+    # Event handlers
+    def on_push(self, message):
+        if encode_name(message[0]) == b'invalidate':
+            keys = message[1]
+            if keys is not None and self.encoding is not None:
+                if self.encoding_errors not in ('strict', 'surrogateescape'):
+                    # Key names can not be restored, drop the whole cache
+                    keys = None
+                else:
+                    keys = [self._key_name(key) for key in keys]
+            self._invalidate(keys)
+        else:
+            super(CachingClient, self).on_push(message)
+
+    def _on_connect(self, host, port, callback):
+        self._close_invalidation_client()
+        self._connect_callback = callback
+
+        if self._resp3:
+            super(CachingClient, self).send_message(
+                ['CLIENT', 'TRACKING', 'ON'], self._on_ready
+            )
+            return
+
+        client = Client(io_loop=self._io_loop, use_stack_context=False)
+        client._close_callback = partial(self._on_invalidation_close, client)
+        self._invalidation_client = client
+        client.connect(host, port,
+                       callback=partial(self._on_invalidation_connect,
+                                        client))
+
+    def _on_invalidation_connect(self, client):
+        client.send_message(['CLIENT', 'ID'],
+                            partial(self._on_client_id, client))
+
+    def _on_client_id(self, client, client_id):
+        if client_id is None or isinstance(client_id, Exception):
+            self._on_ready(client_id)
+            return
+
+        self._client_id = client_id
+        client.subscribe(INVALIDATE_CHANNEL,
+                         partial(self._on_invalidation, client))
+
+    def _on_subscribe(self):
+        # Tracking is enabled once invalidation messages can be received
+        super(CachingClient, self).send_message(
+            ['CLIENT', 'TRACKING', 'ON', 'REDIRECT', self._client_id],
+            self._on_ready
+        )
+
+    def _on_ready(self, result):
+        if result is None or isinstance(result, Exception):
+            logger.error('Failed to enable key tracking, responses are not '
+                         'cached: %s', result)
+        elif self._resp3 or self._invalidation_client is not None:
+            self._tracking = True
+
+        callback = self._connect_callback
+        self._connect_callback = None
+        if callback is not None:
+            callback()
+
+    def _on_reply(self, cache_key, epoch, callback, result):
+        # Response might be stale if any key was invalidated meanwhile
+        if (self._tracking and epoch == self._epoch and result is not None and
+                not isinstance(result, Exception)):
+            self._store(cache_key, result)
+        callback(result)
+
+    def _on_invalidation(self, client, message):
+        if message is None:
+            # Handled by _on_invalidation_close
+            return
+
+        kind = message[0]
+        if kind == b'message':
+            self._invalidate(message[2])
+        elif kind == b'subscribe' and client is self._invalidation_client:
+            self._on_subscribe()
+
+    def _on_invalidation_close(self, client):
+        if client is not self._invalidation_client:
+            return
+
+        # Invalidation messages can not be received anymore
+        self._invalidation_client = None
+        if self._connect_callback is not None:
+            self._on_ready(None)
+        else:
+            logger.warning('Invalidation connection lost, responses are not '
+                           'cached anymore')
+        self._disable()
+
+    def _on_close(self, data=None):
+        self._disable()
+        self._close_invalidation_client()
+        super(CachingClient, self)._on_close(data)
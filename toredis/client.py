@@ -1,33 +1,156 @@
+import heapq
 import logging
 import socket
 
 from collections import deque
+from functools import partial
 
-import hiredis
-
-from tornado.iostream import IOStream
+from tornado.iostream import IOStream, StreamClosedError
 from tornado.ioloop import IOLoop
-from tornado import stack_context
+from tornado.concurrent import Future
 
-from toredis.commands import RedisCommandsMixin
+from toredis.bulk import BulkLoader
+from toredis.commands import RESPONSE_OPTIONS, RedisCommandsMixin
 from toredis.pipeline import Pipeline
-from toredis._compat import string_types, text_type
+from toredis.protocol import (Encoder, INCOMPLETE, PushNotification,
+                              create_reader, read_replies)
+from toredis.pubsub import PubSub
+from toredis.scan import ScanIterator
+from toredis._compat import stack_context_wrap, write_buffer_size
 
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of bytes passed to the parser at once
+READ_CHUNK_SIZE = 65536
+
+# Pub/sub replies which are delivered to subscribers
+MESSAGE_REPLIES = (b'message', b'pmessage')
+
+# Commands which are confirmed with pub/sub replies instead of normal ones
+SUB_COMMANDS = ('SUBSCRIBE', 'PSUBSCRIBE', 'UNSUBSCRIBE', 'PUNSUBSCRIBE')
+
+
+class CommandTimeoutError(Exception):
+    """
+        Passed to the callback if response was not received in time
+    """
+
+
+class BackpressureError(Exception):
+    """
+        Raised if command is sent while client is over its limits
+    """
+
+
+def resolve_future(future, result):
+    """
+        Set future result unless it was cancelled
+    """
+    if not future.done():
+        future.set_result(result)
+
+
+def transform_response(transform, callback, result):
+    """
+        Convert command response with response callback. Errors and `None`
+        are passed as is.
+    """
+    if result is not None and not isinstance(result, Exception):
+        try:
+            result = transform(result)
+        except Exception as e:
+            result = e
+    callback(result)
+
+
+def transform_responses(transforms, callback, results):
+    """
+        Convert pipeline responses with response callbacks
+
+        :param transforms:
+            List of (index of the command in the pipeline, response callback)
+    """
+    if results is not None:
+        for index, transform in transforms:
+            result = results[index]
+            if result is not None and not isinstance(result, Exception):
+                try:
+                    results[index] = transform(result)
+                except Exception as e:
+                    results[index] = e
+    callback(results)
+
 
 class Client(RedisCommandsMixin):
     """
         Redis client class
     """
-    def __init__(self, io_loop=None):
+    def __init__(self, io_loop=None, coalesce_writes=False,
+                 coalesce_threshold=65536, use_stack_context=True,
+                 command_timeout=None, max_pending=None,
+                 max_buffer_size=None, protocol=2, encoding=None,
+                 encoding_errors='strict',
+                 response_callbacks=None):
         """
             Constructor
 
             :param io_loop:
                 Optional IOLoop instance
+            :param coalesce_writes:
+                Buffer commands sent during current IOLoop iteration and
+                write them to the socket at once on the next iteration
+            :param coalesce_threshold:
+                Write buffered commands immediately once this number of
+                bytes is buffered
+            :param use_stack_context:
+                Wrap callbacks with `tornado.stack_context`. Disable it if
+                stack contexts are not used to save some time on every
+                command. Ignored for Tornado 6 and later.
+            :param command_timeout:
+                Default number of seconds to wait for command response. If
+                response does not arrive in time, callback receives
+                `CommandTimeoutError` and connection is closed, as responses
+                to the following commands can not be matched anymore.
+            :param max_pending:
+                Maximum number of commands (or pipelines) waiting for
+                response
+            :param max_buffer_size:
+                Maximum number of bytes waiting to be written to the socket.
+                Commands sent over either limit raise `BackpressureError`,
+                use `wait_for_capacity` to wait until they can be sent.
+            :param protocol:
+                Redis protocol version. With 3, RESP3 is negotiated with
+                HELLO on connect: maps are returned as dicts, and pub/sub
+                and normal commands can share the connection. If server does
+                not support RESP3, client falls back to RESP2.
+            :param encoding:
+                Encoding to decode replies with. Replies are decoded by
+                hiredis while they are parsed. If `None`, replies are
+                returned as bytes. Use `with_bytes` to get bytes for
+                particular commands. Pub/sub messages are not decoded,
+                unless they are received as RESP3 push messages.
+            :param encoding_errors:
+                Decoding error handling scheme. With 'strict', command
+                receives `UnicodeDecodeError` if its reply can not be
+                decoded. RESP3 push messages are decoded too and are not
+                replies of any command, so 'strict' can not be used with
+                `protocol=3`; use 'surrogateescape' to keep binary data.
+            :param response_callbacks:
+                Dict of callbacks which convert responses, by command name.
+                By default responses are returned as they are parsed. With
+                `RESPONSE_CALLBACKS` HGETALL responses are returned as dicts,
+                WITHSCORES responses as lists of (member, score) tuples, INFO
+                as dict and responses of EXISTS, SISMEMBER and similar
+                commands as bools.
         """
+        if protocol == 3 and PushNotification is None:
+            raise ValueError('RESP3 requires hiredis 3.0 or later')
+        if (protocol == 3 and encoding is not None and
+                encoding_errors == 'strict'):
+            raise ValueError('RESP3 push messages are decoded with client '
+                             'encoding, use encoding_errors other than '
+                             'strict')
         self._io_loop = io_loop or IOLoop.instance()
 
         self._stream = None
@@ -35,8 +158,77 @@ class Client(RedisCommandsMixin):
         self.reader = None
         self.callbacks = deque()
 
+        self.encoding = encoding
+        self.encoding_errors = encoding_errors
+        self.response_callbacks = response_callbacks
+        if encoding is not None:
+            self._encoder = Encoder(encoding, encoding_errors)
+        else:
+            self._encoder = Encoder()
+
+        # Whether reader currently decodes replies, numbers of commands
+        # which replies are kept as bytes and error raised by the reader
+        # for reply it failed to decode
+        self._decoding = encoding is not None
+        self._bytes_commands = deque()
+        self._decode_error = None
+
+        self.coalesce_writes = coalesce_writes
+        self.coalesce_threshold = coalesce_threshold
+        self._flush_scheduled = False
+
+        if use_stack_context:
+            self._wrap_callback = stack_context_wrap
+        else:
+            self._wrap_callback = None
+
         self._sub_callback = False
 
+        # Deliver all pub/sub replies parsed from one read at once, as a
+        # list. See `set_sub_batch`.
+        self._sub_batch = False
+
+        # Number of channels and patterns sent with SUBSCRIBE and PSUBSCRIBE
+        # which were not confirmed yet. Client leaves pub/sub mode once
+        # redis reports no subscriptions and nothing is pending.
+        self._sub_pending = 0
+
+        self.protocol = protocol
+
+        # RESP3 state: whether it is negotiated, callback for pub/sub push
+        # messages, pub/sub commands waiting for confirmation as
+        # [kind, number of confirmations, callback] lists and messages
+        # parsed from current read in batch mode
+        self._resp3 = False
+        self._push_sub_callback = None
+        self._push_waiters = deque()
+        self._push_batch = []
+
+        # Whether HELLO reply is awaited and pub/sub commands issued
+        # meanwhile, as (send, callback) tuples. Pub/sub mode depends on
+        # the negotiated protocol, so they are sent once it is known.
+        self._hello_pending = False
+        self._hello_queue = []
+
+        self.command_timeout = command_timeout
+
+        # Heap of (deadline, command number) for commands with timeout and
+        # number of commands sent. Command is completed once number of
+        # commands sent minus number of pending callbacks exceeds its number.
+        self._deadlines = []
+        self._sent_count = 0
+        self._timeout_handle = None
+        self._timeout_deadline = None
+
+        self.max_pending = max_pending
+        self.max_buffer_size = max_buffer_size
+        self._capacity_waiters = deque()
+        self._watching_writes = False
+
+        # Hooks used by ConnectionPool
+        self._idle_callback = None
+        self._close_callback = None
+
     def connect(self, host='localhost', port=6379, callback=None):
         """
             Connect to redis server
@@ -64,6 +256,16 @@ class Client(RedisCommandsMixin):
         """
         pass
 
+    def on_push(self, message):
+        """
+            Override this method to handle RESP3 push messages other than
+            pub/sub ones, for example key invalidation messages
+
+            :param message:
+                Push message
+        """
+        logger.debug('Ignored push message: %r', message)
+
     # State
     def is_idle(self):
         """
@@ -77,52 +279,184 @@ class Client(RedisCommandsMixin):
         """
         return bool(self._stream) and not self._stream.closed()
 
-    def send_message(self, args, callback=None):
+    def is_subscribed(self):
+        """
+            Check if client is subscribed to any channels or patterns
+        """
+        return (self._sub_callback is not None or
+                self._push_sub_callback is not None)
+
+    def has_capacity(self):
+        """
+            Check if commands can be sent without exceeding `max_pending`
+            and `max_buffer_size` limits
+        """
+        if (self.max_pending is not None and
+                len(self.callbacks) >= self.max_pending):
+            return False
+
+        if (self.max_buffer_size is not None and
+                self._buffer_size() >= self.max_buffer_size):
+            return False
+
+        return True
+
+    def wait_for_capacity(self, callback=None):
+        """
+            Wait until commands can be sent without exceeding limits
+
+            :param callback:
+                Callback, receives `True` or `None` if connection was lost.
+                If not provided, Future is returned instead.
+        """
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        if self.has_capacity():
+            callback(True)
+        else:
+            self._capacity_waiters.append(callback)
+            self._watch_writes()
+        return future
+
+    def send_message(self, args, callback=None, timeout=None, decode=True):
         """
             Send command to redis
 
             :param args:
                 Arguments to send
             :param callback:
-                Callback
+                Callback. If not provided, Future is returned instead.
+            :param timeout:
+                Number of seconds to wait for response, overrides
+                `command_timeout`
+            :param decode:
+                Decode reply with client `encoding`. If `False`, reply is
+                returned as bytes.
         """
         # Special case for pub-sub
         cmd = args[0]
 
+        if self._hello_pending and cmd in SUB_COMMANDS:
+            return self._defer_until_hello(
+                partial(Client.send_message, self, args, timeout=timeout,
+                        decode=decode),
+                callback
+            )
+
         if (self._sub_callback is not None and
             cmd not in ('PSUBSCRIBE', 'SUBSCRIBE', 'PUNSUBSCRIBE', 'UNSUBSCRIBE', 'QUIT')):
             raise ValueError('Cannot run normal command over PUBSUB connection')
 
+        if not self.has_capacity():
+            raise BackpressureError('Too many pending commands')
+
         # Send command
-        self._stream.write(self.format_message(args))
-        if callback is not None:
-            callback = stack_context.wrap(callback)
+        self._encoder.pack(args)
+        self._write()
+
+        if self._resp3 and cmd in SUB_COMMANDS:
+            return self._add_push_waiter(args, callback)
+
+        if (self._sub_callback is not None and
+                cmd in ('SUBSCRIBE', 'PSUBSCRIBE')):
+            self._sub_pending += len(args) - 1
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+        elif self._wrap_callback is not None:
+            callback = self._wrap_callback(callback)
+
+        response_callbacks = self.response_callbacks
+        if response_callbacks and cmd in response_callbacks:
+            transform = self._get_response_callback(args)
+            if transform is not None:
+                callback = partial(transform_response, transform, callback)
+
         self.callbacks.append((callback, None))
+        self._add_deadline(timeout)
+        if not decode and self.encoding is not None:
+            self._bytes_commands.append(self._sent_count)
+        return future
 
-    def send_messages(self, args_pipeline, callback=None):
+    def send_messages(self, args_pipeline, callback=None, timeout=None,
+                      decode=True):
         """
-            Send command pipeline to redis
+            Send command pipeline to redis. If any of the commands can not
+            be encoded, the exception is raised and none of them is sent.
 
             :param args_pipeline:
                 Arguments pipeline to send
             :param callback:
-                Callback
+                Callback. If not provided, Future is returned instead.
+            :param timeout:
+                Number of seconds to wait for all responses, overrides
+                `command_timeout`
+            :param decode:
+                Decode replies with client `encoding`. If `False`, replies
+                are returned as bytes.
         """
         if not args_pipeline:
             # Exit immediately if there's no pipeline commands
             # Otherwise registering callback white sending empty message
             #   will cause callback mismatch going forward
+            if callback is None:
+                future = Future()
+                future.set_result([])
+                return future
             return
 
         if self._sub_callback is not None:
             raise ValueError('Cannot run pipeline over PUBSUB connection')
 
+        if not self.has_capacity():
+            raise BackpressureError('Too many pending commands')
+
         # Send command pipeline
-        messages = [self.format_message(args) for args in args_pipeline]
-        self._stream.write(b"".join(messages))
-        if callback is not None:
-            callback = stack_context.wrap(callback)
-        self.callbacks.append((callback, (len(messages), [])))
+        self._encoder.pack_pipeline(args_pipeline)
+        self._write()
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+        elif self._wrap_callback is not None:
+            callback = self._wrap_callback(callback)
+
+        if self.response_callbacks:
+            transforms = self._get_response_callbacks(args_pipeline)
+            if transforms:
+                callback = partial(transform_responses, transforms, callback)
+
+        self.callbacks.append((callback, (len(args_pipeline), [])))
+        self._add_deadline(timeout)
+        if not decode and self.encoding is not None:
+            self._bytes_commands.append(self._sent_count)
+        return future
+
+    def with_timeout(self, timeout):
+        """
+            Get object for running commands with custom timeout::
+
+                conn.with_timeout(0.5).get('foo', callback=callback)
+
+            :param timeout:
+                Number of seconds to wait for response
+        """
+        return TimeoutCommands(self, timeout)
+
+    def with_bytes(self):
+        """
+            Get object for running commands which replies are not decoded,
+            for example to read binary values::
+
+                conn.with_bytes().get('image', callback=callback)
+        """
+        return BytesCommands(self)
 
     def format_message(self, args):
         """
@@ -131,24 +465,24 @@ class Client(RedisCommandsMixin):
             :param args:
                 Message data
         """
-        l = "*%d" % len(args)
-        lines = [l.encode('utf-8')]
-        for arg in args:
-            if not isinstance(arg, string_types):
-                arg = str(arg)
-            if isinstance(arg, text_type):
-                arg = arg.encode('utf-8')
-            l = "$%d" % len(arg)
-            lines.append(l.encode('utf-8'))
-            lines.append(arg)
-        lines.append(b"")
-        return b"\r\n".join(lines)
+        return Encoder().encode(args)
+
+    def flush(self):
+        """
+            Write buffered commands to the socket
+        """
+        self._flush_scheduled = False
+
+        chunks = self._encoder.get_chunks()
+        if chunks and self.is_connected():
+            self._write_chunks(chunks)
 
     def close(self):
         """
             Close redis connection
         """
         self.quit()
+        self.flush()
         self._stream.close()
 
     # Pub/sub commands
@@ -161,82 +495,597 @@ class Client(RedisCommandsMixin):
             :param callback:
                 callback
         """
-        self._set_sub_callback(callback)
-        super(Client, self).psubscribe(patterns)
+        send = partial(self._send_sub, super(Client, self).psubscribe,
+                       patterns, callback)
+        if self._hello_pending:
+            return self._defer_until_hello(send, None)
+        return send(None)
 
     def subscribe(self, channels, callback=None):
         """
-            Customized subscribe command - will keep one callback for all incoming messages
+            Customized subscribe command - will keep one callback for all incoming messages.
+
+            Client returns to normal mode once it is unsubscribed from all
+            channels and patterns. Futures of pub/sub commands are resolved
+            with the last UNSUBSCRIBE or PUNSUBSCRIBE reply at that point.
 
             :param channels:
                 string or list of strings
             :param callback:
                 Callback
         """
-        self._set_sub_callback(callback)
-        super(Client, self).subscribe(channels)
+        send = partial(self._send_sub, super(Client, self).subscribe,
+                       channels, callback)
+        if self._hello_pending:
+            return self._defer_until_hello(send, None)
+        return send(None)
+
+    def set_sub_batch(self, batch=True):
+        """
+            Deliver all pub/sub replies parsed from one socket read to SUB
+            callback at once, as a list. Batch mode is reset once client
+            leaves pub/sub mode, so it should be set before subscribing.
+
+            :param batch:
+                Enable or disable batch mode
+        """
+        self._sub_batch = batch
+
+    def _send_sub(self, method, names, sub_callback, callback):
+        self._set_sub_callback(sub_callback)
+        return method(names, callback)
+
+    def _defer_until_hello(self, send, callback):
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        self._hello_queue.append((send, callback))
+        return future
 
     def _set_sub_callback(self, callback):
+        if self._resp3:
+            if self._push_sub_callback is None:
+                self._push_sub_callback = callback
+
+            assert self._push_sub_callback == callback
+            return
+
         if self._sub_callback is None:
             self._sub_callback = callback
 
+            # Pub/sub replies are not decoded
+            if self.encoding is not None:
+                self._set_decoding(False)
+
         assert self._sub_callback == callback
 
     # Helpers
+    def _get_response_callback(self, args):
+        cmd = args[0]
+        transform = self.response_callbacks.get(cmd)
+        option = RESPONSE_OPTIONS.get(cmd)
+        if option is not None:
+            # Response is converted only if command is sent with the flag
+            index, flag = option
+            if len(args) <= index or args[index] != flag:
+                return None
+        return transform
+
+    def _get_response_callbacks(self, args_pipeline):
+        response_callbacks = self.response_callbacks
+        transforms = []
+        for index, args in enumerate(args_pipeline):
+            if args[0] in response_callbacks:
+                transform = self._get_response_callback(args)
+                if transform is not None:
+                    transforms.append((index, transform))
+        return transforms
+
+    def _set_decoding(self, decode):
+        if decode != self._decoding:
+            self._decoding = decode
+            if decode:
+                self.reader.set_encoding(self.encoding, self.encoding_errors)
+            else:
+                self.reader.set_encoding(None)
+
+    def _select_decoding(self):
+        # Reader is switched before reply of the first pending command is
+        # parsed
+        first_pending = self._sent_count - len(self.callbacks) + 1
+        numbers = self._bytes_commands
+        while numbers and numbers[0] < first_pending:
+            numbers.popleft()
+        self._set_decoding(not numbers or numbers[0] != first_pending)
+
+    def _buffer_size(self):
+        size = self._encoder.pending_size()
+        if self.is_connected():
+            size += write_buffer_size(self._stream)
+        return size
+
+    def _watch_writes(self):
+        # Check capacity again once socket write buffer is flushed
+        if (self._watching_writes or self.max_buffer_size is None or
+                not self.is_connected() or
+                self._buffer_size() < self.max_buffer_size):
+            return
+
+        self._watching_writes = True
+        self.flush()
+        self._io_loop.add_future(self._stream.write(b''),
+                                 self._on_writes_flushed)
+
+    def _notify_capacity(self):
+        waiters = self._capacity_waiters
+        while waiters and self.has_capacity():
+            callback = waiters.popleft()
+            try:
+                callback(True)
+            except:
+                logger.exception('Callback failed')
+
+        if waiters:
+            self._watch_writes()
+
+    def _add_push_waiter(self, args, callback):
+        # Confirmations of RESP3 pub/sub commands are push messages, so
+        # their callbacks are not matched with normal responses
+        cmd = args[0]
+        if cmd in ('SUBSCRIBE', 'PSUBSCRIBE'):
+            self._sub_pending += len(args) - 1
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+        elif self._wrap_callback is not None:
+            callback = self._wrap_callback(callback)
+
+        # Command without arguments unsubscribes from everything, callback
+        # is completed with the first confirmation
+        self._push_waiters.append([cmd.lower().encode(),
+                                   max(len(args) - 1, 1), callback])
+        return future
+
+    def _add_deadline(self, timeout):
+        self._sent_count += 1
+
+        if timeout is None:
+            timeout = self.command_timeout
+        # Responses to pub/sub commands are not matched with callbacks
+        if timeout is None or self._sub_callback is not None:
+            return
+
+        deadline = self._io_loop.time() + timeout
+        heapq.heappush(self._deadlines, (deadline, self._sent_count))
+
+        if self._timeout_deadline is None or deadline < self._timeout_deadline:
+            self._schedule_timeout(deadline)
+
+    def _schedule_timeout(self, deadline):
+        if self._timeout_handle is not None:
+            self._io_loop.remove_timeout(self._timeout_handle)
+
+        self._timeout_deadline = deadline
+        self._timeout_handle = self._io_loop.add_timeout(deadline,
+                                                         self._on_timeout)
+
+    def _cancel_timeout(self):
+        if self._timeout_handle is not None:
+            self._io_loop.remove_timeout(self._timeout_handle)
+        self._timeout_handle = None
+        self._timeout_deadline = None
+        self._deadlines = []
+
+    def _write_chunks(self, chunks):
+        write = self._stream.write
+        for chunk in chunks:
+            write(chunk)
+
+    def _write(self):
+        if not self.coalesce_writes:
+            self._write_chunks(self._encoder.get_chunks())
+        elif self._stream.closed():
+            # Drop command and report error right away
+            self._encoder.get_chunks()
+            raise StreamClosedError()
+        elif self._encoder.pending_size() >= self.coalesce_threshold:
+            self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._io_loop.add_callback(self.flush)
+
     def _connect(self, sock, addr, callback):
         self._reset()
 
-        self._stream = IOStream(sock)
+        self._stream = stream = IOStream(sock)
 
-        def _stream_connect_callback():
-            callback()
+        def _stream_connect_callback(future):
+            if future.exception() is not None:
+                # Report failed connection attempt as disconnection
+                if stream is self._stream:
+                    self._on_close()
+                return
+
+            self._read(stream)
+
+            if callback is not None:
+                callback()
+
+        connect_future = stream.connect(addr)
+
+        if self.protocol == 3:
+            # Sent before any other command, connection is ready once the
+            # protocol is negotiated
+            Client.send_message(self, ['HELLO', 3],
+                                partial(self._on_hello, callback))
+            self._hello_pending = True
+            callback = None
+
+        self._io_loop.add_future(connect_future, _stream_connect_callback)
 
-            self._stream.read_until_close(self._on_close, self._on_read)
+    def _read(self, stream, future=None):
+        # Read loop, handles all chunks that are already buffered by the
+        # stream without going through the IOLoop
+        while True:
+            if future is None:
+                try:
+                    future = stream.read_bytes(READ_CHUNK_SIZE, partial=True)
+                except StreamClosedError:
+                    break
+
+                if not future.done():
+                    self._io_loop.add_future(
+                        future, partial(self._on_read_future, stream)
+                    )
+                    return
+
+            if future.exception() is not None:
+                break
+
+            self._on_read(future.result())
+            future = None
+
+            # Callback might have closed or replaced the stream
+            if stream is not self._stream:
+                return
 
-        self._stream.connect(addr, callback=_stream_connect_callback)
+        if stream is self._stream:
+            self._on_close()
+
+    def _on_read_future(self, stream, future):
+        self._read(stream, future)
 
     # Event handlers
     def _on_read(self, data):
         self.reader.feed(data)
 
-        resp = self.reader.gets()
+        while True:
+            try:
+                self._on_replies()
+            except UnicodeDecodeError as e:
+                # Reader drops reply it failed to decode, so the error is
+                # passed to the command instead
+                self._decode_error = e
+            else:
+                break
+
+    def _on_replies(self):
+        if self._sub_batch and self._sub_callback:
+            if not self._on_sub_batch():
+                if self._capacity_waiters:
+                    self._notify_capacity()
+                return
 
-        while resp is not False:
-            if self._sub_callback:
+        if self._decode_error is not None:
+            resp = self._decode_error
+            self._decode_error = None
+        else:
+            if self._bytes_commands and not self._sub_callback:
+                self._select_decoding()
+            resp = self.reader.gets()
+
+        while resp is not INCOMPLETE:
+            if type(resp) is PushNotification:
+                self._on_push(resp)
+            elif self._sub_callback:
                 try:
                     self._sub_callback(resp)
                 except:
                     logger.exception('SUB callback failed')
+
+                if (type(resp) is list and resp[0] not in MESSAGE_REPLIES and
+                        self._sub_callback):
+                    self._on_sub_reply(resp)
             else:
                 if self.callbacks:
                     callback, callback_data = self.callbacks[0]
                     if callback_data is None:
                         callback_resp = resp
                     else:
-                        # handle pipeline responses
+                        # handle pipeline responses, taking all parsed
+                        # replies of the pipeline at once
                         num_resp, callback_resp = callback_data
                         callback_resp.append(resp)
-                        while len(callback_resp) < num_resp:
-                            resp = self.reader.gets()
-                            if resp is False:
+                        if len(callback_resp) < num_resp:
+                            if self._resp3:
+                                self._read_replies_resp3(
+                                    callback_resp,
+                                    num_resp - len(callback_resp)
+                                )
+                            else:
+                                read_replies(self.reader, callback_resp,
+                                             num_resp - len(callback_resp))
+                            if len(callback_resp) < num_resp:
                                 # callback_resp is yet incomplete
+                                if self._push_batch:
+                                    self._flush_push_batch()
                                 return
-                            callback_resp.append(resp)
                     self.callbacks.popleft()
                     if callback is not None:
                         try:
                             callback(callback_resp)
                         except:
                             logger.exception('Callback failed')
+
+                    if not self.callbacks and self._idle_callback is not None:
+                        self._idle_callback()
                 else:
                     logger.debug('Ignored response: %s' % repr(resp))
 
+            if self._bytes_commands and not self._sub_callback:
+                self._select_decoding()
             resp = self.reader.gets()
 
+        if self._push_batch:
+            self._flush_push_batch()
+
+        if self._capacity_waiters:
+            self._notify_capacity()
+
+    def _read_replies_resp3(self, replies, count):
+        # Push messages can arrive between pipeline responses
+        gets = self.reader.gets
+        while count:
+            resp = gets()
+            if resp is INCOMPLETE:
+                return
+            if type(resp) is PushNotification:
+                self._on_push(resp)
+            else:
+                replies.append(resp)
+                count -= 1
+
+    def _on_push(self, resp):
+        kind = resp[0]
+        if type(kind) is not bytes:
+            # Push messages are decoded with client encoding
+            kind = kind.encode()
+        callback = self._push_sub_callback
+
+        if kind in MESSAGE_REPLIES:
+            if callback is None:
+                logger.debug('Ignored message: %r', resp)
+            elif self._sub_batch:
+                self._push_batch.append(resp)
+            else:
+                try:
+                    callback(resp)
+                except:
+                    logger.exception('SUB callback failed')
+            return
+
+        if kind not in (b'subscribe', b'psubscribe', b'unsubscribe',
+                        b'punsubscribe'):
+            try:
+                self.on_push(resp)
+            except:
+                logger.exception('Push message handler failed')
+            return
+
+        if callback is not None:
+            if self._sub_batch:
+                self._push_batch.append(resp)
+            else:
+                try:
+                    callback(resp)
+                except:
+                    logger.exception('SUB callback failed')
+
+        waiters = self._push_waiters
+        if waiters and waiters[0][0] == kind:
+            waiter = waiters[0]
+            waiter[1] -= 1
+            if waiter[1] <= 0:
+                waiters.popleft()
+
+            waiter_callback = waiter[2]
+            if waiter_callback is not None:
+                waiter[2] = None
+                try:
+                    waiter_callback(resp)
+                except:
+                    logger.exception('Callback failed')
+
+        if self._is_last_sub_reply(kind, resp):
+            if self._push_batch:
+                self._flush_push_batch()
+            self._push_sub_callback = None
+            self._sub_batch = False
+            self._sub_pending = 0
+
+    def _flush_push_batch(self):
+        batch = self._push_batch
+        self._push_batch = []
+        if self._push_sub_callback is not None:
+            try:
+                self._push_sub_callback(batch)
+            except:
+                logger.exception('SUB callback failed')
+
+    def _on_sub_batch(self):
+        gets = self.reader.gets
+
+        replies = []
+        last_reply = None
+        resp = gets()
+        while resp is not INCOMPLETE:
+            replies.append(resp)
+            if type(resp) is list and resp[0] not in MESSAGE_REPLIES:
+                # Following replies are not pub/sub anymore once client
+                # leaves pub/sub mode
+                if self._is_last_sub_reply(resp[0], resp):
+                    last_reply = resp
+                    break
+            resp = gets()
+
+        if replies:
+            try:
+                self._sub_callback(replies)
+            except:
+                logger.exception('SUB callback failed')
+
+        if last_reply is not None:
+            self._leave_sub_mode(last_reply)
+            return True
+        return False
+
+    def _on_sub_reply(self, resp):
+        if self._is_last_sub_reply(resp[0], resp):
+            self._leave_sub_mode(resp)
+
+    def _is_last_sub_reply(self, kind, resp):
+        if kind in (b'subscribe', b'psubscribe'):
+            self._sub_pending -= 1
+        elif kind in (b'unsubscribe', b'punsubscribe'):
+            return resp[2] == 0 and self._sub_pending <= 0
+        return False
+
+    def _leave_sub_mode(self, resp):
+        self._sub_callback = None
+        self._sub_batch = False
+        self._sub_pending = 0
+
+        if self.encoding is not None:
+            self._set_decoding(True)
+
+        # Replies to pub/sub commands were passed to SUB callback, so their
+        # callbacks are completed with the last reply
+        callbacks = self.callbacks
+        self.callbacks = deque()
+        for callback, _ in callbacks:
+            if callback is not None:
+                try:
+                    callback(resp)
+                except:
+                    logger.exception('Callback failed')
+
+        if not self.callbacks and self._idle_callback is not None:
+            self._idle_callback()
+
+    def _on_writes_flushed(self, future):
+        self._watching_writes = False
+
+        # Stream was closed, waiters are notified by _on_close
+        if future.exception() is not None:
+            return
+
+        if self._capacity_waiters:
+            self._notify_capacity()
+
+    def _on_hello(self, callback, result):
+        self._hello_pending = False
+        queue = self._hello_queue
+        self._hello_queue = []
+
+        if result is None or isinstance(result, CommandTimeoutError):
+            # Connection was lost
+            for _, queued_callback in queue:
+                try:
+                    queued_callback(None)
+                except:
+                    logger.exception('Callback failed')
+            return
+
+        if isinstance(result, Exception):
+            logger.warning('RESP3 is not supported by the server, using '
+                           'RESP2: %s', result)
+        else:
+            self._resp3 = True
+
+        # Pub/sub commands issued before the protocol was known
+        for send, queued_callback in queue:
+            try:
+                send(queued_callback)
+            except Exception as ex:
+                logger.exception('Failed to send pub/sub command')
+                queued_callback(ex)
+
+        if callback is not None:
+            callback()
+
+    def _on_timeout(self):
+        self._timeout_handle = None
+        self._timeout_deadline = None
+
+        # Drop deadlines of completed commands
+        first_pending = self._sent_count - len(self.callbacks) + 1
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][1] < first_pending:
+            heapq.heappop(deadlines)
+
+        if not deadlines:
+            return
+
+        now = self._io_loop.time()
+        if deadlines[0][0] > now:
+            self._schedule_timeout(deadlines[0][0])
+            return
+
+        expired = set(number - first_pending
+                      for deadline, number in deadlines if deadline <= now)
+        logger.warning('Command timed out, closing connection')
+
+        # Following responses can not be matched with callbacks anymore, so
+        # connection is closed. Commands which did not time out are left to
+        # `_on_close`, as if connection was lost.
+        callbacks = self.callbacks
+        self.callbacks = deque()
+        completed = []
+        for index, item in enumerate(callbacks):
+            if index in expired:
+                completed.append((item[0],
+                                  CommandTimeoutError('Command timed out')))
+            else:
+                self.callbacks.append(item)
+        self._cancel_timeout()
+
+        if self.is_connected():
+            self._stream.close()
+        else:
+            # Connection is already gone, nothing is left for `_on_close`
+            completed.extend((callback, None) for callback, _ in
+                             self.callbacks)
+            self.callbacks = deque()
+
+        for callback, result in completed:
+            if callback is None:
+                continue
+
+            try:
+                callback(result)
+            except:
+                logger.exception('Callback failed')
+
     def _on_close(self, data=None):
         if data is not None:
             self._on_read(data)
 
+        self._cancel_timeout()
+
         # Trigger any pending callbacks
         callbacks = self.callbacks
         self.callbacks = deque()
@@ -257,12 +1106,152 @@ class Client(RedisCommandsMixin):
                 logger.exception('Exception in SUB callback')
             self._sub_callback = None
 
+        if self._push_sub_callback is not None:
+            try:
+                self._push_sub_callback(None)
+            except:
+                logger.exception('Exception in SUB callback')
+            self._push_sub_callback = None
+
+        waiters = self._push_waiters
+        self._push_waiters = deque()
+        for _, _, callback in waiters:
+            if callback is not None:
+                try:
+                    callback(None)
+                except:
+                    logger.exception('Callback failed')
+
+        waiters = self._capacity_waiters
+        self._capacity_waiters = deque()
+        for callback in waiters:
+            try:
+                callback(None)
+            except:
+                logger.exception('Callback failed')
+
         # Trigger on_disconnect
         self.on_disconnect()
 
+        if self._close_callback is not None:
+            self._close_callback()
+
     def _reset(self):
-        self.reader = hiredis.Reader()
+        self.reader = create_reader(self.encoding, self.encoding_errors)
+        self._decoding = self.encoding is not None
+        self._bytes_commands = deque()
+        self._decode_error = None
         self._sub_callback = None
+        self._sub_pending = 0
+
+        self._resp3 = False
+        self._push_sub_callback = None
+        self._push_waiters = deque()
+        self._push_batch = []
+        self._hello_pending = False
+        self._hello_queue = []
+
+        # Drop commands buffered for previous connection
+        self._encoder.get_chunks()
+        self._flush_scheduled = False
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    def pubsub(self, disconnect_callback=None, batch=False):
+        return PubSub(self, disconnect_callback, batch)
+
+    def bulk_load(self, commands, chunk_size=1000, window=8,
+                  callback=None):
+        """
+            Send commands produced by an iterable with bounded memory use,
+            see `BulkLoader`
+
+            :param commands:
+                Iterable of command arguments
+            :param chunk_size:
+                Number of commands sent at once
+            :param window:
+                Maximum number of chunks waiting for responses
+            :param callback:
+                Callback, receives `BulkLoadResult`. If not provided, Future
+                is returned instead.
+        """
+        loader = BulkLoader(self, commands, chunk_size, window)
+        return loader.run(callback)
+
+    def scan_iter(self, match=None, count=None, prefetch=False):
+        """
+            Iterate keys with SCAN, see `ScanIterator`
+        """
+        return ScanIterator(self, 'SCAN', None, match, count, prefetch)
+
+    def sscan_iter(self, key, match=None, count=None, prefetch=False):
+        """
+            Iterate set members with SSCAN, see `ScanIterator`
+        """
+        return ScanIterator(self, 'SSCAN', key, match, count, prefetch)
+
+    def hscan_iter(self, key, match=None, count=None, prefetch=False):
+        """
+            Iterate hash fields and values with HSCAN, see `ScanIterator`
+        """
+        return ScanIterator(self, 'HSCAN', key, match, count, prefetch)
+
+    def zscan_iter(self, key, match=None, count=None, prefetch=False):
+        """
+            Iterate sorted set members and scores with ZSCAN, see
+            `ScanIterator`
+        """
+        return ScanIterator(self, 'ZSCAN', key, match, count, prefetch)
+
+
+class TimeoutCommands(RedisCommandsMixin):
+    """
+        Runs client commands with custom timeout
+    """
+    def __init__(self, client, timeout):
+        """
+            Constructor
+
+            :param client:
+                Client instance
+            :param timeout:
+                Number of seconds to wait for response
+        """
+        self._client = client
+        self.timeout = timeout
+
+    def send_message(self, args, callback=None):
+        return self._client.send_message(args, callback, timeout=self.timeout)
+
+    def send_messages(self, args_pipeline, callback=None):
+        return self._client.send_messages(args_pipeline, callback,
+                                          timeout=self.timeout)
+
+    def pipeline(self):
+        return Pipeline(self)
+
+
+class BytesCommands(RedisCommandsMixin):
+    """
+        Runs client commands without decoding their replies
+    """
+    def __init__(self, client):
+        """
+            Constructor
+
+            :param client:
+                Client instance
+        """
+        self._client = client
+
+    def send_message(self, args, callback=None):
+        return self._client.send_message(args, callback, decode=False)
+
+    def send_messages(self, args_pipeline, callback=None):
+        return self._client.send_messages(args_pipeline, callback,
+                                          decode=False)
 
     def pipeline(self):
         return Pipeline(self)
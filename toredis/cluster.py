@@ -0,0 +1,459 @@
+import logging
+
+from functools import partial
+
+from hiredis import ReplyError
+
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from toredis.client import Client, resolve_future
+from toredis.commands import RedisCommandsMixin, KEY_POSITIONS
+from toredis.pipeline import Pipeline
+from toredis._compat import text_type
+
+
+logger = logging.getLogger(__name__)
+
+SLOT_COUNT = 16384
+
+# Commands that depend on connection state and can not be routed by key
+UNSUPPORTED_COMMANDS = frozenset([
+    'PSUBSCRIBE', 'SUBSCRIBE', 'PUNSUBSCRIBE', 'UNSUBSCRIBE',
+    'MULTI', 'EXEC', 'DISCARD', 'WATCH', 'UNWATCH', 'SELECT', 'MONITOR',
+])
+
+# Delay before retrying command when cluster is reconfigured
+RETRY_DELAY = 0.1
+
+
+def _make_crc16_table():
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = ((crc << 1) ^ 0x1021) & 0xffff
+            else:
+                crc = (crc << 1) & 0xffff
+        table.append(crc)
+    return table
+
+CRC16_TABLE = _make_crc16_table()
+
+
+def crc16(data):
+    """
+        CRC16 (XMODEM) checksum used by redis cluster
+    """
+    crc = 0
+    for byte in bytearray(data):
+        crc = ((crc << 8) & 0xff00) ^ CRC16_TABLE[((crc >> 8) ^ byte) & 0xff]
+    return crc
+
+
+def encode_key(key):
+    """
+        Get key as bytes
+
+        :param key:
+            Key name
+    """
+    if not isinstance(key, (bytes, bytearray)):
+        if not isinstance(key, text_type):
+            key = str(key)
+        if isinstance(key, text_type):
+            key = key.encode('utf-8')
+    return key
+
+
+def hash_tag(key):
+    """
+        Get part of the key which is used for hashing: contents of the
+        first non-empty `{...}` hash tag or the whole key.
+
+        :param key:
+            Key name
+    """
+    key = encode_key(key)
+
+    start = key.find(b'{')
+    if start != -1:
+        end = key.find(b'}', start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+
+    return key
+
+
+def key_slot(key):
+    """
+        Get cluster hash slot for the key
+
+        :param key:
+            Key name
+    """
+    return crc16(hash_tag(key)) % SLOT_COUNT
+
+
+def command_key(args):
+    """
+        Get first key of the command or None if command has no keys
+
+        :param args:
+            Command arguments
+    """
+    pos = KEY_POSITIONS.get(args[0])
+    if pos is not None and len(args) > pos:
+        return args[pos]
+    return None
+
+
+class PipelineResult(object):
+    """
+        Collects responses of pipeline commands executed by different
+        cluster nodes in original command order. If connection to any of
+        the nodes is lost, whole pipeline is completed with `None`.
+    """
+    def __init__(self, size, callback):
+        self.result = [None] * size
+        self.remaining = size
+        self.callback = callback
+
+    def set(self, index, value):
+        if self.callback is None:
+            # Pipeline already failed
+            return
+
+        self.result[index] = value
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.callback(self.result)
+
+    def fail(self):
+        callback = self.callback
+        if callback is not None:
+            self.callback = None
+            callback(None)
+
+
+class ClusterClient(RedisCommandsMixin):
+    """
+        Redis cluster client.
+
+        Keeps one connection per cluster node and sends every command to the
+        node which serves hash slot of the first command key. Commands
+        without keys are sent to the node which provided the slot map.
+        MOVED and ASK redirections are followed transparently.
+    """
+    def __init__(self, startup_nodes, io_loop=None, client_class=Client,
+                 max_redirects=5):
+        """
+            Constructor
+
+            :param startup_nodes:
+                List of (host, port) tuples used to discover cluster nodes
+            :param io_loop:
+                Optional IOLoop instance
+            :param client_class:
+                Client class used to connect to cluster nodes
+            :param max_redirects:
+                Maximum number of redirections for one command
+        """
+        self._io_loop = io_loop or IOLoop.instance()
+
+        self.startup_nodes = list(startup_nodes)
+        self.client_class = client_class
+        self.max_redirects = max_redirects
+
+        self._nodes = {}
+        self._slots = None
+        self._default_node = None
+
+        self._pending = []
+        self._refresh_callbacks = None
+
+    def connect(self, callback=None):
+        """
+            Load cluster slot map
+
+            :param callback:
+                Optional callback to be triggered once slot map is loaded
+        """
+        def _on_refresh(success):
+            if success and callback is not None:
+                callback()
+
+        self.refresh_slots(_on_refresh)
+
+    def close(self):
+        """
+            Close all cluster node connections
+        """
+        nodes = self._nodes
+        self._nodes = {}
+        for client in nodes.values():
+            if client.is_connected():
+                client.close()
+
+    # State
+    def is_ready(self):
+        """
+            Check if cluster slot map is loaded
+        """
+        return self._slots is not None
+
+    def get_node(self, address):
+        """
+            Get connection to the cluster node. Connection is opened if
+            necessary.
+
+            :param address:
+                (host, port) tuple
+        """
+        client = self._nodes.get(address)
+        if client is None or not client.is_connected():
+            client = self.client_class(io_loop=self._io_loop)
+            client.connect(address[0], address[1])
+            self._nodes[address] = client
+        return client
+
+    def get_node_address(self, args):
+        """
+            Get address of the node which should execute the command
+
+            :param args:
+                Command arguments
+        """
+        key = command_key(args)
+        if key is None:
+            return self._default_node
+        return self._slots[key_slot(key)] or self._default_node
+
+    def refresh_slots(self, callback=None):
+        """
+            Reload cluster slot map with `CLUSTER SLOTS` command
+
+            :param callback:
+                Optional callback, receives `True` if slot map was loaded
+        """
+        if self._refresh_callbacks is not None:
+            if callback is not None:
+                self._refresh_callbacks.append(callback)
+            return
+
+        self._refresh_callbacks = [callback] if callback is not None else []
+
+        # Ask known nodes first, fall back to startup nodes
+        addresses = []
+        if self._slots is not None:
+            for address in self._slots:
+                if address is not None and address not in addresses:
+                    addresses.append(address)
+        for address in self.startup_nodes:
+            if address not in addresses:
+                addresses.append(address)
+
+        self._query_slots(addresses, 0)
+
+    # Commands
+    def send_message(self, args, callback=None):
+        """
+            Send command to the cluster node which serves command key
+
+            :param args:
+                Arguments to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        if args[0] in UNSUPPORTED_COMMANDS:
+            raise ValueError('%s is not supported by ClusterClient' % args[0])
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        run = partial(self._execute, args, callback, self.max_redirects)
+        if self._slots is None:
+            # Wait for slot map
+            self._pending.append((run, callback))
+            self.refresh_slots()
+        else:
+            run()
+
+        return future
+
+    def send_messages(self, args_pipeline, callback=None):
+        """
+            Send command pipeline to the cluster.
+
+            Commands are grouped by cluster node, each group is sent to its
+            node as one pipeline and responses are returned in original
+            order.
+
+            :param args_pipeline:
+                Arguments pipeline to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        for args in args_pipeline:
+            if args[0] in UNSUPPORTED_COMMANDS:
+                raise ValueError(
+                    '%s is not supported by ClusterClient' % args[0]
+                )
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        if not args_pipeline:
+            callback([])
+            return future
+
+        run = partial(self._execute_pipeline, args_pipeline, callback)
+        if self._slots is None:
+            self._pending.append((run, callback))
+            self.refresh_slots()
+        else:
+            run()
+
+        return future
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    # Helpers
+    def _execute(self, args, callback, redirects, address=None, asking=False):
+        if address is None:
+            address = self.get_node_address(args)
+
+        client = self.get_node(address)
+        on_response = partial(self._on_response, args, callback, redirects,
+                              address)
+
+        if asking:
+            client.send_messages([['ASKING'], args],
+                                 partial(self._on_asking_response, on_response))
+        else:
+            client.send_message(args, on_response)
+
+    def _execute_pipeline(self, args_pipeline, callback):
+        batches = {}
+        for index, args in enumerate(args_pipeline):
+            address = self.get_node_address(args)
+            batch = batches.get(address)
+            if batch is None:
+                batch = batches[address] = ([], [])
+            batch[0].append(index)
+            batch[1].append(args)
+
+        result = PipelineResult(len(args_pipeline), callback)
+        for address, (indexes, batch_args) in batches.items():
+            self.get_node(address).send_messages(
+                batch_args,
+                partial(self._on_batch_response, result, indexes, batch_args,
+                        address)
+            )
+
+    def _query_slots(self, addresses, index):
+        if index >= len(addresses):
+            logger.error('Failed to load cluster slot map')
+            self._on_slots_loaded(False)
+            return
+
+        address = addresses[index]
+        self.get_node(address).send_message(
+            ['CLUSTER', 'SLOTS'],
+            partial(self._on_cluster_slots, addresses, index)
+        )
+
+    def _on_cluster_slots(self, addresses, index, result):
+        address = addresses[index]
+
+        if not result or isinstance(result, ReplyError):
+            logger.warning('Failed to get cluster slots from %s:%s: %r',
+                           address[0], address[1], result)
+            self._query_slots(addresses, index + 1)
+            return
+
+        slots = [None] * SLOT_COUNT
+        for entry in result:
+            start, end, master = entry[0], entry[1], entry[2]
+
+            host, port = master[0], master[1]
+            if isinstance(host, bytes):
+                host = host.decode('utf-8')
+            node = (host or address[0], int(port))
+
+            for slot in range(start, end + 1):
+                slots[slot] = node
+
+        self._slots = slots
+        self._default_node = address
+        self._on_slots_loaded(True)
+
+    def _on_slots_loaded(self, success):
+        callbacks = self._refresh_callbacks
+        self._refresh_callbacks = None
+
+        pending = self._pending
+        self._pending = []
+        for run, callback in pending:
+            if success:
+                run()
+            else:
+                callback(None)
+
+        for callback in callbacks:
+            try:
+                callback(success)
+            except:
+                logger.exception('Refresh callback failed')
+
+    def _on_batch_response(self, result, indexes, batch_args, address,
+                           responses):
+        if responses is None:
+            # Connection was dropped, responses of other nodes are not
+            # passed on partially
+            result.fail()
+            return
+
+        for index, args, response in zip(indexes, batch_args, responses):
+            if isinstance(response, ReplyError):
+                # Follow redirections one command at a time
+                self._on_response(args, partial(result.set, index),
+                                  self.max_redirects, address, response)
+            else:
+                result.set(index, response)
+
+    def _on_asking_response(self, on_response, result):
+        on_response(result[1] if result else None)
+
+    def _on_response(self, args, callback, redirects, address, result):
+        if isinstance(result, ReplyError) and redirects > 0:
+            message = str(result)
+
+            if message.startswith(('MOVED ', 'ASK ')):
+                kind, slot, node = message.split(' ', 2)
+                host, port = node.rsplit(':', 1)
+                node = (host or address[0], int(port))
+
+                if kind == 'MOVED':
+                    # Other slots were probably moved as well
+                    self._slots[int(slot)] = node
+                    self.refresh_slots()
+
+                self._execute(args, callback, redirects - 1, node,
+                              asking=kind == 'ASK')
+                return
+
+            if message.startswith(('TRYAGAIN', 'CLUSTERDOWN')):
+                self._io_loop.add_timeout(
+                    self._io_loop.time() + RETRY_DELAY,
+                    partial(self._execute, args, callback, redirects - 1)
+                )
+                return
+
+        callback(result)
@@ -1,4 +1,204 @@
 from toredis._compat import string_types
+from toredis.responses import pairs_to_dict, pairs_with_scores, parse_info
+
+
+# Index of the first key in command arguments, by command name
+KEY_POSITIONS = {
+    'APPEND': 1,
+    'BITCOUNT': 1,
+    'BITOP': 2,
+    'BLPOP': 1,
+    'BRPOP': 1,
+    'BRPOPLPUSH': 1,
+    'DEBUG': 2,
+    'DECR': 1,
+    'DECRBY': 1,
+    'DEL': 1,
+    'DUMP': 1,
+    'EVAL': 3,
+    'EVALSHA': 3,
+    'EXISTS': 1,
+    'EXPIRE': 1,
+    'EXPIREAT': 1,
+    'GET': 1,
+    'GETBIT': 1,
+    'GETRANGE': 1,
+    'GETSET': 1,
+    'HDEL': 1,
+    'HEXISTS': 1,
+    'HGET': 1,
+    'HGETALL': 1,
+    'HINCRBY': 1,
+    'HINCRBYFLOAT': 1,
+    'HKEYS': 1,
+    'HLEN': 1,
+    'HMGET': 1,
+    'HMSET': 1,
+    'HSCAN': 1,
+    'HSET': 1,
+    'HSETNX': 1,
+    'HVALS': 1,
+    'INCR': 1,
+    'INCRBY': 1,
+    'INCRBYFLOAT': 1,
+    'LINDEX': 1,
+    'LINSERT': 1,
+    'LLEN': 1,
+    'LPOP': 1,
+    'LPUSH': 1,
+    'LPUSHX': 1,
+    'LRANGE': 1,
+    'LREM': 1,
+    'LSET': 1,
+    'LTRIM': 1,
+    'MGET': 1,
+    'MIGRATE': 3,
+    'MOVE': 1,
+    'MSET': 1,
+    'MSETNX': 1,
+    'PERSIST': 1,
+    'PEXPIRE': 1,
+    'PEXPIREAT': 1,
+    'PSETEX': 1,
+    'PTTL': 1,
+    'RENAME': 1,
+    'RENAMENX': 1,
+    'RESTORE': 1,
+    'RPOP': 1,
+    'RPOPLPUSH': 1,
+    'RPUSH': 1,
+    'RPUSHX': 1,
+    'SADD': 1,
+    'SCARD': 1,
+    'SDIFF': 1,
+    'SDIFFSTORE': 1,
+    'SET': 1,
+    'SETBIT': 1,
+    'SETEX': 1,
+    'SETNX': 1,
+    'SETRANGE': 1,
+    'SINTER': 1,
+    'SINTERSTORE': 1,
+    'SISMEMBER': 1,
+    'SMEMBERS': 1,
+    'SMOVE': 1,
+    'SORT': 1,
+    'SPOP': 1,
+    'SRANDMEMBER': 1,
+    'SREM': 1,
+    'SSCAN': 1,
+    'STRLEN': 1,
+    'SUNION': 1,
+    'SUNIONSTORE': 1,
+    'TTL': 1,
+    'TYPE': 1,
+    'WATCH': 1,
+    'ZADD': 1,
+    'ZCARD': 1,
+    'ZCOUNT': 1,
+    'ZINCRBY': 1,
+    'ZINTERSTORE': 1,
+    'ZRANGE': 1,
+    'ZRANGEBYSCORE': 1,
+    'ZRANK': 1,
+    'ZREM': 1,
+    'ZREMRANGEBYRANK': 1,
+    'ZREMRANGEBYSCORE': 1,
+    'ZREVRANGE': 1,
+    'ZREVRANGEBYSCORE': 1,
+    'ZREVRANK': 1,
+    'ZSCAN': 1,
+    'ZSCORE': 1,
+    'ZUNIONSTORE': 1,
+}
+
+
+# Commands which do not modify data and can be sent to replicas
+READONLY_COMMANDS = frozenset([
+    'BITCOUNT',
+    'DBSIZE',
+    'DUMP',
+    'EXISTS',
+    'GET',
+    'GETBIT',
+    'GETRANGE',
+    'HEXISTS',
+    'HGET',
+    'HGETALL',
+    'HKEYS',
+    'HLEN',
+    'HMGET',
+    'HSCAN',
+    'HVALS',
+    'KEYS',
+    'LINDEX',
+    'LLEN',
+    'LRANGE',
+    'MGET',
+    'OBJECT',
+    'PTTL',
+    'RANDOMKEY',
+    'SCAN',
+    'SCARD',
+    'SDIFF',
+    'SINTER',
+    'SISMEMBER',
+    'SMEMBERS',
+    'SRANDMEMBER',
+    'SSCAN',
+    'STRLEN',
+    'SUNION',
+    'TTL',
+    'TYPE',
+    'ZCARD',
+    'ZCOUNT',
+    'ZRANGE',
+    'ZRANGEBYSCORE',
+    'ZRANK',
+    'ZREVRANGE',
+    'ZREVRANGEBYSCORE',
+    'ZREVRANK',
+    'ZSCAN',
+    'ZSCORE',
+])
+
+
+# Callbacks which convert responses, by command name
+RESPONSE_CALLBACKS = {
+    'EXISTS': bool,
+    'EXPIRE': bool,
+    'EXPIREAT': bool,
+    'HEXISTS': bool,
+    'HGETALL': pairs_to_dict,
+    'HINCRBYFLOAT': float,
+    'HSETNX': bool,
+    'INCRBYFLOAT': float,
+    'INFO': parse_info,
+    'MOVE': bool,
+    'MSETNX': bool,
+    'PERSIST': bool,
+    'PEXPIRE': bool,
+    'PEXPIREAT': bool,
+    'RENAMENX': bool,
+    'SETNX': bool,
+    'SISMEMBER': bool,
+    'SMOVE': bool,
+    'ZINCRBY': float,
+    'ZRANGE': pairs_with_scores,
+    'ZRANGEBYSCORE': pairs_with_scores,
+    'ZREVRANGE': pairs_with_scores,
+    'ZREVRANGEBYSCORE': pairs_with_scores,
+    'ZSCORE': float,
+}
+
+# Callbacks of these commands are applied only if command is sent with the
+# flag: (index of the flag in command arguments, flag)
+RESPONSE_OPTIONS = {
+    'ZRANGE': (4, 'WITHSCORES'),
+    'ZRANGEBYSCORE': (4, 'WITHSCORES'),
+    'ZREVRANGE': (4, 'WITHSCORES'),
+    'ZREVRANGEBYSCORE': (4, 'WITHSCORES'),
+}
 
 
 class RedisCommandsMixin(object):
@@ -20,7 +220,7 @@ class RedisCommandsMixin(object):
         args = ["APPEND"]
         args.append(key)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def auth(self, password, callback=None):
         """
@@ -30,19 +230,19 @@ class RedisCommandsMixin(object):
         """
         args = ["AUTH"]
         args.append(password)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def bgrewriteaof(self, callback=None):
         """
         Asynchronously rewrite the append-only file
         """
-        self.send_message(["BGREWRITEAOF"], callback)
+        return self.send_message(["BGREWRITEAOF"], callback)
 
     def bgsave(self, callback=None):
         """
         Asynchronously save the dataset to disk
         """
-        self.send_message(["BGSAVE"], callback)
+        return self.send_message(["BGSAVE"], callback)
 
     def bitcount(self, key, start=None, end=None, callback=None):
         """
@@ -60,7 +260,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(start)
         args.append(end)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def bitop(self, operation, destkey, keys, callback=None):
         """
@@ -82,7 +282,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def blpop(self, keys, timeout, callback=None):
         """
@@ -103,7 +303,7 @@ class RedisCommandsMixin(object):
         else:
             args.extend(keys)
         args.append(timeout)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def brpop(self, keys, timeout, callback=None):
         """
@@ -124,7 +324,7 @@ class RedisCommandsMixin(object):
         else:
             args.extend(keys)
         args.append(timeout)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def brpoplpush(self, source, destination, timeout, callback=None):
         """
@@ -143,7 +343,7 @@ class RedisCommandsMixin(object):
         args.append(source)
         args.append(destination)
         args.append(timeout)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def client_kill(self, ip_port, callback=None):
         """
@@ -157,7 +357,7 @@ class RedisCommandsMixin(object):
         """
         args = ["CLIENT", "KILL"]
         args.append(ip_port)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def client_list(self, callback=None):
         """
@@ -167,7 +367,7 @@ class RedisCommandsMixin(object):
         ----------
         O(N) where N is the number of client connections
         """
-        self.send_message(["CLIENT", "LIST"], callback)
+        return self.send_message(["CLIENT", "LIST"], callback)
 
     def config_get(self, parameter, callback=None):
         """
@@ -177,7 +377,7 @@ class RedisCommandsMixin(object):
         """
         args = ["CONFIG", "GET"]
         args.append(parameter)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def config_resetstat(self, callback=None):
         """
@@ -187,7 +387,7 @@ class RedisCommandsMixin(object):
         ----------
         O(1)
         """
-        self.send_message(["CONFIG", "RESETSTAT"], callback)
+        return self.send_message(["CONFIG", "RESETSTAT"], callback)
 
     def config_set(self, parameter, value, callback=None):
         """
@@ -199,13 +399,13 @@ class RedisCommandsMixin(object):
         args = ["CONFIG", "SET"]
         args.append(parameter)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def dbsize(self, callback=None):
         """
         Return the number of keys in the selected database
         """
-        self.send_message(["DBSIZE"], callback)
+        return self.send_message(["DBSIZE"], callback)
 
     def debug_object(self, key, callback=None):
         """
@@ -215,13 +415,13 @@ class RedisCommandsMixin(object):
         """
         args = ["DEBUG", "OBJECT"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def debug_segfault(self, callback=None):
         """
         Make the server crash
         """
-        self.send_message(["DEBUG", "SEGFAULT"], callback)
+        return self.send_message(["DEBUG", "SEGFAULT"], callback)
 
     def decr(self, key, callback=None):
         """
@@ -235,7 +435,7 @@ class RedisCommandsMixin(object):
         """
         args = ["DECR"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def decrby(self, key, decrement, callback=None):
         """
@@ -251,7 +451,7 @@ class RedisCommandsMixin(object):
         args = ["DECRBY"]
         args.append(key)
         args.append(decrement)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def delete(self, keys, callback=None):
         """
@@ -273,13 +473,13 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def discard(self, callback=None):
         """
         Discard all commands issued after MULTI
         """
-        self.send_message(["DISCARD"], callback)
+        return self.send_message(["DISCARD"], callback)
 
     def dump(self, key, callback=None):
         """
@@ -296,7 +496,7 @@ class RedisCommandsMixin(object):
         """
         args = ["DUMP"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def echo(self, message, callback=None):
         """
@@ -306,7 +506,7 @@ class RedisCommandsMixin(object):
         """
         args = ["ECHO"]
         args.append(message)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def eval(self, script, keys, args, callback=None):
         """
@@ -333,7 +533,7 @@ class RedisCommandsMixin(object):
             message_args.append(args)
         else:
             message_args.extend(args)
-        self.send_message(message_args, callback)
+        return self.send_message(message_args, callback)
 
     def evalsha(self, sha1, keys, args, callback=None):
         """
@@ -360,13 +560,13 @@ class RedisCommandsMixin(object):
             message_args.append(args)
         else:
             message_args.extend(args)
-        self.send_message(message_args, callback)
+        return self.send_message(message_args, callback)
 
     def execute(self, callback=None):
         """
         Execute all commands issued after MULTI
         """
-        self.send_message(["EXEC"], callback)
+        return self.send_message(["EXEC"], callback)
 
     def exists(self, key, callback=None):
         """
@@ -380,7 +580,7 @@ class RedisCommandsMixin(object):
         """
         args = ["EXISTS"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def expire(self, key, seconds, callback=None):
         """
@@ -396,7 +596,7 @@ class RedisCommandsMixin(object):
         args = ["EXPIRE"]
         args.append(key)
         args.append(seconds)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def expireat(self, key, timestamp, callback=None):
         """
@@ -412,19 +612,19 @@ class RedisCommandsMixin(object):
         args = ["EXPIREAT"]
         args.append(key)
         args.append(timestamp)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def flushall(self, callback=None):
         """
         Remove all keys from all databases
         """
-        self.send_message(["FLUSHALL"], callback)
+        return self.send_message(["FLUSHALL"], callback)
 
     def flushdb(self, callback=None):
         """
         Remove all keys from the current database
         """
-        self.send_message(["FLUSHDB"], callback)
+        return self.send_message(["FLUSHDB"], callback)
 
     def get(self, key, callback=None):
         """
@@ -438,7 +638,7 @@ class RedisCommandsMixin(object):
         """
         args = ["GET"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def getbit(self, key, offset, callback=None):
         """
@@ -454,7 +654,7 @@ class RedisCommandsMixin(object):
         args = ["GETBIT"]
         args.append(key)
         args.append(offset)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def getrange(self, key, start, end, callback=None):
         """
@@ -475,7 +675,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(start)
         args.append(end)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def getset(self, key, value, callback=None):
         """
@@ -491,7 +691,7 @@ class RedisCommandsMixin(object):
         args = ["GETSET"]
         args.append(key)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hdel(self, key, fields, callback=None):
         """
@@ -511,7 +711,7 @@ class RedisCommandsMixin(object):
             args.append(fields)
         else:
             args.extend(fields)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hexists(self, key, field, callback=None):
         """
@@ -527,7 +727,7 @@ class RedisCommandsMixin(object):
         args = ["HEXISTS"]
         args.append(key)
         args.append(field)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hget(self, key, field, callback=None):
         """
@@ -543,7 +743,7 @@ class RedisCommandsMixin(object):
         args = ["HGET"]
         args.append(key)
         args.append(field)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hgetall(self, key, callback=None):
         """
@@ -557,7 +757,7 @@ class RedisCommandsMixin(object):
         """
         args = ["HGETALL"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hincrby(self, key, field, increment, callback=None):
         """
@@ -575,7 +775,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(field)
         args.append(increment)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hincrbyfloat(self, key, field, increment, callback=None):
         """
@@ -593,7 +793,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(field)
         args.append(increment)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hkeys(self, key, callback=None):
         """
@@ -607,7 +807,7 @@ class RedisCommandsMixin(object):
         """
         args = ["HKEYS"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hlen(self, key, callback=None):
         """
@@ -621,7 +821,7 @@ class RedisCommandsMixin(object):
         """
         args = ["HLEN"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hmget(self, key, fields, callback=None):
         """
@@ -641,7 +841,7 @@ class RedisCommandsMixin(object):
             args.append(fields)
         else:
             args.extend(fields)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hmset(self, key, field_dict, callback=None):
         """
@@ -660,7 +860,33 @@ class RedisCommandsMixin(object):
         for field, value in field_dict.items():
             args.append(field)
             args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
+
+    def hscan(self, key, cursor, match=None, count=None, callback=None):
+        """
+        Incrementally iterate hash fields and associated values
+
+            :param key:
+            :param cursor:
+            :param match:
+            :param count:
+
+        Complexity
+        ----------
+        O(1) for every call. O(N) for a complete iteration, including enough
+        command calls for the cursor to return back to 0. N is the number of
+        elements inside the collection.
+        """
+        args = ["HSCAN"]
+        args.append(key)
+        args.append(cursor)
+        if match:
+            args.append("MATCH")
+            args.append(match)
+        if count:
+            args.append("COUNT")
+            args.append(count)
+        return self.send_message(args, callback)
 
     def hset(self, key, field, value, callback=None):
         """
@@ -678,7 +904,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(field)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hsetnx(self, key, field, value, callback=None):
         """
@@ -696,7 +922,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(field)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def hvals(self, key, callback=None):
         """
@@ -710,7 +936,7 @@ class RedisCommandsMixin(object):
         """
         args = ["HVALS"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def incr(self, key, callback=None):
         """
@@ -724,7 +950,7 @@ class RedisCommandsMixin(object):
         """
         args = ["INCR"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def incrby(self, key, increment, callback=None):
         """
@@ -740,7 +966,7 @@ class RedisCommandsMixin(object):
         args = ["INCRBY"]
         args.append(key)
         args.append(increment)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def incrbyfloat(self, key, increment, callback=None):
         """
@@ -756,13 +982,13 @@ class RedisCommandsMixin(object):
         args = ["INCRBYFLOAT"]
         args.append(key)
         args.append(increment)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def info(self, callback=None):
         """
         Get information and statistics about the server
         """
-        self.send_message(["INFO"], callback)
+        return self.send_message(["INFO"], callback)
 
     def keys(self, pattern, callback=None):
         """
@@ -778,13 +1004,13 @@ class RedisCommandsMixin(object):
         """
         args = ["KEYS"]
         args.append(pattern)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lastsave(self, callback=None):
         """
         Get the UNIX time stamp of the last successful save to disk
         """
-        self.send_message(["LASTSAVE"], callback)
+        return self.send_message(["LASTSAVE"], callback)
 
     def lindex(self, key, index, callback=None):
         """
@@ -802,7 +1028,7 @@ class RedisCommandsMixin(object):
         args = ["LINDEX"]
         args.append(key)
         args.append(index)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def linsert(self, key, where, pivot, value, callback=None):
         """
@@ -825,7 +1051,7 @@ class RedisCommandsMixin(object):
         args.append(where)
         args.append(pivot)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def llen(self, key, callback=None):
         """
@@ -839,7 +1065,7 @@ class RedisCommandsMixin(object):
         """
         args = ["LLEN"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lpop(self, key, callback=None):
         """
@@ -853,7 +1079,7 @@ class RedisCommandsMixin(object):
         """
         args = ["LPOP"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lpush(self, key, values, callback=None):
         """
@@ -873,7 +1099,7 @@ class RedisCommandsMixin(object):
             args.append(values)
         else:
             args.extend(values)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lpushx(self, key, value, callback=None):
         """
@@ -889,7 +1115,7 @@ class RedisCommandsMixin(object):
         args = ["LPUSHX"]
         args.append(key)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lrange(self, key, start, stop, callback=None):
         """
@@ -908,7 +1134,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(start)
         args.append(stop)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lrem(self, key, count, value, callback=None):
         """
@@ -926,7 +1152,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(count)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def lset(self, key, index, value, callback=None):
         """
@@ -945,7 +1171,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(index)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def ltrim(self, key, start, stop, callback=None):
         """
@@ -963,7 +1189,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(start)
         args.append(stop)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def mget(self, keys, callback=None):
         """
@@ -981,7 +1207,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def migrate(self, host, port, key, destination_db, timeout, callback=None):
         """
@@ -1006,13 +1232,13 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(destination_db)
         args.append(timeout)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def monitor(self, callback=None):
         """
         Listen for all requests received by the server in real time
         """
-        self.send_message(["MONITOR"], callback)
+        return self.send_message(["MONITOR"], callback)
 
     def move(self, key, db, callback=None):
         """
@@ -1028,7 +1254,7 @@ class RedisCommandsMixin(object):
         args = ["MOVE"]
         args.append(key)
         args.append(db)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def mset(self, key_dict, callback=None):
         """
@@ -1045,7 +1271,7 @@ class RedisCommandsMixin(object):
         for key, value in key_dict.items():
             args.append(key)
             args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def msetnx(self, key_dict, callback=None):
         """
@@ -1062,13 +1288,13 @@ class RedisCommandsMixin(object):
         for key, value in key_dict.items():
             args.append(key)
             args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def multi(self, callback=None):
         """
         Mark the start of a transaction block
         """
-        self.send_message(["MULTI"], callback)
+        return self.send_message(["MULTI"], callback)
 
     def object(self, subcommand, argumentss=[], callback=None):
         """
@@ -1088,7 +1314,7 @@ class RedisCommandsMixin(object):
             args.append(argumentss)
         else:
             args.extend(argumentss)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def persist(self, key, callback=None):
         """
@@ -1102,7 +1328,7 @@ class RedisCommandsMixin(object):
         """
         args = ["PERSIST"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def pexpire(self, key, milliseconds, callback=None):
         """
@@ -1118,7 +1344,7 @@ class RedisCommandsMixin(object):
         args = ["PEXPIRE"]
         args.append(key)
         args.append(milliseconds)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def pexpireat(self, key, milliseconds_timestamp, callback=None):
         """
@@ -1135,13 +1361,13 @@ class RedisCommandsMixin(object):
         args = ["PEXPIREAT"]
         args.append(key)
         args.append(milliseconds_timestamp)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def ping(self, callback=None):
         """
         Ping the server
         """
-        self.send_message(["PING"], callback)
+        return self.send_message(["PING"], callback)
 
     def psetex(self, key, milliseconds, value, callback=None):
         """
@@ -1159,7 +1385,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(milliseconds)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def psubscribe(self, patterns, callback=None):
         """
@@ -1178,7 +1404,7 @@ class RedisCommandsMixin(object):
             args.append(patterns)
         else:
             args.extend(patterns)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def pttl(self, key, callback=None):
         """
@@ -1192,7 +1418,7 @@ class RedisCommandsMixin(object):
         """
         args = ["PTTL"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def publish(self, channel, message, callback=None):
         """
@@ -1210,7 +1436,7 @@ class RedisCommandsMixin(object):
         args = ["PUBLISH"]
         args.append(channel)
         args.append(message)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def punsubscribe(self, patterns=[], callback=None):
         """
@@ -1231,13 +1457,13 @@ class RedisCommandsMixin(object):
             args.append(patterns)
         else:
             args.extend(patterns)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def quit(self, callback=None):
         """
         Close the connection
         """
-        self.send_message(["QUIT"], callback)
+        return self.send_message(["QUIT"], callback)
 
     def randomkey(self, callback=None):
         """
@@ -1247,7 +1473,7 @@ class RedisCommandsMixin(object):
         ----------
         O(1)
         """
-        self.send_message(["RANDOMKEY"], callback)
+        return self.send_message(["RANDOMKEY"], callback)
 
     def rename(self, key, newkey, callback=None):
         """
@@ -1263,7 +1489,7 @@ class RedisCommandsMixin(object):
         args = ["RENAME"]
         args.append(key)
         args.append(newkey)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def renamenx(self, key, newkey, callback=None):
         """
@@ -1279,7 +1505,7 @@ class RedisCommandsMixin(object):
         args = ["RENAMENX"]
         args.append(key)
         args.append(newkey)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def restore(self, key, ttl, serialized_value, callback=None):
         """
@@ -1303,7 +1529,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(ttl)
         args.append(serialized_value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def rpop(self, key, callback=None):
         """
@@ -1317,7 +1543,7 @@ class RedisCommandsMixin(object):
         """
         args = ["RPOP"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def rpoplpush(self, source, destination, callback=None):
         """
@@ -1334,7 +1560,7 @@ class RedisCommandsMixin(object):
         args = ["RPOPLPUSH"]
         args.append(source)
         args.append(destination)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def rpush(self, key, values, callback=None):
         """
@@ -1354,7 +1580,7 @@ class RedisCommandsMixin(object):
             args.append(values)
         else:
             args.extend(values)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def rpushx(self, key, value, callback=None):
         """
@@ -1370,7 +1596,7 @@ class RedisCommandsMixin(object):
         args = ["RPUSHX"]
         args.append(key)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sadd(self, key, members, callback=None):
         """
@@ -1390,13 +1616,37 @@ class RedisCommandsMixin(object):
             args.append(members)
         else:
             args.extend(members)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def save(self, callback=None):
         """
         Synchronously save the dataset to disk
         """
-        self.send_message(["SAVE"], callback)
+        return self.send_message(["SAVE"], callback)
+
+    def scan(self, cursor, match=None, count=None, callback=None):
+        """
+        Incrementally iterate the keys space
+
+            :param cursor:
+            :param match:
+            :param count:
+
+        Complexity
+        ----------
+        O(1) for every call. O(N) for a complete iteration, including enough
+        command calls for the cursor to return back to 0. N is the number of
+        elements inside the collection.
+        """
+        args = ["SCAN"]
+        args.append(cursor)
+        if match:
+            args.append("MATCH")
+            args.append(match)
+        if count:
+            args.append("COUNT")
+            args.append(count)
+        return self.send_message(args, callback)
 
     def scard(self, key, callback=None):
         """
@@ -1410,7 +1660,7 @@ class RedisCommandsMixin(object):
         """
         args = ["SCARD"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def script_exists(self, scripts, callback=None):
         """
@@ -1429,7 +1679,7 @@ class RedisCommandsMixin(object):
             args.append(scripts)
         else:
             args.extend(scripts)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def script_flush(self, callback=None):
         """
@@ -1439,7 +1689,7 @@ class RedisCommandsMixin(object):
         ----------
         O(N) with N being the number of scripts in cache
         """
-        self.send_message(["SCRIPT", "FLUSH"], callback)
+        return self.send_message(["SCRIPT", "FLUSH"], callback)
 
     def script_kill(self, callback=None):
         """
@@ -1449,7 +1699,7 @@ class RedisCommandsMixin(object):
         ----------
         O(1)
         """
-        self.send_message(["SCRIPT", "KILL"], callback)
+        return self.send_message(["SCRIPT", "KILL"], callback)
 
     def script_load(self, script, callback=None):
         """
@@ -1463,7 +1713,7 @@ class RedisCommandsMixin(object):
         """
         args = ["SCRIPT", "LOAD"]
         args.append(script)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sdiff(self, keys, callback=None):
         """
@@ -1481,7 +1731,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sdiffstore(self, destination, keys, callback=None):
         """
@@ -1501,7 +1751,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def select(self, index, callback=None):
         """
@@ -1511,7 +1761,7 @@ class RedisCommandsMixin(object):
         """
         args = ["SELECT"]
         args.append(index)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def set(self, key, value, callback=None):
         """
@@ -1527,7 +1777,7 @@ class RedisCommandsMixin(object):
         args = ["SET"]
         args.append(key)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def setbit(self, key, offset, value, callback=None):
         """
@@ -1545,7 +1795,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(offset)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def setex(self, key, seconds, value, callback=None):
         """
@@ -1563,7 +1813,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(seconds)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def setnx(self, key, value, callback=None):
         """
@@ -1579,7 +1829,7 @@ class RedisCommandsMixin(object):
         args = ["SETNX"]
         args.append(key)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def setrange(self, key, offset, value, callback=None):
         """
@@ -1600,7 +1850,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(offset)
         args.append(value)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def shutdown(self, nosave=False, save=False, callback=None):
         """
@@ -1614,7 +1864,7 @@ class RedisCommandsMixin(object):
             args.append("NOSAVE")
         if save:
             args.append("SAVE")
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sinter(self, keys, callback=None):
         """
@@ -1633,7 +1883,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sinterstore(self, destination, keys, callback=None):
         """
@@ -1654,7 +1904,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sismember(self, key, member, callback=None):
         """
@@ -1670,7 +1920,7 @@ class RedisCommandsMixin(object):
         args = ["SISMEMBER"]
         args.append(key)
         args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def slaveof(self, host, port, callback=None):
         """
@@ -1682,7 +1932,7 @@ class RedisCommandsMixin(object):
         args = ["SLAVEOF"]
         args.append(host)
         args.append(port)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def slowlog(self, subcommand, argument=None, callback=None):
         """
@@ -1694,7 +1944,7 @@ class RedisCommandsMixin(object):
         args = ["SLOWLOG"]
         args.append(subcommand)
         args.append(argument)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def smembers(self, key, callback=None):
         """
@@ -1708,7 +1958,7 @@ class RedisCommandsMixin(object):
         """
         args = ["SMEMBERS"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def smove(self, source, destination, member, callback=None):
         """
@@ -1726,7 +1976,7 @@ class RedisCommandsMixin(object):
         args.append(source)
         args.append(destination)
         args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sort(self, key, by=None, limit=None, get=tuple(), order=None, sorting=False, store=None, callback=None):
         """
@@ -1766,7 +2016,7 @@ class RedisCommandsMixin(object):
         if store:
             args.append("STORE")
             args.append(store)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def spop(self, key, callback=None):
         """
@@ -1780,7 +2030,7 @@ class RedisCommandsMixin(object):
         """
         args = ["SPOP"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def srandmember(self, key, count=None, callback=None):
         """
@@ -1797,7 +2047,7 @@ class RedisCommandsMixin(object):
         args = ["SRANDMEMBER"]
         args.append(key)
         args.append(count)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def srem(self, key, members, callback=None):
         """
@@ -1817,7 +2067,33 @@ class RedisCommandsMixin(object):
             args.append(members)
         else:
             args.extend(members)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
+
+    def sscan(self, key, cursor, match=None, count=None, callback=None):
+        """
+        Incrementally iterate Set elements
+
+            :param key:
+            :param cursor:
+            :param match:
+            :param count:
+
+        Complexity
+        ----------
+        O(1) for every call. O(N) for a complete iteration, including enough
+        command calls for the cursor to return back to 0. N is the number of
+        elements inside the collection.
+        """
+        args = ["SSCAN"]
+        args.append(key)
+        args.append(cursor)
+        if match:
+            args.append("MATCH")
+            args.append(match)
+        if count:
+            args.append("COUNT")
+            args.append(count)
+        return self.send_message(args, callback)
 
     def strlen(self, key, callback=None):
         """
@@ -1831,7 +2107,7 @@ class RedisCommandsMixin(object):
         """
         args = ["STRLEN"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def subscribe(self, channels, callback=None):
         """
@@ -1849,7 +2125,7 @@ class RedisCommandsMixin(object):
             args.append(channels)
         else:
             args.extend(channels)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sunion(self, keys, callback=None):
         """
@@ -1867,7 +2143,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sunionstore(self, destination, keys, callback=None):
         """
@@ -1887,13 +2163,13 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def sync(self, callback=None):
         """
         Internal command used for replication
         """
-        self.send_message(["SYNC"], callback)
+        return self.send_message(["SYNC"], callback)
 
     def time(self, callback=None):
         """
@@ -1903,7 +2179,7 @@ class RedisCommandsMixin(object):
         ----------
         O(1)
         """
-        self.send_message(["TIME"], callback)
+        return self.send_message(["TIME"], callback)
 
     def ttl(self, key, callback=None):
         """
@@ -1917,7 +2193,7 @@ class RedisCommandsMixin(object):
         """
         args = ["TTL"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def type(self, key, callback=None):
         """
@@ -1931,7 +2207,7 @@ class RedisCommandsMixin(object):
         """
         args = ["TYPE"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def unsubscribe(self, channels=[], callback=None):
         """
@@ -1949,7 +2225,7 @@ class RedisCommandsMixin(object):
             args.append(channels)
         else:
             args.extend(channels)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def unwatch(self, callback=None):
         """
@@ -1959,7 +2235,7 @@ class RedisCommandsMixin(object):
         ----------
         O(1)
         """
-        self.send_message(["UNWATCH"], callback)
+        return self.send_message(["UNWATCH"], callback)
 
     def watch(self, keys, callback=None):
         """
@@ -1977,7 +2253,7 @@ class RedisCommandsMixin(object):
             args.append(keys)
         else:
             args.extend(keys)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zadd(self, key, member_score_dict, callback=None):
         """
@@ -1997,7 +2273,7 @@ class RedisCommandsMixin(object):
         for member, score in member_score_dict.items():
             args.append(score)
             args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zcard(self, key, callback=None):
         """
@@ -2011,7 +2287,7 @@ class RedisCommandsMixin(object):
         """
         args = ["ZCARD"]
         args.append(key)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zcount(self, key, min, max, callback=None):
         """
@@ -2030,7 +2306,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(min)
         args.append(max)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zincrby(self, key, increment, member, callback=None):
         """
@@ -2048,7 +2324,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(increment)
         args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zinterstore(self, destination, keys, weights=tuple(), aggregate=None, callback=None):
         """
@@ -2080,7 +2356,7 @@ class RedisCommandsMixin(object):
         if aggregate:
             args.append("AGGREGATE")
             args.append(aggregate)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrange(self, key, start, stop, withscores=False, callback=None):
         """
@@ -2102,7 +2378,7 @@ class RedisCommandsMixin(object):
         args.append(stop)
         if withscores:
             args.append("WITHSCORES")
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrangebyscore(self, key, min, max, withscores=False, limit=None, callback=None):
         """
@@ -2132,7 +2408,7 @@ class RedisCommandsMixin(object):
             offset, count = limit
             args.append(offset)
             args.append(count)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrank(self, key, member, callback=None):
         """
@@ -2148,7 +2424,7 @@ class RedisCommandsMixin(object):
         args = ["ZRANK"]
         args.append(key)
         args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrem(self, key, members, callback=None):
         """
@@ -2169,7 +2445,7 @@ class RedisCommandsMixin(object):
             args.append(members)
         else:
             args.extend(members)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zremrangebyrank(self, key, start, stop, callback=None):
         """
@@ -2188,7 +2464,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(start)
         args.append(stop)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zremrangebyscore(self, key, min, max, callback=None):
         """
@@ -2207,7 +2483,7 @@ class RedisCommandsMixin(object):
         args.append(key)
         args.append(min)
         args.append(max)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrevrange(self, key, start, stop, withscores=False, callback=None):
         """
@@ -2230,7 +2506,7 @@ class RedisCommandsMixin(object):
         args.append(stop)
         if withscores:
             args.append("WITHSCORES")
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrevrangebyscore(self, key, max, min, withscores=False, limit=None, callback=None):
         """
@@ -2261,7 +2537,7 @@ class RedisCommandsMixin(object):
             offset, count = limit
             args.append(offset)
             args.append(count)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zrevrank(self, key, member, callback=None):
         """
@@ -2278,7 +2554,33 @@ class RedisCommandsMixin(object):
         args = ["ZREVRANK"]
         args.append(key)
         args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
+
+    def zscan(self, key, cursor, match=None, count=None, callback=None):
+        """
+        Incrementally iterate sorted sets elements and associated scores
+
+            :param key:
+            :param cursor:
+            :param match:
+            :param count:
+
+        Complexity
+        ----------
+        O(1) for every call. O(N) for a complete iteration, including enough
+        command calls for the cursor to return back to 0. N is the number of
+        elements inside the collection.
+        """
+        args = ["ZSCAN"]
+        args.append(key)
+        args.append(cursor)
+        if match:
+            args.append("MATCH")
+            args.append(match)
+        if count:
+            args.append("COUNT")
+            args.append(count)
+        return self.send_message(args, callback)
 
     def zscore(self, key, member, callback=None):
         """
@@ -2294,7 +2596,7 @@ class RedisCommandsMixin(object):
         args = ["ZSCORE"]
         args.append(key)
         args.append(member)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
 
     def zunionstore(self, destination, keys, weights=tuple(), aggregate=None, callback=None):
         """
@@ -2325,4 +2627,4 @@ class RedisCommandsMixin(object):
         if aggregate:
             args.append("AGGREGATE")
             args.append(aggregate)
-        self.send_message(args, callback)
+        return self.send_message(args, callback)
@@ -32,11 +32,11 @@ class Pipeline(RedisCommandsMixin):
             Send command pipeline to redis
 
             :param callback:
-                Callback
+                Callback. If not provided, Future is returned instead.
         """
         args_pipeline = self._args_pipeline
         self._args_pipeline = []
-        self._client.send_messages(args_pipeline, callback)
+        return self._client.send_messages(args_pipeline, callback)
 
     def reset(self):
         """
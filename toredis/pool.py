@@ -0,0 +1,289 @@
+import logging
+
+from collections import deque
+from functools import partial
+
+from tornado.ioloop import IOLoop
+from tornado.concurrent import Future
+
+from toredis.client import Client, resolve_future
+from toredis.commands import RedisCommandsMixin
+from toredis.pipeline import Pipeline
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool(RedisCommandsMixin):
+    """
+        Pool of connected redis clients for one redis server.
+
+        Commands can be sent through the pool directly - each command will
+        be executed by a free connection, which is returned to the pool as
+        soon as response is received.
+    """
+    def __init__(self, host='localhost', port=6379, max_connections=10,
+                 idle_timeout=60, io_loop=None, client_class=Client,
+                 command_timeout=None):
+        """
+            Constructor
+
+            :param host:
+                Host to connect to
+            :param port:
+                Port
+            :param max_connections:
+                Maximum number of open connections
+            :param idle_timeout:
+                Number of seconds unused connection is kept open. Use `None`
+                to keep idle connections forever.
+            :param io_loop:
+                Optional IOLoop instance
+            :param client_class:
+                Client class used to open new connections
+            :param command_timeout:
+                Default number of seconds to wait for command response.
+                Connection is closed and replaced on timeout.
+        """
+        self._io_loop = io_loop or IOLoop.instance()
+
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.client_class = client_class
+        self.command_timeout = command_timeout
+
+        self._clients = set()
+        self._connecting = {}
+        self._idle = deque()
+        self._waiters = deque()
+
+        self._reap_timeout = None
+        self._closed = False
+
+    # State
+    def size(self):
+        """
+            Number of open (or opening) connections
+        """
+        return len(self._clients)
+
+    def idle_size(self):
+        """
+            Number of connections waiting in the pool
+        """
+        return len(self._idle)
+
+    def acquire(self, callback):
+        """
+            Get connected client from the pool.
+
+            Client is returned to the pool automatically as soon as it has
+            no pending responses after callback returns. If all connections
+            are busy, callback will be triggered when one of them is freed.
+            If connection can not be established, callback will be triggered
+            with `None`.
+
+            :param callback:
+                Callback, receives client instance
+        """
+        if self._closed:
+            raise ValueError('Connection pool is closed')
+
+        if self._idle:
+            # Most recently used connection first, so unused ones can expire
+            client, _ = self._idle.pop()
+            self._hand_out(client, callback)
+        elif len(self._clients) < self.max_connections:
+            self._open(callback)
+        else:
+            self._waiters.append(callback)
+
+    def release(self, client):
+        """
+            Return client to the pool.
+
+            There is no need to call it for clients that were acquired with
+            `acquire`, unless they should be reused before all responses are
+            received.
+
+            :param client:
+                Client instance
+        """
+        if client not in self._clients:
+            return
+
+        client._idle_callback = None
+
+        # Subscribed connection can not be reused, leave it to the caller
+        if client.is_subscribed() or not client.is_connected():
+            self._detach(client)
+            return
+
+        if self._closed:
+            self._detach(client)
+            client.close()
+            return
+
+        if self._waiters:
+            self._hand_out(client, self._waiters.popleft())
+        else:
+            self._idle.append((client, self._io_loop.time()))
+            self._schedule_reap()
+
+    def close(self):
+        """
+            Close all idle connections. Busy connections will be closed
+            once they are released.
+        """
+        self._closed = True
+
+        if self._reap_timeout is not None:
+            self._io_loop.remove_timeout(self._reap_timeout)
+            self._reap_timeout = None
+
+        idle = self._idle
+        self._idle = deque()
+        for client, _ in idle:
+            self._detach(client)
+            client.close()
+
+        waiters = self._waiters
+        self._waiters = deque()
+        for callback in waiters:
+            self._run_callback(callback, None)
+
+    # Commands
+    def send_message(self, args, callback=None):
+        """
+            Send command to redis using one of pooled connections
+
+            :param args:
+                Arguments to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        self.acquire(partial(self._send_message, args, callback))
+        return future
+
+    def send_messages(self, args_pipeline, callback=None):
+        """
+            Send command pipeline to redis using one of pooled connections
+
+            :param args_pipeline:
+                Arguments pipeline to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        if not args_pipeline:
+            callback([])
+        else:
+            self.acquire(partial(self._send_messages, args_pipeline, callback))
+        return future
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    # Helpers
+    def _send_message(self, args, callback, client):
+        if client is None:
+            callback(None)
+        else:
+            client.send_message(args, callback)
+
+    def _send_messages(self, args_pipeline, callback, client):
+        if client is None:
+            callback(None)
+        else:
+            client.send_messages(args_pipeline, callback)
+
+    def _open(self, callback):
+        client = self.client_class(io_loop=self._io_loop,
+                                   command_timeout=self.command_timeout)
+        client._close_callback = partial(self._on_client_close, client)
+
+        self._clients.add(client)
+        self._connecting[client] = callback
+
+        client.connect(self.host, self.port,
+                       callback=partial(self._on_client_connect, client))
+
+    def _hand_out(self, client, callback):
+        self._run_callback(callback, client)
+
+        if client.is_subscribed():
+            # Pub/sub connection belongs to the caller from now on
+            self._detach(client)
+        elif client.is_idle():
+            self.release(client)
+        else:
+            client._idle_callback = partial(self.release, client)
+
+    def _detach(self, client):
+        self._clients.discard(client)
+        self._connecting.pop(client, None)
+
+        client._idle_callback = None
+        client._close_callback = None
+
+    def _run_callback(self, callback, client):
+        try:
+            callback(client)
+        except:
+            logger.exception('Pool callback failed')
+
+    def _schedule_reap(self):
+        if self.idle_timeout is None or self._reap_timeout is not None:
+            return
+
+        _, released = self._idle[0]
+        self._reap_timeout = self._io_loop.add_timeout(
+            released + self.idle_timeout, self._reap
+        )
+
+    def _reap(self):
+        self._reap_timeout = None
+
+        deadline = self._io_loop.time() - self.idle_timeout
+        while self._idle and self._idle[0][1] <= deadline:
+            client, _ = self._idle.popleft()
+            self._detach(client)
+            client.close()
+
+        if self._idle:
+            self._schedule_reap()
+
+    # Event handlers
+    def _on_client_connect(self, client):
+        callback = self._connecting.pop(client, None)
+        if callback is not None:
+            self._hand_out(client, callback)
+
+    def _on_client_close(self, client):
+        if client not in self._clients:
+            return
+
+        callback = self._connecting.get(client)
+        self._detach(client)
+
+        for i, (idle_client, _) in enumerate(self._idle):
+            if idle_client is client:
+                del self._idle[i]
+                break
+
+        if callback is not None:
+            # Connection attempt failed
+            self._run_callback(callback, None)
+        elif self._waiters and not self._closed:
+            self._open(self._waiters.popleft())
@@ -0,0 +1,251 @@
+from itertools import islice
+
+import hiredis
+
+from toredis._compat import text_type
+
+
+CRLF = b'\r\n'
+
+# Number of precomputed `*N` and `$N` headers
+HEADER_CACHE_SIZE = 1024
+
+# Arguments bigger than this are not copied into the output buffer, but
+# passed to the stream as separate chunks
+COPY_THRESHOLD = 4096
+
+
+def _make_headers(prefix):
+    return [('%s%d\r\n' % (prefix, i)).encode('ascii')
+            for i in range(HEADER_CACHE_SIZE)]
+
+ARRAY_HEADERS = _make_headers('*')
+BULK_HEADERS = _make_headers('$')
+
+
+try:
+    hiredis.Reader(notEnoughData=None)
+except TypeError:
+    # hiredis before 2.1 always returns False when reply is incomplete
+    INCOMPLETE = False
+else:
+    # Returned by the reader when there is no complete reply in the buffer.
+    # Unlike False, it does not compare equal to integer replies, so reader
+    # can be drained with iter(reader.gets, INCOMPLETE).
+    INCOMPLETE = object()
+
+
+# RESP3 push message type, not available before hiredis 3.0
+PushNotification = getattr(hiredis, 'PushNotification', None)
+
+
+def create_reader(encoding=None, errors=None):
+    """
+        Create reply parser
+
+        :param encoding:
+            Encoding to decode bulk and status replies with. Replies are
+            decoded by the parser itself, if `None` they are returned as
+            bytes.
+        :param errors:
+            Decoding error handling scheme
+    """
+    kwargs = {}
+    if encoding is not None:
+        kwargs['encoding'] = encoding
+        if errors is not None:
+            kwargs['errors'] = errors
+    if INCOMPLETE is not False:
+        kwargs['notEnoughData'] = INCOMPLETE
+    return hiredis.Reader(**kwargs)
+
+
+def encode_arg(arg, encoding='utf-8', errors='strict'):
+    """
+        Command argument as bytes, the way `Encoder` sends it
+
+        :param arg:
+            Command argument
+        :param encoding:
+            Encoding for text arguments
+        :param errors:
+            Encoding error handling scheme
+    """
+    if isinstance(arg, bytes):
+        return arg
+    if isinstance(arg, (bytearray, memoryview)):
+        return bytes(arg)
+    if not isinstance(arg, text_type):
+        arg = str(arg)
+        if not isinstance(arg, text_type):
+            # Python 2 str
+            return arg
+    return arg.encode(encoding, errors)
+
+
+def read_replies(reader, replies, count):
+    """
+        Move up to `count` parsed replies from the reader to `replies` list
+
+        :param reader:
+            Reader created with `create_reader`
+        :param replies:
+            List of replies
+        :param count:
+            Maximum number of replies to move
+    """
+    if INCOMPLETE is not False:
+        # Replies are pulled in C, without Python loop
+        replies.extend(islice(iter(reader.gets, INCOMPLETE), count))
+        return
+
+    gets = reader.gets
+    append = replies.append
+    while count:
+        resp = gets()
+        if resp is False:
+            return
+        append(resp)
+        count -= 1
+
+
+class Encoder(object):
+    """
+        Redis protocol encoder.
+
+        Commands are written into one reusable buffer. Big `bytes`,
+        `bytearray` and `memoryview` arguments are not copied, so they
+        should not be modified until they're written to the stream.
+    """
+    def __init__(self, encoding='utf-8', errors='strict'):
+        """
+            Constructor
+
+            :param encoding:
+                Encoding for text arguments
+            :param errors:
+                Encoding error handling scheme
+        """
+        self.encoding = encoding
+        self.errors = errors
+
+        self._buffer = bytearray()
+        self._chunks = []
+
+    def pack(self, args):
+        """
+            Add command to the output buffer
+
+            :param args:
+                Command arguments
+        """
+        buf = self._buffer
+        chunks = self._chunks
+        encoding = self.encoding
+        errors = self.errors
+
+        start = len(buf)
+        num_chunks = len(chunks)
+
+        try:
+            num = len(args)
+            if num < HEADER_CACHE_SIZE:
+                buf += ARRAY_HEADERS[num]
+            else:
+                buf += ('*%d\r\n' % num).encode('ascii')
+
+            for arg in args:
+                if isinstance(arg, text_type):
+                    arg = arg.encode(encoding, errors)
+                elif isinstance(arg, memoryview):
+                    if (arg.ndim != 1 or arg.itemsize != 1 or
+                            not arg.c_contiguous):
+                        arg = arg.tobytes()
+                elif not isinstance(arg, (bytes, bytearray)):
+                    arg = str(arg)
+                    if isinstance(arg, text_type):
+                        arg = arg.encode(encoding, errors)
+
+                size = len(arg)
+                if size < HEADER_CACHE_SIZE:
+                    buf += BULK_HEADERS[size]
+                else:
+                    buf += ('$%d\r\n' % size).encode('ascii')
+
+                if size > COPY_THRESHOLD:
+                    chunks.append(bytes(buf))
+                    chunks.append(arg)
+                    del buf[:]
+                else:
+                    buf += arg
+
+                buf += CRLF
+        except:
+            # Drop partially encoded command
+            self._rollback(start, num_chunks)
+            raise
+
+    def pack_pipeline(self, args_pipeline):
+        """
+            Add multiple commands to the output buffer. If any command
+            fails to encode, none of them are added.
+
+            :param args_pipeline:
+                List of command arguments
+        """
+        start = len(self._buffer)
+        num_chunks = len(self._chunks)
+
+        pack = self.pack
+        try:
+            for args in args_pipeline:
+                pack(args)
+        except:
+            # Drop commands encoded before the failed one, they would be
+            # sent without callbacks
+            self._rollback(start, num_chunks)
+            raise
+
+    def _rollback(self, start, num_chunks):
+        # Restore buffer to `start` bytes and `num_chunks` chunks
+        buf = self._buffer
+        chunks = self._chunks
+        if len(chunks) > num_chunks:
+            buf[:] = chunks[num_chunks][:start]
+            del chunks[num_chunks:]
+        else:
+            del buf[start:]
+
+    def pending_size(self):
+        """
+            Number of encoded bytes waiting in the buffer
+        """
+        size = len(self._buffer)
+        for chunk in self._chunks:
+            size += len(chunk)
+        return size
+
+    def get_chunks(self):
+        """
+            Return list of encoded chunks and reset the buffer
+        """
+        buf = self._buffer
+        if not self._chunks:
+            chunks = [bytes(buf)] if buf else []
+        else:
+            chunks = self._chunks
+            self._chunks = []
+            if buf:
+                chunks.append(bytes(buf))
+        del buf[:]
+        return chunks
+
+    def encode(self, args):
+        """
+            Encode single command
+
+            :param args:
+                Command arguments
+        """
+        self.pack(args)
+        return b''.join(self.get_chunks())
@@ -0,0 +1,226 @@
+import logging
+
+from toredis._compat import text_type
+
+
+logger = logging.getLogger(__name__)
+
+
+def encode_name(name, encoding='utf-8', errors='strict'):
+    """
+        Channel or pattern name as bytes
+    """
+    if isinstance(name, text_type):
+        return name.encode(encoding, errors)
+    return name
+
+
+def encode_names(message, encoding='utf-8', errors='strict'):
+    """
+        Pub/sub message with kind, channel and pattern names as bytes. Used
+        for RESP3 push messages, which are decoded with client encoding.
+    """
+    kind = encode_name(message[0])
+    if kind == b'pmessage':
+        return [kind, encode_name(message[1], encoding, errors),
+                encode_name(message[2], encoding, errors), message[3]]
+    return [kind, encode_name(message[1], encoding, errors)] + message[2:]
+
+
+class PubSub(object):
+    """
+        Dispatches messages of the subscribed client to per-channel and
+        per-pattern handlers.
+
+        Handlers are called with channel name and message data. Channel and
+        pattern names are kept as bytes, as they are received from redis.
+
+        In batch mode handlers are called with channel name and list of all
+        messages to the channel received with one socket read.
+
+        When connection is lost, PubSub keeps its subscriptions and sends
+        them again once `resubscribe` is called with the new connection.
+    """
+    def __init__(self, client, disconnect_callback=None, batch=False):
+        """
+            Constructor
+
+            :param client:
+                Client instance. Client can not run normal commands while
+                subscribed. If `None`, subscriptions are sent once client is
+                set with `resubscribe`.
+            :param disconnect_callback:
+                Optional callback triggered when connection is lost
+            :param batch:
+                Deliver messages to handlers in batches
+        """
+        self._client = None
+        self.batch = batch
+
+        if batch:
+            self._callback = self._on_messages
+        else:
+            self._callback = self._on_message
+
+        self.channels = {}
+        self.patterns = {}
+
+        self.disconnect_callback = disconnect_callback
+
+        if client is not None:
+            self._attach(client)
+
+    def resubscribe(self, client):
+        """
+            Subscribe new connection to all channels and patterns, for
+            example after reconnection
+
+            :param client:
+                Client instance
+        """
+        self._attach(client)
+
+        if self.channels:
+            client.subscribe(list(self.channels), self._callback)
+        if self.patterns:
+            client.psubscribe(list(self.patterns), self._callback)
+
+    def detach(self):
+        """
+            Forget current connection. Subscriptions are kept and sent again
+            with `resubscribe`.
+        """
+        self._client = None
+
+    def subscribe(self, channel, handler):
+        """
+            Subscribe to the channel. If channel is already subscribed, its
+            handler is replaced.
+
+            :param channel:
+                Channel name
+            :param handler:
+                Handler, receives channel name and message data
+        """
+        channel = encode_name(channel)
+        subscribed = channel in self.channels
+        self.channels[channel] = handler
+
+        if not subscribed and self._client is not None:
+            # Client might have left pub/sub mode after last unsubscribe
+            self._attach(self._client)
+            self._client.subscribe([channel], self._callback)
+
+    def psubscribe(self, pattern, handler):
+        """
+            Subscribe to channels matching the pattern. If pattern is
+            already subscribed, its handler is replaced.
+
+            :param pattern:
+                Glob-style pattern
+            :param handler:
+                Handler, receives channel name and message data
+        """
+        pattern = encode_name(pattern)
+        subscribed = pattern in self.patterns
+        self.patterns[pattern] = handler
+
+        if not subscribed and self._client is not None:
+            # Client might have left pub/sub mode after last unsubscribe
+            self._attach(self._client)
+            self._client.psubscribe([pattern], self._callback)
+
+    def unsubscribe(self, channel):
+        """
+            Unsubscribe from the channel
+
+            :param channel:
+                Channel name
+        """
+        channel = encode_name(channel)
+        if (self.channels.pop(channel, None) is not None and
+                self._client is not None):
+            self._client.unsubscribe([channel])
+
+    def punsubscribe(self, pattern):
+        """
+            Unsubscribe from the pattern
+
+            :param pattern:
+                Glob-style pattern
+        """
+        pattern = encode_name(pattern)
+        if (self.patterns.pop(pattern, None) is not None and
+                self._client is not None):
+            self._client.punsubscribe([pattern])
+
+    # Helpers
+    def _attach(self, client):
+        self._client = client
+        if self.batch:
+            client.set_sub_batch()
+
+    def _run_handler(self, handler, channel, batch):
+        if handler is not None:
+            try:
+                handler(channel, batch)
+            except:
+                logger.exception('Handler failed')
+
+    # Event handlers
+    def _on_message(self, message):
+        if message is None:
+            self.detach()
+            if self.disconnect_callback is not None:
+                self.disconnect_callback()
+            return
+
+        if type(message[0]) is not bytes:
+            message = encode_names(message, self._client.encoding,
+                                   self._client.encoding_errors)
+
+        kind = message[0]
+        if kind == b'message':
+            handler = self.channels.get(message[1])
+            if handler is not None:
+                handler(message[1], message[2])
+        elif kind == b'pmessage':
+            # Redis sends matched pattern with the message, so there is no
+            # need to match the channel again
+            handler = self.patterns.get(message[1])
+            if handler is not None:
+                handler(message[2], message[3])
+
+    def _on_messages(self, messages):
+        if messages is None:
+            self._on_message(None)
+            return
+
+        # Group messages by channel and by (pattern, channel)
+        channel_batches = {}
+        pattern_batches = {}
+        for message in messages:
+            if type(message[0]) is not bytes:
+                message = encode_names(message, self._client.encoding,
+                                       self._client.encoding_errors)
+
+            kind = message[0]
+            if kind == b'message':
+                batch = channel_batches.get(message[1])
+                if batch is None:
+                    channel_batches[message[1]] = [message[2]]
+                else:
+                    batch.append(message[2])
+            elif kind == b'pmessage':
+                key = (message[1], message[2])
+                batch = pattern_batches.get(key)
+                if batch is None:
+                    pattern_batches[key] = [message[3]]
+                else:
+                    batch.append(message[3])
+
+        for channel, batch in channel_batches.items():
+            self._run_handler(self.channels.get(channel), channel, batch)
+
+        for (pattern, channel), batch in pattern_batches.items():
+            self._run_handler(self.patterns.get(pattern), channel, batch)
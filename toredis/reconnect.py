@@ -0,0 +1,346 @@
+import logging
+import random
+
+from collections import OrderedDict, deque
+from functools import partial
+
+from tornado.concurrent import Future
+from tornado.iostream import StreamClosedError
+
+from toredis._compat import text_type
+from toredis.client import Client, resolve_future
+from toredis.commands import READONLY_COMMANDS
+
+
+logger = logging.getLogger(__name__)
+
+# Commands which can be safely sent again if connection was lost before
+# response was received. Only commands which do not change data are
+# replayed by default: a write sent again can overwrite changes made by
+# other clients in the meantime.
+IDEMPOTENT_COMMANDS = READONLY_COMMANDS | frozenset([
+    'ECHO',
+    'PING',
+])
+
+# Connection state commands which are sent again after reconnection
+SESSION_COMMANDS = ('AUTH', 'SELECT')
+
+
+def get_backoff_delay(attempts, delay, max_delay):
+    """
+        Delay before the next reconnection attempt, with jitter to spread
+        reconnection attempts of many clients over time
+
+        :param attempts:
+            Number of failed attempts so far
+        :param delay:
+            Delay before the first attempt
+        :param max_delay:
+            Maximum delay
+    """
+    delay = min(max_delay, delay * 2 ** min(attempts, 32))
+    return delay * (0.5 + random.random() / 2)
+
+
+class ReconnectingClient(Client):
+    """
+        Client which reconnects to the server when connection is lost.
+
+        Reconnection attempts are delayed with jittered exponential backoff.
+        Commands issued while client is disconnected are queued and sent
+        once connection is established. Idempotent commands which were
+        waiting for response when connection was lost are sent again, other
+        commands are completed with `None`. By default only read-only
+        commands are sent again. Last AUTH and SELECT commands
+        are repeated on every reconnection.
+    """
+    def __init__(self, reconnect_delay=0.1, max_reconnect_delay=10,
+                 max_queue_size=10000, max_queue_bytes=16 * 1024 * 1024,
+                 replay_commands=IDEMPOTENT_COMMANDS, **kwargs):
+        """
+            Constructor
+
+            :param reconnect_delay:
+                Delay in seconds before the first reconnection attempt
+            :param max_reconnect_delay:
+                Maximum delay in seconds between reconnection attempts
+            :param max_queue_size:
+                Maximum number of commands queued while disconnected
+            :param max_queue_bytes:
+                Maximum size of arguments of commands queued while
+                disconnected. Commands over either limit are completed with
+                `None`.
+            :param replay_commands:
+                Set of commands which are sent again if connection was lost
+                before response was received. Add writes which are safe to
+                repeat for your data explicitly, for example
+                `IDEMPOTENT_COMMANDS | set(['SET'])`.
+            :param kwargs:
+                Additional Client arguments
+        """
+        super(ReconnectingClient, self).__init__(**kwargs)
+
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_queue_size = max_queue_size
+        self.max_queue_bytes = max_queue_bytes
+        self.replay_commands = replay_commands
+
+        self._address = None
+        self._ready = False
+        self._closed = False
+        self._attempts = 0
+        self._timeout = None
+
+        # Commands waiting for response, as (send, args, callback) tuples
+        # by command number
+        self._in_flight = OrderedDict()
+        self._in_flight_count = 0
+
+        # Commands waiting for connection, as (send, args, callback, size)
+        # tuples
+        self._queue = deque()
+        self._queue_bytes = 0
+
+        self._session = {}
+
+    def connect(self, host='localhost', port=6379, callback=None):
+        """
+            Connect to redis server
+
+            :param host:
+                Host to connect to
+            :param port:
+                Port
+            :param callback:
+                Optional callback to be triggered upon first connection
+        """
+        self._address = (host, port)
+        self._start(callback)
+
+    def connect_usocket(self, usock, callback=None):
+        """
+            Connect to redis server with unix socket
+        """
+        self._address = usock
+        self._start(callback)
+
+    def close(self):
+        """
+            Close redis connection and stop reconnecting
+        """
+        self._closed = True
+
+        if self._timeout is not None:
+            self._io_loop.remove_timeout(self._timeout)
+            self._timeout = None
+
+        self._fail_queue()
+
+        if self._ready and self.is_connected():
+            super(ReconnectingClient, self).close()
+        elif self.is_connected():
+            # Connection attempt is in progress
+            self._stream.close()
+
+    # State
+    def is_ready(self):
+        """
+            Check if client is connected and commands are sent right away
+        """
+        return self._ready
+
+    # Commands
+    def send_message(self, args, callback=None, timeout=None, decode=True):
+        send = super(ReconnectingClient, self).send_message
+        if timeout is not None or not decode:
+            send = partial(send, timeout=timeout, decode=decode)
+        return self._send(send, args, callback)
+
+    def send_messages(self, args_pipeline, callback=None, timeout=None,
+                      decode=True):
+        send = super(ReconnectingClient, self).send_messages
+        if not args_pipeline:
+            return send(args_pipeline, callback)
+
+        if timeout is not None or not decode:
+            send = partial(send, timeout=timeout, decode=decode)
+        return self._send(send, args_pipeline, callback)
+
+    # Helpers
+    def _start(self, callback):
+        self._closed = False
+        self._attempts = 0
+        self._reconnect(callback)
+
+    def _reconnect(self, callback=None):
+        self._timeout = None
+
+        on_connect = partial(self._on_connect, callback)
+        if isinstance(self._address, tuple):
+            super(ReconnectingClient, self).connect(
+                self._address[0], self._address[1], callback=on_connect
+            )
+        else:
+            super(ReconnectingClient, self).connect_usocket(
+                self._address, callback=on_connect
+            )
+
+    def _get_reconnect_delay(self):
+        return get_backoff_delay(self._attempts, self.reconnect_delay,
+                                 self.max_reconnect_delay)
+
+    def _schedule_reconnect(self):
+        delay = self._get_reconnect_delay()
+        self._attempts += 1
+
+        logger.debug('Reconnecting in %.3f seconds', delay)
+        self._timeout = self._io_loop.add_timeout(
+            self._io_loop.time() + delay, self._reconnect
+        )
+
+    def _send(self, send, args, callback):
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        if not self._ready:
+            self._enqueue(send, args, callback)
+            return future
+
+        if args[0] in SESSION_COMMANDS:
+            self._session[args[0]] = args
+
+        self._in_flight_count += 1
+        number = self._in_flight_count
+        self._in_flight[number] = (send, args, callback)
+        try:
+            send(args, partial(self._on_reply, number, callback))
+        except StreamClosedError:
+            # Connection loss was not noticed yet
+            del self._in_flight[number]
+            self._enqueue(send, args, callback)
+        except:
+            del self._in_flight[number]
+            raise
+
+        return future
+
+    def _enqueue(self, send, args, callback):
+        if self._closed:
+            callback(None)
+            return
+
+        size = self._command_size(args)
+        if (len(self._queue) >= self.max_queue_size or
+                self._queue_bytes + size > self.max_queue_bytes):
+            logger.warning('Offline queue is full, dropping command')
+            callback(None)
+            return
+
+        self._queue.append((send, args, callback, size))
+        self._queue_bytes += size
+
+    def _fail_queue(self):
+        queue = self._queue
+        self._queue = deque()
+        self._queue_bytes = 0
+
+        for _, _, callback, _ in queue:
+            _run_callback(callback, None)
+
+    def _command_size(self, args):
+        encoder = self._encoder
+        return _command_size(args, encoder.encoding, encoder.errors)
+
+    def _is_replayable(self, args):
+        if isinstance(args[0], (list, tuple)):
+            # Pipeline
+            return all(cmd[0] in self.replay_commands for cmd in args)
+        return args[0] in self.replay_commands
+
+    # Event handlers
+    def _on_connect(self, callback):
+        self._ready = True
+        self._attempts = 0
+
+        send = super(ReconnectingClient, self).send_message
+        for cmd in SESSION_COMMANDS:
+            args = self._session.get(cmd)
+            if args is not None:
+                send(args, partial(self._on_session_reply, args))
+
+        queue = self._queue
+        self._queue = deque()
+        self._queue_bytes = 0
+
+        for send, args, queued_callback, _ in queue:
+            self._send(send, args, queued_callback)
+
+        if callback is not None:
+            callback()
+
+    def _on_session_reply(self, args, result):
+        if result is None or isinstance(result, Exception):
+            logger.error('Failed to restore connection state with %s: %s',
+                         args[0], result)
+
+    def _on_reply(self, number, callback, result):
+        self._in_flight.pop(number, None)
+        callback(result)
+
+    def _on_close(self, data=None):
+        if data is not None:
+            self._on_read(data)
+
+        self._ready = False
+
+        # Callbacks of commands in flight are handled here, so Client does
+        # not complete them with None
+        in_flight = self._in_flight
+        self._in_flight = OrderedDict()
+        self.callbacks = deque()
+
+        replay = []
+        for send, args, callback in in_flight.values():
+            if not self._closed and self._is_replayable(args):
+                replay.append((send, args, callback,
+                               self._command_size(args)))
+            else:
+                _run_callback(callback, None)
+
+        # Replayed commands go before commands issued while disconnected
+        self._queue.extendleft(reversed(replay))
+        self._queue_bytes += sum(item[3] for item in replay)
+
+        super(ReconnectingClient, self)._on_close()
+
+        if not self._closed:
+            self._schedule_reconnect()
+
+
+def _command_size(args, encoding='utf-8', errors='strict'):
+    # Number of bytes of arguments, as they are encoded by Encoder
+    if isinstance(args[0], (list, tuple)):
+        return sum(_command_size(cmd, encoding, errors) for cmd in args)
+
+    size = 0
+    for arg in args:
+        if isinstance(arg, (bytes, bytearray)):
+            size += len(arg)
+        elif isinstance(arg, memoryview):
+            size += arg.nbytes
+        else:
+            if not isinstance(arg, text_type):
+                arg = str(arg)
+            size += len(arg.encode(encoding, errors))
+    return size
+
+
+def _run_callback(callback, result):
+    try:
+        callback(result)
+    except:
+        logger.exception('Callback failed')
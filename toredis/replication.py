@@ -0,0 +1,167 @@
+from tornado.ioloop import IOLoop
+
+from toredis.client import Client
+from toredis.cluster import UNSUPPORTED_COMMANDS
+from toredis.commands import READONLY_COMMANDS, RedisCommandsMixin
+from toredis.pipeline import Pipeline
+
+
+ROUND_ROBIN = 'round_robin'
+LEAST_OUTSTANDING = 'least_outstanding'
+
+
+class ReplicatedClient(RedisCommandsMixin):
+    """
+        Client which sends read-only commands to replicas and all other
+        commands to the master.
+
+        Replication is asynchronous, so read following a write may not see
+        it yet. Use `master` connection directly for reads which have to be
+        consistent, pub/sub and transactions.
+    """
+    def __init__(self, master, replicas, io_loop=None, client_class=Client,
+                 selection=ROUND_ROBIN):
+        """
+            Constructor
+
+            :param master:
+                Master (host, port) tuple
+            :param replicas:
+                List of replica (host, port) tuples
+            :param io_loop:
+                Optional IOLoop instance
+            :param client_class:
+                Client class used to connect to servers
+            :param selection:
+                How replica is picked for the command: `round_robin` or
+                `least_outstanding` (replica with least commands waiting for
+                response)
+        """
+        if selection not in (ROUND_ROBIN, LEAST_OUTSTANDING):
+            raise ValueError('Unknown replica selection: %s' % selection)
+
+        self._io_loop = io_loop or IOLoop.instance()
+
+        self.master_address = master
+        self.replica_addresses = list(replicas)
+        self.client_class = client_class
+        self.selection = selection
+
+        self.master = None
+        self.replicas = []
+
+        self._next = -1
+
+    def connect(self, callback=None):
+        """
+            Connect to the master and all replicas
+
+            :param callback:
+                Optional callback to be triggered once all servers are
+                connected
+        """
+        remaining = [len(self.replica_addresses) + 1]
+
+        def _on_connect():
+            remaining[0] -= 1
+            if remaining[0] == 0 and callback is not None:
+                callback()
+
+        self.master = self._open(self.master_address, _on_connect)
+        self.replicas = [self._open(address, _on_connect)
+                         for address in self.replica_addresses]
+
+    def close(self):
+        """
+            Close all server connections
+        """
+        for client in [self.master] + self.replicas:
+            if client is not None and client.is_connected():
+                client.close()
+
+    def get_replica(self):
+        """
+            Get replica connection for the next read-only command. Master
+            connection is returned if none of the replicas is connected.
+        """
+        count = len(self.replicas)
+        if not count:
+            return self.master
+
+        # Start from the next replica, so ties are spread evenly
+        self._next = start = (self._next + 1) % count
+
+        best = None
+        for i in range(count):
+            client = self.replicas[(start + i) % count]
+            if not client.is_connected():
+                continue
+
+            if self.selection == ROUND_ROBIN:
+                return client
+
+            if best is None or len(client.callbacks) < len(best.callbacks):
+                best = client
+
+        return best or self.master
+
+    def get_client(self, args):
+        """
+            Get connection which should execute the command
+
+            :param args:
+                Command arguments
+        """
+        if args[0] in READONLY_COMMANDS:
+            return self.get_replica()
+        return self.master
+
+    # Commands
+    def send_message(self, args, callback=None):
+        """
+            Send command to the replica if it is read-only or to the master
+            otherwise
+
+            :param args:
+                Arguments to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        if args[0] in UNSUPPORTED_COMMANDS:
+            raise ValueError('%s is not supported by ReplicatedClient, use '
+                             'master connection instead' % args[0])
+
+        return self.get_client(args).send_message(args, callback)
+
+    def send_messages(self, args_pipeline, callback=None):
+        """
+            Send command pipeline. Pipeline is sent to the replica if all
+            commands are read-only or to the master otherwise.
+
+            :param args_pipeline:
+                Arguments pipeline to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        client = None
+        for args in args_pipeline:
+            if args[0] in UNSUPPORTED_COMMANDS:
+                raise ValueError('%s is not supported by ReplicatedClient, '
+                                 'use master connection instead' % args[0])
+
+            if args[0] not in READONLY_COMMANDS:
+                client = self.master
+
+        if client is None:
+            client = self.get_replica()
+
+        return client.send_messages(args_pipeline, callback)
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    # Helpers
+    def _open(self, address, callback):
+        client = self.client_class(io_loop=self._io_loop)
+        client.connect(address[0], address[1], callback=callback)
+        return client
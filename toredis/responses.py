@@ -0,0 +1,61 @@
+from toredis._compat import imap, izip
+
+
+def pairs_to_dict(response):
+    """
+        Dict from flat list of keys and values, like HGETALL response
+    """
+    if type(response) is dict:
+        # RESP3 map
+        return response
+
+    it = iter(response)
+    return dict(izip(it, it))
+
+
+def pairs_with_scores(response):
+    """
+        List of (member, score) tuples from WITHSCORES response, scores are
+        converted to floats
+    """
+    if response and type(response[0]) is list:
+        # RESP3 returns [member, score] pairs with scores as doubles
+        return [tuple(pair) for pair in response]
+
+    it = iter(response)
+    return list(izip(it, imap(float, it)))
+
+
+def _parse_info_value(value):
+    try:
+        return int(value)
+    except ValueError:
+        pass
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    if '=' in value:
+        # Nested values, like `keys=1,expires=0` of keyspace section
+        return dict((key, _parse_info_value(item)) for key, _, item in
+                    (field.partition('=') for field in value.split(',')))
+
+    return value
+
+
+def parse_info(response):
+    """
+        Dict of INFO fields. Numeric values are converted to numbers,
+        comma-separated `name=value` lists to dicts.
+    """
+    if not isinstance(response, str):
+        response = response.decode('utf-8')
+
+    info = {}
+    for line in response.splitlines():
+        if line and not line.startswith('#'):
+            key, _, value = line.partition(':')
+            info[key] = _parse_info_value(value)
+    return info
@@ -0,0 +1,148 @@
+from collections import deque
+
+from tornado.concurrent import Future
+
+
+class ScanIterator(object):
+    """
+        Walks keyspace or collection with SCAN, SSCAN, HSCAN or ZSCAN,
+        fetching one page of results at a time.
+
+        Pages are lists of items as returned by redis: keys for SCAN and
+        SSCAN, field and value pairs flattened into one list for HSCAN and
+        ZSCAN. Empty pages are skipped. Same item can be returned more than
+        once if collection is modified during iteration.
+
+        With Tornado running on asyncio, iterator can be used with
+        `async for`, yielding pages.
+    """
+    def __init__(self, client, command, key=None, match=None, count=None,
+                 prefetch=False):
+        """
+            Constructor
+
+            :param client:
+                Client instance
+            :param command:
+                SCAN, SSCAN, HSCAN or ZSCAN
+            :param key:
+                Key of the collection, not used with SCAN
+            :param match:
+                Optional glob-style pattern for returned items
+            :param count:
+                Hint for number of items redis should check per call
+            :param prefetch:
+                Request next page as soon as current one is received, so it
+                is fetched while the caller processes current page
+        """
+        self._client = client
+        self.prefetch = prefetch
+
+        self._prefix = [command]
+        if key is not None:
+            self._prefix.append(key)
+
+        self._options = []
+        if match is not None:
+            self._options.extend(['MATCH', match])
+        if count is not None:
+            self._options.extend(['COUNT', count])
+
+        self.done = False
+
+        self._cursor = 0
+        self._pages = deque()
+        self._waiter = None
+        self._fetching = False
+
+        # Result returned once iteration is over: empty list, or error which
+        # stopped the iteration
+        self._last = []
+
+    def next_page(self, callback=None):
+        """
+            Get next page of results
+
+            :param callback:
+                Callback, receives list of items, empty list once iteration
+                is complete, `None` if connection was lost or the error
+                returned by redis. If not provided, Future is returned
+                instead.
+        """
+        if self._waiter is not None:
+            raise ValueError('Next page is already requested')
+
+        future = None
+        if callback is None:
+            future = Future()
+            callback = future.set_result
+
+        if self._pages:
+            callback(self._pages.popleft())
+            self._prefetch()
+        elif self.done:
+            callback(self._last)
+        else:
+            if not self._fetching:
+                self._fetch()
+            self._waiter = callback
+        return future
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        future = Future()
+
+        def on_page(page):
+            if page is None:
+                future.set_exception(IOError('Connection lost'))
+            elif isinstance(page, Exception):
+                future.set_exception(page)
+            elif not page:
+                future.set_exception(StopAsyncIteration())
+            else:
+                future.set_result(page)
+
+        self.next_page(on_page)
+        return future
+
+    # Helpers
+    def _fetch(self):
+        args = self._prefix + [self._cursor] + self._options
+        self._client.send_message(args, self._on_reply)
+        self._fetching = True
+
+    def _prefetch(self):
+        if (self.prefetch and not self.done and not self._fetching and
+                not self._pages):
+            self._fetch()
+
+    # Event handlers
+    def _on_reply(self, result):
+        self._fetching = False
+
+        if result is None or isinstance(result, Exception):
+            self.done = True
+            self._last = result
+        else:
+            cursor, items = result
+            self._cursor = cursor
+            self.done = int(cursor) == 0
+            if items:
+                self._pages.append(items)
+
+        waiter = self._waiter
+        if waiter is not None:
+            if self._pages:
+                self._waiter = None
+                waiter(self._pages.popleft())
+            elif self.done:
+                self._waiter = None
+                waiter(self._last)
+            else:
+                # Page was empty, continue with the next one
+                self._fetch()
+                return
+
+        self._prefetch()
@@ -0,0 +1,353 @@
+import logging
+
+from collections import deque
+from functools import partial
+
+from hiredis import ReplyError
+
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+
+from toredis.client import Client, resolve_future
+
+
+logger = logging.getLogger(__name__)
+
+
+class Sentinel(object):
+    """
+        Redis sentinel client, discovers master and replica addresses
+    """
+    def __init__(self, sentinels, io_loop=None):
+        """
+            Constructor
+
+            :param sentinels:
+                List of (host, port) tuples
+            :param io_loop:
+                Optional IOLoop instance
+        """
+        self._io_loop = io_loop or IOLoop.instance()
+
+        self.sentinels = list(sentinels)
+        self._clients = {}
+
+    def close(self):
+        """
+            Close sentinel connections
+        """
+        clients = self._clients
+        self._clients = {}
+        for client in clients.values():
+            if client.is_connected():
+                client.close()
+
+    def get_client(self, address):
+        """
+            Get connection to the sentinel. Connection is opened if
+            necessary.
+
+            :param address:
+                (host, port) tuple
+        """
+        client = self._clients.get(address)
+        if client is None or not client.is_connected():
+            client = Client(io_loop=self._io_loop)
+            client.connect(address[0], address[1])
+            self._clients[address] = client
+        return client
+
+    def discover_master(self, service_name, callback):
+        """
+            Get current master address
+
+            :param service_name:
+                Name of the monitored master
+            :param callback:
+                Callback, receives (host, port) tuple or `None` if none of
+                the sentinels knows the master
+        """
+        self._query(['SENTINEL', 'get-master-addr-by-name', service_name],
+                    _parse_address, callback)
+
+    def discover_replicas(self, service_name, callback):
+        """
+            Get addresses of healthy replicas
+
+            :param service_name:
+                Name of the monitored master
+            :param callback:
+                Callback, receives list of (host, port) tuples or `None` if
+                none of the sentinels knows the master
+        """
+        self._query(['SENTINEL', 'slaves', service_name],
+                    _parse_replicas, callback)
+
+    def master_for(self, service_name, **kwargs):
+        """
+            Create client connected to the master. Client has to be
+            connected with `connect` before use.
+
+            :param service_name:
+                Name of the monitored master
+            :param kwargs:
+                Additional SentinelClient arguments
+        """
+        kwargs.setdefault('io_loop', self._io_loop)
+        return SentinelClient(self, service_name, **kwargs)
+
+    # Helpers
+    def _query(self, args, parse, callback, index=0):
+        if index >= len(self.sentinels):
+            callback(None)
+            return
+
+        address = self.sentinels[index]
+        self.get_client(address).send_message(
+            args, partial(self._on_query, args, parse, callback, index)
+        )
+
+    def _on_query(self, args, parse, callback, index, result):
+        if result is not None and not isinstance(result, ReplyError):
+            if index > 0:
+                # Ask responding sentinel first next time
+                self.sentinels.insert(0, self.sentinels.pop(index))
+            callback(parse(result))
+        else:
+            self._query(args, parse, callback, index + 1)
+
+
+def _decode(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def _parse_address(result):
+    return (_decode(result[0]), int(result[1]))
+
+
+def _parse_replicas(result):
+    replicas = []
+    for item in result:
+        info = dict(zip(map(_decode, item[::2]), map(_decode, item[1::2])))
+        flags = info.get('flags', '').split(',')
+        if 's_down' in flags or 'o_down' in flags or 'disconnected' in flags:
+            continue
+        replicas.append((info['ip'], int(info['port'])))
+    return replicas
+
+
+class SentinelClient(Client):
+    """
+        Client connected to the master discovered with sentinels.
+
+        Client listens for `+switch-master` notifications and reconnects to
+        the new master on failover or when connection is lost. Commands
+        issued while client is reconnecting are queued and sent once
+        connection is established. Commands which were waiting for response
+        when connection was lost are completed with `None`.
+    """
+    def __init__(self, sentinel, service_name, retry_delay=0.5,
+                 max_queue_size=10000, **kwargs):
+        """
+            Constructor
+
+            :param sentinel:
+                Sentinel instance
+            :param service_name:
+                Name of the monitored master
+            :param retry_delay:
+                Delay in seconds before retrying failed master discovery
+            :param max_queue_size:
+                Maximum number of commands queued while reconnecting.
+                Commands over the limit are completed with `None`.
+            :param kwargs:
+                Additional Client arguments
+        """
+        super(SentinelClient, self).__init__(**kwargs)
+
+        self.sentinel = sentinel
+        self.service_name = service_name
+        self.retry_delay = retry_delay
+        self.max_queue_size = max_queue_size
+
+        self.address = None
+
+        self._queue = deque()
+        self._ready = False
+        self._connecting = False
+        self._closed = False
+
+        self._sub_client = None
+        self._sub_index = 0
+
+    def connect(self, callback=None):
+        """
+            Discover master and connect to it
+
+            :param callback:
+                Optional callback to be triggered upon connection
+        """
+        self._closed = False
+        self._subscribe()
+        self._discover(callback)
+
+    def close(self):
+        """
+            Close master connection and stop listening for failovers
+        """
+        self._closed = True
+
+        if self._sub_client is not None and self._sub_client.is_connected():
+            self._sub_client.close()
+        self._sub_client = None
+
+        self._fail_queue()
+
+        if self.is_connected():
+            super(SentinelClient, self).close()
+
+    def is_ready(self):
+        """
+            Check if client is connected to the master
+        """
+        return self._ready
+
+    def failover(self):
+        """
+            Drop current connection and reconnect to the master
+        """
+        if self._ready and self.is_connected():
+            # Queue new commands until connected to the new master
+            self._ready = False
+            self._stream.close()
+
+    def on_disconnect(self):
+        self._ready = False
+
+        if self._closed:
+            return
+
+        if self._connecting:
+            # Master is not reachable, ask sentinels again a bit later
+            self._connecting = False
+            self._retry(None)
+        else:
+            self._discover()
+
+    # Commands
+    def send_message(self, args, callback=None, timeout=None, decode=True):
+        if self._ready:
+            return super(SentinelClient, self).send_message(args, callback,
+                                                            timeout, decode)
+        return self._enqueue(
+            partial(super(SentinelClient, self).send_message,
+                    timeout=timeout, decode=decode),
+            args, callback
+        )
+
+    def send_messages(self, args_pipeline, callback=None, timeout=None,
+                      decode=True):
+        if self._ready:
+            return super(SentinelClient, self).send_messages(
+                args_pipeline, callback, timeout, decode
+            )
+        return self._enqueue(
+            partial(super(SentinelClient, self).send_messages,
+                    timeout=timeout, decode=decode),
+            args_pipeline, callback
+        )
+
+    # Helpers
+    def _enqueue(self, send, args, callback):
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        if self._closed or len(self._queue) >= self.max_queue_size:
+            callback(None)
+        else:
+            self._queue.append((send, args, callback))
+        return future
+
+    def _fail_queue(self):
+        queue = self._queue
+        self._queue = deque()
+        for _, _, callback in queue:
+            try:
+                callback(None)
+            except:
+                logger.exception('Callback failed')
+
+    def _discover(self, callback=None):
+        self.sentinel.discover_master(
+            self.service_name, partial(self._on_master, callback)
+        )
+
+    def _retry(self, callback):
+        self._io_loop.add_timeout(self._io_loop.time() + self.retry_delay,
+                                  partial(self._discover, callback))
+
+    def _on_master(self, callback, address):
+        if self._closed:
+            return
+
+        if address is None:
+            logger.error('Failed to discover master %s', self.service_name)
+            self._retry(callback)
+            return
+
+        self.address = address
+        self._connecting = True
+        super(SentinelClient, self).connect(
+            address[0], address[1],
+            callback=partial(self._on_master_connect, callback)
+        )
+
+    def _on_master_connect(self, callback):
+        self._connecting = False
+        self._ready = True
+
+        # Replay commands issued while client was disconnected
+        queue = self._queue
+        self._queue = deque()
+        for send, args, queued_callback in queue:
+            send(args, queued_callback)
+
+        if callback is not None:
+            callback()
+
+    def _subscribe(self):
+        if self._closed or not self.sentinel.sentinels:
+            return
+
+        sentinels = self.sentinel.sentinels
+        host, port = sentinels[self._sub_index % len(sentinels)]
+        self._sub_client = Client(io_loop=self._io_loop)
+        self._sub_client.connect(host, port)
+        self._sub_client.subscribe('+switch-master', self._on_sentinel_message)
+
+    def _on_sentinel_message(self, message):
+        if message is None:
+            # Sentinel connection was lost, try another sentinel later
+            if not self._closed:
+                self._sub_index += 1
+                self._io_loop.add_timeout(
+                    self._io_loop.time() + self.retry_delay, self._subscribe
+                )
+            return
+
+        if message[0] != b'message':
+            return
+
+        params = _decode(message[2]).split(' ')
+        if params[0] != self.service_name:
+            return
+
+        address = (params[3], int(params[4]))
+        if address != self.address:
+            logger.info('Master %s switched to %s:%d', self.service_name,
+                        address[0], address[1])
+            self.failover()
@@ -0,0 +1,491 @@
+import bisect
+import hashlib
+import logging
+import struct
+import zlib
+
+from functools import partial
+
+from hiredis import ReplyError
+
+from tornado.concurrent import Future
+from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
+
+from toredis.client import Client, resolve_future
+from toredis.cluster import (UNSUPPORTED_COMMANDS, PipelineResult,
+                             command_key, encode_key, hash_tag)
+from toredis.commands import RedisCommandsMixin
+from toredis.pipeline import Pipeline
+from toredis.pubsub import PubSub, encode_name
+from toredis.reconnect import get_backoff_delay
+
+
+logger = logging.getLogger(__name__)
+
+
+# Multi-key commands which are split between shards, with number of
+# arguments per key
+SPLIT_COMMANDS = {
+    'MGET': 1,
+    'DEL': 1,
+    'MSET': 2,
+}
+
+
+class HashRing(object):
+    """
+        Ketama compatible consistent hash ring
+    """
+    def __init__(self, nodes, vnodes=160, hash_tags=True):
+        """
+            Constructor
+
+            :param nodes:
+                List of node names
+            :param vnodes:
+                Number of points on the ring per node
+            :param hash_tags:
+                Hash only `{...}` part of the key, if key has one
+        """
+        self.hash_tags = hash_tags
+
+        ring = []
+        for node in nodes:
+            for i in range((vnodes + 3) // 4):
+                point_key = ('%s-%d' % (node, i)).encode('utf-8')
+                digest = hashlib.md5(point_key).digest()
+                for point in struct.unpack('<4I', digest):
+                    ring.append((point, node))
+        ring.sort()
+
+        self._points = [point for point, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    def get_node(self, key):
+        """
+            Get name of the node for the key
+
+            :param key:
+                Key name
+        """
+        key = hash_tag(key) if self.hash_tags else encode_key(key)
+        point = struct.unpack_from('<I', hashlib.md5(key).digest())[0]
+
+        index = bisect.bisect(self._points, point)
+        if index == len(self._points):
+            index = 0
+        return self._nodes[index]
+
+
+class ShardedClient(RedisCommandsMixin):
+    """
+        Client which shards keys between independent redis servers with
+        consistent hashing.
+
+        Every command is sent to the server which owns the first command key.
+        MGET, DEL and MSET are split between servers and results are merged.
+        Other multi-key commands should use hash tags to keep their keys on
+        one server.
+    """
+    def __init__(self, nodes, io_loop=None, client_class=Client, vnodes=160,
+                 hash_tags=True):
+        """
+            Constructor
+
+            :param nodes:
+                List of (host, port) tuples
+            :param io_loop:
+                Optional IOLoop instance
+            :param client_class:
+                Client class used to connect to servers
+            :param vnodes:
+                Number of points on the hash ring per server
+            :param hash_tags:
+                Hash only `{...}` part of the key, if key has one
+        """
+        self._io_loop = io_loop or IOLoop.instance()
+
+        self.nodes = list(nodes)
+        self.client_class = client_class
+
+        self.clients = {}
+        for host, port in self.nodes:
+            self.clients['%s:%d' % (host, port)] = None
+
+        self._ring = HashRing(sorted(self.clients), vnodes, hash_tags)
+
+    def connect(self, callback=None):
+        """
+            Connect to all servers
+
+            :param callback:
+                Optional callback to be triggered once all servers are
+                connected
+        """
+        remaining = [len(self.nodes)]
+
+        def _on_connect():
+            remaining[0] -= 1
+            if remaining[0] == 0 and callback is not None:
+                callback()
+
+        for host, port in self.nodes:
+            client = self.client_class(io_loop=self._io_loop)
+            client.connect(host, port, callback=_on_connect)
+            self.clients['%s:%d' % (host, port)] = client
+
+    def close(self):
+        """
+            Close all server connections
+        """
+        for client in self.clients.values():
+            if client is not None and client.is_connected():
+                client.close()
+
+    def get_client(self, key):
+        """
+            Get client connected to the server which owns the key
+
+            :param key:
+                Key name
+        """
+        return self.clients[self._ring.get_node(key)]
+
+    # Commands
+    def send_message(self, args, callback=None):
+        """
+            Send command to the server which owns command key
+
+            :param args:
+                Arguments to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        cmd = args[0]
+        if cmd in UNSUPPORTED_COMMANDS:
+            raise ValueError('%s is not supported by ShardedClient' % cmd)
+
+        if cmd in SPLIT_COMMANDS:
+            future = None
+            if callback is None:
+                future = Future()
+                callback = partial(resolve_future, future)
+
+            for client, part_args, part_callback in self._split(args, callback):
+                client.send_message(part_args, part_callback)
+            return future
+
+        return self._get_command_client(args).send_message(args, callback)
+
+    def send_messages(self, args_pipeline, callback=None):
+        """
+            Send command pipeline. Commands are grouped by server, each
+            group is sent as one pipeline and responses are returned in
+            original order. If connection to any of the servers is lost,
+            whole pipeline is completed with `None`.
+
+            :param args_pipeline:
+                Arguments pipeline to send
+            :param callback:
+                Callback. If not provided, Future is returned instead.
+        """
+        future = None
+        if callback is None:
+            future = Future()
+            callback = partial(resolve_future, future)
+
+        if not args_pipeline:
+            callback([])
+            return future
+
+        result = PipelineResult(len(args_pipeline), callback)
+
+        # Commands are grouped by server, with callback for every command
+        batches = {}
+
+        def add(client, args, callback):
+            batch = batches.get(client)
+            if batch is None:
+                batch = batches[client] = ([], [])
+            batch[0].append(args)
+            batch[1].append(callback)
+
+        for index, args in enumerate(args_pipeline):
+            if args[0] in UNSUPPORTED_COMMANDS:
+                raise ValueError(
+                    '%s is not supported by ShardedClient' % args[0]
+                )
+
+            if args[0] in SPLIT_COMMANDS:
+                on_split = partial(self._on_split_response, result, index)
+                for part in self._split(args, on_split):
+                    add(*part)
+            else:
+                add(self._get_command_client(args), args,
+                    partial(result.set, index))
+
+        for client, (batch_args, callbacks) in batches.items():
+            client.send_messages(
+                batch_args, partial(self._on_batch_response, result, callbacks)
+            )
+
+        return future
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    # Helpers
+    def _get_command_client(self, args):
+        key = command_key(args)
+        if key is None:
+            raise ValueError('%s has no keys and can not be sharded' % args[0])
+        return self.get_client(key)
+
+    def _split(self, args, callback):
+        # Returns list of (client, args, callback) tuples
+        cmd = args[0]
+        step = SPLIT_COMMANDS[cmd]
+        if len(args) < 2:
+            raise ValueError('%s requires at least one key' % cmd)
+
+        groups = {}
+        for i in range(1, len(args), step):
+            client = self.get_client(args[i])
+            group = groups.get(client)
+            if group is None:
+                group = groups[client] = ([], [cmd])
+            group[0].append((i - 1) // step)
+            group[1].extend(args[i:i + step])
+
+        if len(groups) == 1:
+            client, (_, group_args) = groups.popitem()
+            return [(client, group_args, callback)]
+
+        groups = list(groups.items())
+        result = PipelineResult(
+            len(groups),
+            partial(self._merge_split, cmd, groups, (len(args) - 1) // step,
+                    callback)
+        )
+        return [(client, group_args, partial(result.set, index))
+                for index, (client, (_, group_args)) in enumerate(groups)]
+
+    def _merge_split(self, cmd, groups, num_keys, callback, responses):
+        for response in responses:
+            if response is None or isinstance(response, ReplyError):
+                callback(response)
+                return
+
+        if cmd == 'MGET':
+            merged = [None] * num_keys
+            for (_, (indexes, _)), values in zip(groups, responses):
+                for index, value in zip(indexes, values):
+                    merged[index] = value
+        elif cmd == 'DEL':
+            merged = sum(responses)
+        else:
+            merged = responses[0]
+
+        callback(merged)
+
+    def _on_batch_response(self, result, callbacks, responses):
+        if responses is None:
+            # Connection was dropped, responses of other servers are not
+            # passed on partially
+            result.fail()
+            return
+
+        for callback, response in zip(callbacks, responses):
+            callback(response)
+
+    def _on_split_response(self, result, index, response):
+        if response is None:
+            # Connection to one of the servers was lost
+            result.fail()
+        else:
+            result.set(index, response)
+
+
+class ShardedPubSub(object):
+    """
+        Spreads channel subscriptions between several connections to one
+        server, so traffic of many channels is not serialized through one
+        socket.
+
+        Channels and patterns are assigned to connections by hash of their
+        name. Lost connections are reopened with exponential backoff and
+        all their subscriptions are restored.
+    """
+    def __init__(self, host='localhost', port=6379, num_connections=4,
+                 io_loop=None, client_class=Client, batch=False,
+                 reconnect_delay=0.1, max_reconnect_delay=10):
+        """
+            Constructor
+
+            :param host:
+                Host to connect to
+            :param port:
+                Port
+            :param num_connections:
+                Number of subscriber connections
+            :param io_loop:
+                Optional IOLoop instance
+            :param client_class:
+                Client class used to open connections
+            :param batch:
+                Deliver messages to handlers in batches, see `PubSub`
+            :param reconnect_delay:
+                Delay in seconds before the first reconnection attempt
+            :param max_reconnect_delay:
+                Maximum delay in seconds between reconnection attempts
+        """
+        self._io_loop = io_loop or IOLoop.instance()
+
+        self.host = host
+        self.port = port
+        self.client_class = client_class
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.shards = [PubSub(None, batch=batch)
+                       for _ in range(num_connections)]
+        self.clients = [None] * num_connections
+
+        self._attempts = [0] * num_connections
+        self._timeouts = {}
+        self._closed = False
+
+    def connect(self, callback=None):
+        """
+            Open subscriber connections
+
+            :param callback:
+                Optional callback to be triggered once all connections are
+                established
+        """
+        self._closed = False
+
+        remaining = [len(self.shards)]
+
+        def _on_connect():
+            remaining[0] -= 1
+            if remaining[0] == 0 and callback is not None:
+                callback()
+
+        for index in range(len(self.shards)):
+            self._open(index, _on_connect)
+
+    def close(self):
+        """
+            Close all connections
+        """
+        self._closed = True
+
+        for timeout in self._timeouts.values():
+            self._io_loop.remove_timeout(timeout)
+        self._timeouts = {}
+
+        for index, client in enumerate(self.clients):
+            self.shards[index].detach()
+            if client is not None and client.is_connected():
+                client.close()
+
+    def get_shard(self, name):
+        """
+            Get PubSub instance which handles the channel or pattern
+
+            :param name:
+                Channel name or pattern
+        """
+        index = (zlib.crc32(encode_name(name)) & 0xffffffff) % len(self.shards)
+        return self.shards[index]
+
+    def subscribe(self, channel, handler):
+        """
+            Subscribe to the channel
+
+            :param channel:
+                Channel name
+            :param handler:
+                Handler, receives channel name and message data
+        """
+        self._run(self.get_shard(channel).subscribe, channel, handler)
+
+    def psubscribe(self, pattern, handler):
+        """
+            Subscribe to channels matching the pattern
+
+            :param pattern:
+                Glob-style pattern
+            :param handler:
+                Handler, receives channel name and message data
+        """
+        self._run(self.get_shard(pattern).psubscribe, pattern, handler)
+
+    def unsubscribe(self, channel):
+        """
+            Unsubscribe from the channel
+
+            :param channel:
+                Channel name
+        """
+        self._run(self.get_shard(channel).unsubscribe, channel)
+
+    def punsubscribe(self, pattern):
+        """
+            Unsubscribe from the pattern
+
+            :param pattern:
+                Glob-style pattern
+        """
+        self._run(self.get_shard(pattern).punsubscribe, pattern)
+
+    # Helpers
+    def _run(self, method, *args):
+        try:
+            method(*args)
+        except StreamClosedError:
+            # Subscriptions are restored once connection is reopened
+            pass
+
+    def _open(self, index, callback=None):
+        self._timeouts.pop(index, None)
+
+        client = self.client_class(io_loop=self._io_loop)
+        client._close_callback = partial(self._on_client_close, index, client,
+                                         callback)
+        self.clients[index] = client
+
+        client.connect(self.host, self.port,
+                       callback=partial(self._on_client_connect, index,
+                                        client, callback))
+
+    # Event handlers
+    def _on_client_connect(self, index, client, callback):
+        self._attempts[index] = 0
+        self.shards[index].resubscribe(client)
+
+        # Connect callback is not needed for reconnections anymore
+        client._close_callback = partial(self._on_client_close, index, client,
+                                         None)
+
+        if callback is not None:
+            callback()
+
+    def _on_client_close(self, index, client, callback):
+        if self._closed or self.clients[index] is not client:
+            return
+
+        self.shards[index].detach()
+
+        delay = get_backoff_delay(self._attempts[index],
+                                  self.reconnect_delay,
+                                  self.max_reconnect_delay)
+        self._attempts[index] += 1
+
+        logger.warning('Subscriber connection lost, reconnecting in %.3f '
+                       'seconds', delay)
+        self._timeouts[index] = self._io_loop.add_timeout(
+            self._io_loop.time() + delay, partial(self._open, index, callback)
+        )